@@ -0,0 +1,379 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional, Sequence
+from sqlalchemy import Integer, bindparam, delete, func, select, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.responses import dumps
+from app.db.database import engine
+from app.db.models import ProjectAggregateLog, ProjectPayHistogram, ProjectSkillStats, ProjectStatusCounts
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets are [1.04^b, 1.04^(b+1)); a median read off the middle of
+# its bucket is within 2% of the exact one
+PAY_BUCKET_RATIO = 1.04
+# pg_try_advisory_xact_lock key: one worker at a time writes the summary tables
+AGGREGATES_LOCK_KEY = 0x61676772  # "aggr"
+SUMMARY_TABLES = (ProjectSkillStats.__table__, ProjectPayHistogram.__table__, ProjectStatusCounts.__table__)
+
+# Both read as (sign, skill_required, project_status, pay_per_hour, pay_per_project)
+LOG_SOURCE = (
+    "DELETE FROM project_aggregate_log RETURNING sign, skill_required, project_status, pay_per_hour, pay_per_project"
+)
+PROJECTS_SOURCE = "SELECT 1 AS sign, skill_required, project_status, pay_per_hour, pay_per_project FROM projects"
+
+
+def _contribution(name: str, source: str) -> str:
+    """CTEs ``{name}_skills``, ``{name}_histogram`` and ``{name}_statuses``
+    holding what the signed rows of ``source`` add to each summary table.
+
+    Folding, reconciling and rebuilding all count through this, so they agree
+    on every bucket.
+    """
+    return f"""{name}_source AS (
+    {source}
+), {name}_per_skill AS (
+    SELECT skills.skill, source.sign, source.pay_per_hour, source.pay_per_project
+    FROM {name}_source AS source
+    CROSS JOIN LATERAL (SELECT DISTINCT unnest(source.skill_required) AS skill) AS skills
+    WHERE skills.skill IS NOT NULL
+), {name}_skills AS (
+    SELECT skill,
+           sum(sign) AS projects,
+           coalesce(sum(sign) FILTER (WHERE pay_per_hour IS NOT NULL), 0) AS pay_per_hour_count,
+           coalesce(sum(sign * pay_per_hour), 0) AS pay_per_hour_sum,
+           coalesce(sum(sign) FILTER (WHERE pay_per_project IS NOT NULL), 0) AS pay_per_project_count,
+           coalesce(sum(sign * pay_per_project), 0) AS pay_per_project_sum
+    FROM {name}_per_skill
+    GROUP BY skill
+), {name}_histogram AS (
+    SELECT per_skill.skill, pays.field,
+           floor(ln(pays.pay::float8) / ln({PAY_BUCKET_RATIO}::float8))::integer AS bucket,
+           sum(per_skill.sign) AS projects
+    FROM {name}_per_skill AS per_skill
+    CROSS JOIN LATERAL (
+        VALUES ('pay_per_hour', per_skill.pay_per_hour), ('pay_per_project', per_skill.pay_per_project)
+    ) AS pays (field, pay)
+    WHERE pays.pay > 0
+    GROUP BY 1, 2, 3
+), {name}_statuses AS (
+    SELECT project_status, sum(sign) AS projects
+    FROM {name}_source
+    WHERE project_status IS NOT NULL
+    GROUP BY project_status
+)"""
+
+
+def _add_to_summary(skills: str, histogram: str, statuses: str) -> str:
+    """CTEs adding each non-zero row of the named CTEs onto the summary tables"""
+    return f""", skill_rows AS (
+    INSERT INTO project_skill_stats AS stats (
+        skill, projects, pay_per_hour_count, pay_per_hour_sum, pay_per_project_count, pay_per_project_sum
+    )
+    SELECT skill, projects, pay_per_hour_count, pay_per_hour_sum, pay_per_project_count, pay_per_project_sum
+    FROM {skills}
+    WHERE (projects, pay_per_hour_count, pay_per_hour_sum, pay_per_project_count, pay_per_project_sum)
+          <> (0, 0, 0, 0, 0)
+    ON CONFLICT (skill) DO UPDATE SET
+        projects = stats.projects + excluded.projects,
+        pay_per_hour_count = stats.pay_per_hour_count + excluded.pay_per_hour_count,
+        pay_per_hour_sum = stats.pay_per_hour_sum + excluded.pay_per_hour_sum,
+        pay_per_project_count = stats.pay_per_project_count + excluded.pay_per_project_count,
+        pay_per_project_sum = stats.pay_per_project_sum + excluded.pay_per_project_sum
+), histogram_rows AS (
+    INSERT INTO project_pay_histogram AS histogram (skill, field, bucket, projects)
+    SELECT skill, field, bucket, projects
+    FROM {histogram}
+    WHERE projects <> 0
+    ON CONFLICT (skill, field, bucket) DO UPDATE SET projects = histogram.projects + excluded.projects
+), status_rows AS (
+    INSERT INTO project_status_counts AS counts (project_status, projects)
+    SELECT project_status, projects
+    FROM {statuses}
+    WHERE projects <> 0
+    ON CONFLICT (project_status) DO UPDATE SET projects = counts.projects + excluded.projects
+)"""
+
+
+# Per summary row: the fix to add, recount minus stored, and whether the row
+# is off by more than the pending log rows account for
+_FIXES_SQL = """, skill_fixes AS (
+    SELECT skill,
+           coalesce(sum(projects) FILTER (WHERE origin <> 'pending'), 0) AS projects,
+           coalesce(sum(pay_per_hour_count) FILTER (WHERE origin <> 'pending'), 0) AS pay_per_hour_count,
+           coalesce(sum(pay_per_hour_sum) FILTER (WHERE origin <> 'pending'), 0) AS pay_per_hour_sum,
+           coalesce(sum(pay_per_project_count) FILTER (WHERE origin <> 'pending'), 0) AS pay_per_project_count,
+           coalesce(sum(pay_per_project_sum) FILTER (WHERE origin <> 'pending'), 0) AS pay_per_project_sum,
+           (sum(projects), sum(pay_per_hour_count), sum(pay_per_hour_sum),
+            sum(pay_per_project_count), sum(pay_per_project_sum)) <> (0, 0, 0, 0, 0) AS drifted
+    FROM (
+        SELECT 'counted' AS origin, * FROM counted_skills
+        UNION ALL
+        SELECT 'stored', skill, -projects, -pay_per_hour_count, -pay_per_hour_sum,
+               -pay_per_project_count, -pay_per_project_sum
+        FROM project_skill_stats
+        UNION ALL
+        SELECT 'pending', skill, -projects, -pay_per_hour_count, -pay_per_hour_sum,
+               -pay_per_project_count, -pay_per_project_sum
+        FROM pending_skills
+    ) AS rows
+    GROUP BY skill
+), histogram_fixes AS (
+    SELECT skill, field, bucket,
+           coalesce(sum(projects) FILTER (WHERE origin <> 'pending'), 0) AS projects,
+           sum(projects) <> 0 AS drifted
+    FROM (
+        SELECT 'counted' AS origin, * FROM counted_histogram
+        UNION ALL
+        SELECT 'stored', skill, field, bucket, -projects FROM project_pay_histogram
+        UNION ALL
+        SELECT 'pending', skill, field, bucket, -projects FROM pending_histogram
+    ) AS rows
+    GROUP BY skill, field, bucket
+), status_fixes AS (
+    SELECT project_status,
+           coalesce(sum(projects) FILTER (WHERE origin <> 'pending'), 0) AS projects,
+           sum(projects) <> 0 AS drifted
+    FROM (
+        SELECT 'counted' AS origin, * FROM counted_statuses
+        UNION ALL
+        SELECT 'stored', project_status, -projects FROM project_status_counts
+        UNION ALL
+        SELECT 'pending', project_status, -projects FROM pending_statuses
+    ) AS rows
+    GROUP BY project_status
+)"""
+
+# FOR UPDATE: a concurrent update of the same project waits, then logs the
+# values this one committed rather than the ones both started from
+LOG_PROJECTS = text("""
+    INSERT INTO project_aggregate_log (sign, skill_required, project_status, pay_per_hour, pay_per_project)
+    SELECT :sign, skill_required, project_status, pay_per_hour, pay_per_project
+    FROM projects
+    WHERE project_id = ANY(:project_ids)
+    FOR UPDATE
+""").bindparams(bindparam("project_ids", type_=ARRAY(Integer)), bindparam("sign", type_=Integer))
+# Takes the log rows committed before it started; returns how many
+FOLD_LOG = text(
+    "WITH " + _contribution("pending", LOG_SOURCE)
+    + _add_to_summary("pending_skills", "pending_histogram", "pending_statuses")
+    + "\nSELECT count(*) FROM pending_source"
+)
+ADD_ALL_PROJECTS = text(
+    "WITH " + _contribution("counted", PROJECTS_SOURCE)
+    + _add_to_summary("counted_skills", "counted_histogram", "counted_statuses")
+    + "\nSELECT count(*) FROM counted_source"
+)
+# One statement, so the recount, the stored rows and the log rows it takes
+# all come from the same snapshot; the log rows are already in the recount.
+# Returns how many summary rows had drifted.
+RECONCILE = text(
+    "WITH " + _contribution("pending", LOG_SOURCE) + ", " + _contribution("counted", PROJECTS_SOURCE)
+    + _FIXES_SQL
+    + _add_to_summary("skill_fixes", "histogram_fixes", "status_fixes")
+    + """
+SELECT (SELECT count(*) FROM skill_fixes WHERE drifted)
+       + (SELECT count(*) FROM histogram_fixes WHERE drifted)
+       + (SELECT count(*) FROM status_fixes WHERE drifted)"""
+)
+
+
+async def log_projects_added(db: AsyncSession, project_ids: Sequence[int]):
+    """Log flushed projects for the aggregates, in the caller's transaction"""
+    await db.execute(LOG_PROJECTS, {"project_ids": list(project_ids), "sign": 1})
+
+
+async def log_projects_removed(db: AsyncSession, project_ids: Sequence[int]):
+    """Log projects leaving the aggregates, before they are changed or deleted.
+
+    Run it in the same transaction as the write; an update then calls
+    ``log_projects_added`` once the new values are flushed.
+    """
+    await db.execute(LOG_PROJECTS, {"project_ids": list(project_ids), "sign": -1})
+
+
+async def rebuild_aggregates(conn):
+    """Recount the summary tables from every project, with no writes running"""
+    await conn.execute(delete(ProjectAggregateLog))
+    for table in SUMMARY_TABLES:
+        await conn.execute(delete(table))
+    await conn.execute(ADD_ALL_PROJECTS)
+
+
+def _pay(count: int, total, median_bucket: Optional[int]) -> Optional[dict]:
+    if not count:
+        return None
+    return {
+        "projects": count,
+        "average": round(float(total) / count, 2),
+        # Geometric middle of the bucket holding the median
+        "median": round(PAY_BUCKET_RATIO ** (median_bucket + 0.5), 2) if median_bucket is not None else None,
+    }
+
+
+class MarketplaceAggregates:
+    """Open projects per skill, pay per skill and projects per status.
+
+    The numbers live in three small summary tables, so serving them never
+    needs a GROUP BY over ``projects``. Averages come from exact sums and
+    counts; medians from per-skill pay histograms with PAY_BUCKET_RATIO-wide
+    buckets.
+
+    Project writes do not touch the summary tables, where every write to a
+    popular skill would queue on the same row. Each one instead appends the
+    values it removes (sign -1) and adds (sign 1) to ``project_aggregate_log``
+    in its own transaction, and every ``fold_seconds`` one worker folds the
+    committed log rows into the tables and deletes them in one statement.
+
+    Each worker serves a snapshot of the tables, read again once it is older
+    than ``max_staleness_seconds`` less one fold interval, so a write shows
+    up within ``max_staleness_seconds``; one request reloads the snapshot
+    while the others wait for that read. Every ``reconcile_seconds`` the
+    tables are corrected against a recount of ``projects``, which repairs
+    drift from writes made outside the API, such as COPY loads or manual SQL.
+    """
+
+    def __init__(self, max_staleness_seconds: float, fold_seconds: float, reconcile_seconds: float):
+        self.max_staleness_seconds = max_staleness_seconds
+        self.fold_seconds = fold_seconds
+        self.reconcile_seconds = reconcile_seconds
+        self.snapshot_seconds = max(max_staleness_seconds - fold_seconds, 0)
+        self._body: Optional[bytes] = None
+        self._loaded_at = float("-inf")
+        self._lock = asyncio.Lock()
+        self.counters = Counter()
+
+    async def response_body(self, db: AsyncSession) -> bytes:
+        """The JSON snapshot, no older than snapshot_seconds"""
+        if time.monotonic() - self._loaded_at < self.snapshot_seconds:
+            self.counters["hits"] += 1
+            return self._body
+        async with self._lock:
+            if time.monotonic() - self._loaded_at >= self.snapshot_seconds:
+                self._body = await self._load(db)
+                self._loaded_at = time.monotonic()
+                self.counters["loads"] += 1
+        return self._body
+
+    async def _load(self, db: AsyncSession) -> bytes:
+        as_of = datetime.now(timezone.utc)
+        ranked = select(
+            ProjectPayHistogram.skill,
+            ProjectPayHistogram.field,
+            ProjectPayHistogram.bucket,
+            func.sum(ProjectPayHistogram.projects).over(
+                partition_by=(ProjectPayHistogram.skill, ProjectPayHistogram.field),
+                order_by=ProjectPayHistogram.bucket
+            ).label("running"),
+            func.sum(ProjectPayHistogram.projects).over(
+                partition_by=(ProjectPayHistogram.skill, ProjectPayHistogram.field)
+            ).label("total"),
+        ).where(ProjectPayHistogram.projects > 0).subquery()
+        # First bucket per (skill, field) that reaches half of its projects
+        medians = {
+            (row.skill, row.field): row.bucket
+            for row in (await db.execute(
+                select(ranked.c.skill, ranked.c.field, ranked.c.bucket)
+                .distinct(ranked.c.skill, ranked.c.field)
+                .where(ranked.c.running * 2 >= ranked.c.total)
+                .order_by(ranked.c.skill, ranked.c.field, ranked.c.bucket)
+            )).all()
+        }
+        skills = (await db.execute(
+            select(*ProjectSkillStats.__table__.columns)
+            .where(ProjectSkillStats.projects > 0)
+            .order_by(ProjectSkillStats.projects.desc(), ProjectSkillStats.skill)
+        )).all()
+        statuses = (await db.execute(
+            select(ProjectStatusCounts.project_status, ProjectStatusCounts.projects)
+            .where(ProjectStatusCounts.projects > 0)
+        )).all()
+        return dumps({
+            "skills": [
+                {
+                    "skill": row.skill,
+                    "open_projects": row.projects,
+                    "pay_per_hour": _pay(
+                        row.pay_per_hour_count, row.pay_per_hour_sum, medians.get((row.skill, "pay_per_hour"))
+                    ),
+                    "pay_per_project": _pay(
+                        row.pay_per_project_count, row.pay_per_project_sum, medians.get((row.skill, "pay_per_project"))
+                    ),
+                }
+                for row in skills
+            ],
+            "project_status": {row.project_status: row.projects for row in statuses},
+            "open_projects": sum(row.projects for row in statuses),
+            "as_of": as_of,
+            "max_staleness_seconds": self.max_staleness_seconds,
+        })
+
+    async def fold(self) -> Optional[int]:
+        """Fold the committed log rows into the summary tables.
+
+        Returns how many log rows were folded, or None if another worker is
+        folding or reconciling.
+        """
+        async with engine.begin() as conn:
+            # Released at commit, once the folded rows are gone for the next holder
+            if not (await conn.execute(select(func.pg_try_advisory_xact_lock(AGGREGATES_LOCK_KEY)))).scalar():
+                return None
+            folded = (await conn.execute(FOLD_LOG)).scalar()
+        self.counters["folds"] += 1
+        self.counters["log_rows_folded"] += folded
+        return folded
+
+    async def reconcile(self) -> Optional[int]:
+        """Fold the log and correct the summary tables against a recount of every project.
+
+        Returns how many summary rows were off, or None if another worker
+        holds the tables. Folding waits while this runs, so for its duration
+        the numbers served can be older than max_staleness_seconds.
+        """
+        started = time.perf_counter()
+        async with engine.begin() as conn:
+            if not (await conn.execute(select(func.pg_try_advisory_xact_lock(AGGREGATES_LOCK_KEY)))).scalar():
+                return None
+            corrected = (await conn.execute(RECONCILE)).scalar()
+            for table in SUMMARY_TABLES:
+                await conn.execute(delete(table).where(table.c.projects == 0))
+        self.counters["reconciliations"] += 1
+        self.counters["rows_corrected"] += corrected
+        self.counters["last_reconcile_ms"] = round((time.perf_counter() - started) * 1000)
+        if corrected:
+            logger.warning(f"Aggregate reconciliation corrected {corrected} summary rows")
+        return corrected
+
+    async def run(self):
+        """Fold every fold_seconds and reconcile every reconcile_seconds for the life of the worker"""
+        loop = asyncio.get_running_loop()
+        reconcile_at = loop.time() + self.reconcile_seconds
+        while True:
+            await asyncio.sleep(self.fold_seconds)
+            try:
+                if loop.time() >= reconcile_at:
+                    reconcile_at = loop.time() + self.reconcile_seconds
+                    await self.reconcile()
+                else:
+                    await self.fold()
+            except Exception:
+                logger.exception("Aggregate fold failed")
+
+    def stats(self) -> dict:
+        return {
+            "snapshot_age_s": round(time.monotonic() - self._loaded_at, 1) if self._body is not None else None,
+            "max_staleness_seconds": self.max_staleness_seconds,
+            "fold_seconds": self.fold_seconds,
+            "reconcile_seconds": self.reconcile_seconds,
+            **self.counters,
+        }
+
+
+marketplace_aggregates = MarketplaceAggregates(
+    settings.AGGREGATES_MAX_STALENESS_SECONDS, settings.AGGREGATES_FOLD_SECONDS, settings.AGGREGATES_RECONCILE_SECONDS
+)
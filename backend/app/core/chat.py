@@ -0,0 +1,145 @@
+import asyncio
+import re
+import uuid
+from collections import Counter, OrderedDict, deque
+from datetime import datetime, timezone
+from typing import List, Optional, Set
+import orjson
+from app.core.config import settings
+from app.core.security import Principal
+from app.db.notify import MAX_PAYLOAD_BYTES, pg_notifier
+
+CHAT_CHANNEL = "chat"
+ROOM_NAME = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class ChatSubscriber:
+    """One socket's outgoing frames, drained by that socket's own sender task"""
+
+    __slots__ = ("queue", "dropped")
+
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = asyncio.Event()
+
+
+class ChatRoom:
+    __slots__ = ("history", "subscribers")
+
+    def __init__(self, history_size: int):
+        self.history: deque = deque(maxlen=history_size)
+        self.subscribers: Set[ChatSubscriber] = set()
+
+
+class ChatHub:
+    """Per-room fan-out of chat messages to this worker's sockets.
+
+    Each room keeps a ring buffer of its last CHAT_HISTORY_SIZE messages,
+    which new sockets receive on joining. A message is encoded once and the
+    same frame is queued for every socket in the room. Socket queues are
+    bounded: one that falls CHAT_SEND_QUEUE_SIZE frames behind is dropped
+    from the room, and its socket closed, rather than buffered without limit.
+    Chat messages cannot be merged, so the client reconnects with ``since``
+    set to the last message id it saw and gets what it missed from the ring
+    buffer.
+
+    Messages posted on this worker are delivered here directly and sent to
+    the other workers through Postgres NOTIFY.
+    """
+
+    def __init__(self, history_size: int, queue_size: int, max_rooms: int):
+        self.history_size = history_size
+        self.queue_size = queue_size
+        self.max_rooms = max_rooms
+        self._rooms: "OrderedDict[str, ChatRoom]" = OrderedDict()
+        self.counters = Counter()
+
+    def _room(self, name: str) -> ChatRoom:
+        room = self._rooms.get(name)
+        if room is None:
+            room = self._rooms[name] = ChatRoom(self.history_size)
+            if len(self._rooms) > self.max_rooms:
+                self._evict_idle_rooms()
+        self._rooms.move_to_end(name)
+        return room
+
+    def _evict_idle_rooms(self):
+        for name in [name for name, room in self._rooms.items() if not room.subscribers]:
+            if len(self._rooms) <= self.max_rooms:
+                break
+            del self._rooms[name]
+            self.counters["rooms_evicted"] += 1
+
+    def join(self, room_name: str) -> ChatSubscriber:
+        subscriber = ChatSubscriber(self.queue_size)
+        self._room(room_name).subscribers.add(subscriber)
+        return subscriber
+
+    def leave(self, room_name: str, subscriber: ChatSubscriber):
+        room = self._rooms.get(room_name)
+        if room is not None:
+            room.subscribers.discard(subscriber)
+
+    def history(self, room_name: str, since: Optional[str] = None) -> List[dict]:
+        """Buffered messages, oldest first; only those after ``since`` if it is still buffered"""
+        room = self._rooms.get(room_name)
+        if room is None:
+            return []
+        messages = list(room.history)
+        if since is not None:
+            for index, message in enumerate(messages):
+                if message["id"] == since:
+                    return messages[index + 1:]
+        return messages
+
+    def post(self, room_name: str, principal: Principal, text: str) -> dict:
+        """Deliver a message here and send it to the other workers.
+
+        Raises ValueError, delivering nothing, if it would not fit one NOTIFY payload.
+        """
+        message = {
+            "id": uuid.uuid4().hex,
+            "room": room_name,
+            "user_id": principal.id,
+            "user_name": principal.name or principal.email,
+            "avatar": principal.profile_pic_url,
+            "message": text,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+        payload = orjson.dumps(message)
+        if len(payload) > MAX_PAYLOAD_BYTES:
+            # Escaping and the other fields can push text under CHAT_MAX_MESSAGE_BYTES past
+            # one NOTIFY; refuse it before any socket here sees what other workers never would
+            self.counters["rejected_too_large"] += 1
+            raise ValueError(f"Encoded chat message exceeds {MAX_PAYLOAD_BYTES} bytes")
+        self.deliver(message)
+        pg_notifier.publish(CHAT_CHANNEL, payload.decode())
+        return message
+
+    def deliver(self, message: dict):
+        """Append to the room's history and queue the frame for every socket in the room"""
+        room = self._room(message["room"])
+        room.history.append(message)
+        frame = orjson.dumps({"type": "message", **message}).decode()
+        queued = 0
+        for subscriber in list(room.subscribers):
+            try:
+                subscriber.queue.put_nowait(frame)
+                queued += 1
+            except asyncio.QueueFull:
+                room.subscribers.discard(subscriber)
+                subscriber.dropped.set()
+                self.counters["slow_consumers_dropped"] += 1
+        self.counters["messages"] += 1
+        self.counters["frames_queued"] += queued
+
+    def stats(self) -> dict:
+        return {
+            "rooms": len(self._rooms),
+            "sockets": sum(len(room.subscribers) for room in self._rooms.values()),
+            **self.counters,
+        }
+
+
+chat_hub = ChatHub(settings.CHAT_HISTORY_SIZE, settings.CHAT_SEND_QUEUE_SIZE, settings.CHAT_MAX_ROOMS)
+pg_notifier.subscribe(CHAT_CHANNEL, lambda payload: chat_hub.deliver(orjson.loads(payload)))
@@ -1,4 +1,5 @@
 import os
+from typing import List, Optional
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 
@@ -10,20 +11,140 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS512"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Set when DATABASE_URL points at PgBouncer in transaction pooling mode
+    # (e.g. Supabase's pooler on port 6543); see backend/README.md
+    DATABASE_PGBOUNCER: bool = False
+    # Pooled connections opened (with the hot statements prepared) at startup
+    DATABASE_WARM_CONNECTIONS: int = 5
+
+    # SQL telemetry; DATABASE_ECHO logs every statement and is for local debugging only
+    DATABASE_ECHO: bool = False
+    SQL_SLOW_QUERY_MS: float = 200
+    SQL_SLOW_QUERY_LOG_SIZE: int = 100  # recent slow queries and N+1 reports kept for /health/sql
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5  # runs of one statement in one request that get reported
+
+    # Read replicas: comma-separated URLs; empty means every read hits the primary
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_MAX_LAG_SECONDS: float = 5
+    REPLICA_LAG_CHECK_SECONDS: float = 2
+    REPLICA_RECEIVER_TIMEOUT_SECONDS: float = 60  # silent WAL receiver counts as down, as wal_receiver_timeout
+    READ_YOUR_WRITES_SECONDS: float = 10  # after a write the caller reads from the primary
+
+    # Uploads
+    PROFILE_PIC_MAX_BYTES: int = 2 * 1024 * 1024
+    MAX_REQUEST_BODY_BYTES: int = 3 * 1024 * 1024  # profile picture plus form fields
+    PROFILE_PIC_DIR: str = "uploads/profile_pic"
+    AVATAR_SIZES: List[int] = [64, 128, 512]  # square thumbnails, edge length in pixels
+    AVATAR_LIST_SIZE: int = 128  # variant linked from project listings
+    AVATAR_FORMAT: str = "webp"  # "webp" or "jpg"; both are always generated
+    IMAGE_WORKERS: int = 1
+
+    # Authenticated principal cache; claims-only skips the users lookup entirely
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60
+    AUTH_CLAIMS_ONLY: bool = False
+
+    # Read-through cache for the project read routes: "memory" is per worker,
+    # "redis" (needs the redis package) is shared by every worker
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_MAX_ENTRIES: int = 2048
+    RESPONSE_CACHE_TTL_SECONDS: float = 30
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Password hashing pool: "thread" or "process", and the queue depth past
+    # which login/signup answer 503 instead of piling up latency
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    PASSWORD_HASH_MAX_PENDING: int = 16
+    PASSWORD_HASH_NICE: int = 10  # OS niceness of the hashing workers
+
     # google authentication
     GOOGLE_CLIENT_ID: str = os.getenv("GOOGLE_CLIENT_ID")
     GOOGLE_CLIENT_SECRET: str = os.getenv("GOOGLE_CLIENT_SECRET")
     GOOGLE_REDIRECT_URI: str = "http://localhost:8000/api/oauth/auth/google/callback"
+    GOOGLE_METADATA_URL: str = "https://accounts.google.com/.well-known/openid-configuration"
 
     # Github authentication
     GITHUB_CLIENT_ID: str = os.getenv("GITHUB_CLIENT_ID")
     GITHUB_CLIENT_SECRET: str = os.getenv("GITHUB_CLIENT_SECRET")
     GITHUB_REDIRECT_URI: str = "http://localhost:8000/api/oauth/auth/github/callback"
+    GITHUB_OAUTH_BASE_URL: str = "https://github.com"  # point these two at stubs/oauth_provider.py offline
+    GITHUB_API_BASE_URL: str = "https://api.github.com"
+
+    # Discovery documents and JWKS survive restarts in this file; see backend/README.md
+    OAUTH_METADATA_CACHE_PATH: str = "cache/oauth_metadata.json"
+    OAUTH_METADATA_TTL_SECONDS: float = 24 * 3600
+    OAUTH_HTTP_TIMEOUT_SECONDS: float = 5.0
+    OAUTH_MAX_CONNECTIONS: int = 20
 
     # Twilio settings
     TWILIO_ACCOUNT_SID: str = os.getenv("TWILIO_ACCOUNT_SID")
     TWILIO_AUTH_TOKEN: str = os.getenv("TWILIO_AUTH_TOKEN")
     TWILIO_VERIFY_SID: str = os.getenv("TWILIO_VERIFY_SID")
+    TWILIO_VERIFY_BASE_URL: str = "https://verify.twilio.com"  # point at stubs/fake_twilio_verify.py offline
+    TWILIO_TIMEOUT_SECONDS: float = 5.0
+    TWILIO_MAX_RETRIES: int = 2
+    TWILIO_RETRY_BACKOFF_SECONDS: float = 0.2
+    TWILIO_MAX_CONNECTIONS: int = 20
     PHONE_VERIFICATION_REQUIRED: bool = True
+    PHONE_DEFAULT_REGION: str = "US"  # region assumed for numbers without a country code
+
+    # OTP admission control; "memory" for a single worker, "postgres" to share across workers
+    OTP_RATE_LIMIT_STORE: str = "memory"
+    OTP_SEND_PER_PHONE: int = 5
+    OTP_SEND_PER_IP: int = 20
+    OTP_SEND_WINDOW_SECONDS: int = 3600
+    OTP_CHECK_PER_PHONE: int = 10
+    OTP_CHECK_PER_IP: int = 50
+    OTP_CHECK_WINDOW_SECONDS: int = 600
+    OTP_RESEND_DEDUP_SECONDS: int = 30
+    TRUST_PROXY_HEADERS: bool = False  # honor X-Forwarded-For for the client IP
+    TRUSTED_PROXY_HOPS: int = 1  # proxies in front of the app that append to X-Forwarded-For
+
+    # Bulk import and export of projects
+    PROJECT_BULK_MAX_ITEMS: int = 1000
+    PROJECT_BULK_MAX_BYTES: int = 8 * 1024 * 1024
+    PROJECT_EXPORT_BATCH_SIZE: int = 1000  # rows per server-side cursor fetch
+
+    # Project recommendations
+    MATCHING_RECENCY_WEIGHT: float = 0.3
+    MATCHING_RECENCY_HALF_LIFE_DAYS: float = 14.0
+    MATCHING_REFRESH_SECONDS: int = 3600  # full rebuild; other workers' writes arrive over LISTEN/NOTIFY
+
+    # Project search: full-text ranking, with a pg_trgm fallback on project names for typos
+    SEARCH_FUZZY_MAX_DISTANCE: float = 0.5  # 1 - word_similarity; higher lets looser name matches through
+    SEARCH_SNIPPET_CHARS: int = 200  # length of the details snippet of a fallback match
+
+    # Marketplace aggregates: project writes are logged and folded into summary tables
+    AGGREGATES_FOLD_SECONDS: float = 1  # how often the log is folded in
+    AGGREGATES_MAX_STALENESS_SECONDS: float = 5  # bound on the served numbers, folding included
+    AGGREGATES_RECONCILE_SECONDS: float = 3600  # recount of all projects to correct drift
+
+    # LISTEN/NOTIFY fan-out between workers over one connection per worker. LISTEN
+    # needs a direct or session-mode connection: set DATABASE_LISTEN_URL when
+    # DATABASE_URL goes through PgBouncer in transaction mode
+    DATABASE_LISTEN_URL: str = ""
+    NOTIFY_OUTBOX_SIZE: int = 10000  # notifications queued while the connection is busy or down
+    NOTIFY_KEEPALIVE_SECONDS: float = 10
+
+    # WebSocket chat
+    CHAT_HISTORY_SIZE: int = 100  # recent messages kept per room
+    CHAT_SEND_QUEUE_SIZE: int = 256  # frames a socket may fall behind before it is dropped
+    CHAT_MAX_MESSAGE_BYTES: int = 4000  # UTF-8 text; the encoded message must also fit one NOTIFY
+    CHAT_MESSAGES_PER_SECOND: float = 5  # per socket, with bursts of up to CHAT_MESSAGE_BURST
+    CHAT_MESSAGE_BURST: int = 20
+    CHAT_MAX_ROOMS: int = 1000  # rooms without sockets are evicted past this, oldest first
+
+    # Live feed of new projects over server-sent events
+    PROJECT_FEED_BACKLOG_SIZE: int = 500  # recent projects kept for Last-Event-ID resume
+    PROJECT_FEED_QUEUE_SIZE: int = 100  # events a stream may fall behind before it is ended
+    PROJECT_FEED_KEEPALIVE_SECONDS: float = 15  # comment line sent on idle streams
+    PROJECT_FEED_RETRY_MS: int = 2000  # reconnect delay suggested to EventSource clients
+
+    # Presence: a user is online for PRESENCE_TTL_SECONDS after their last heartbeat
+    PRESENCE_TTL_SECONDS: float = 30
+    PRESENCE_TICK_SECONDS: float = 1.0  # expiry granularity; TTL / tick must stay under 254
+    PRESENCE_SYNC: bool = True  # share heartbeats between workers over LISTEN/NOTIFY
+    PRESENCE_QUERY_MAX_IDS: int = 1000
 
 settings = Settings()
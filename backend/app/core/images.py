@@ -0,0 +1,174 @@
+import asyncio
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence
+import anyio
+from PIL import Image, ImageOps, UnidentifiedImageError
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+from app.core.config import settings
+
+PROFILE_PIC_URL_PREFIX = "/static/profile_pics/"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# <sha256>.<ext> originals and <sha256>_<size>.<ext> derivatives; anything else
+# (older uuid uploads, OAuth avatars) is left alone
+CONTENT_ADDRESSED_NAME = re.compile(r"^(?P<digest>[0-9a-f]{64})(?:_(?P<size>\d+))?\.(?P<ext>jpg|png|webp)$")
+ORIGINAL_EXTENSIONS = ("jpg", "png")
+DERIVATIVE_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+# Refuse to decode anything bigger than a 40 megapixel photo
+Image.MAX_IMAGE_PIXELS = 40_000_000
+# Raised for uploads whose magic bytes pass but whose body does not decode
+UNREADABLE_IMAGE_ERRORS = (UnidentifiedImageError, Image.DecompressionBombError, SyntaxError)
+
+_image_executor: Optional[ProcessPoolExecutor] = None
+
+
+def variant_name(digest: str, size: int, extension: str) -> str:
+    return f"{digest}_{size}.{extension}"
+
+
+def _write_atomically(image: Image.Image, destination: Path, fmt: str, options: dict):
+    fd, temp_path = tempfile.mkstemp(dir=destination.parent, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as temp:
+            image.save(temp, fmt, **options)
+        os.replace(temp_path, destination)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def render_avatar_variants(source: str, sizes: Sequence[int]) -> List[str]:
+    """Write square WebP and JPEG thumbnails next to a content-addressed original.
+
+    Blocking and CPU-bound; runs in the image process pool. Variants that
+    already exist are skipped, since the name pins the content. Returns the
+    names of the files written.
+    """
+    source_path = Path(source)
+    digest = source_path.stem
+    missing = [
+        (size, extension)
+        for size in sorted(set(sizes), reverse=True)
+        for extension in DERIVATIVE_FORMATS
+        if not (source_path.parent / variant_name(digest, size, extension)).exists()
+    ]
+    if not missing:
+        return []
+
+    written = []
+    with Image.open(source_path) as original:
+        # JPEGs can be decoded at 1/2..1/8 scale, far cheaper than a full decode
+        largest = missing[0][0]
+        original.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        for size, extension in missing:
+            thumbnail = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+            fmt, options = DERIVATIVE_FORMATS[extension]
+            if fmt == "JPEG" and thumbnail.mode != "RGB":
+                background = Image.new("RGB", thumbnail.size, (255, 255, 255))
+                background.paste(thumbnail, mask=thumbnail.getchannel("A"))
+                thumbnail = background
+            name = variant_name(digest, size, extension)
+            _write_atomically(thumbnail, source_path.parent / name, fmt, options)
+            written.append(name)
+            # later, smaller sizes are resampled from this one instead of the original
+            image = thumbnail if thumbnail.mode == image.mode else image
+    return written
+
+
+def _lower_priority():
+    try:
+        os.nice(10)
+    except OSError:
+        pass
+
+
+def _get_image_executor() -> ProcessPoolExecutor:
+    global _image_executor
+    if _image_executor is None:
+        _image_executor = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS, initializer=_lower_priority)
+    return _image_executor
+
+
+def shutdown_image_executor():
+    global _image_executor
+    if _image_executor is not None:
+        _image_executor.shutdown(wait=False, cancel_futures=True)
+        _image_executor = None
+
+
+async def generate_avatar_variants(filename: str) -> List[str]:
+    """Render every configured avatar size for a stored upload off the event loop"""
+    source = Path(settings.PROFILE_PIC_DIR) / filename
+    return await asyncio.get_running_loop().run_in_executor(
+        _get_image_executor(), render_avatar_variants, str(source), tuple(settings.AVATAR_SIZES)
+    )
+
+
+def avatar_url(url: Optional[str], size: Optional[int] = None, extension: Optional[str] = None) -> Optional[str]:
+    """Point a stored profile picture URL at its thumbnail of the given size.
+
+    URLs that are not content-addressed uploads are returned unchanged.
+    """
+    if not url or not url.startswith(PROFILE_PIC_URL_PREFIX):
+        return url
+    match = CONTENT_ADDRESSED_NAME.match(url[len(PROFILE_PIC_URL_PREFIX):])
+    if match is None or match["size"]:
+        return url
+    name = variant_name(
+        match["digest"], size or settings.AVATAR_LIST_SIZE, extension or settings.AVATAR_FORMAT
+    )
+    return PROFILE_PIC_URL_PREFIX + name
+
+
+class ProfilePicFiles(StaticFiles):
+    """Static handler for content-addressed profile pictures.
+
+    A file's name is derived from its bytes, so the name itself is a strong
+    ETag and responses may be cached forever. Range requests are served by
+    FileResponse. A derivative that has not been rendered yet falls back to
+    the original rather than 404ing.
+    """
+
+    def file_response(self, full_path, stat_result, scope: Scope, status_code: int = 200) -> Response:
+        name = os.path.basename(full_path)
+        if CONTENT_ADDRESSED_NAME.match(name) is None:
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        response.headers["etag"] = f'"{name}"'
+        response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as e:
+            match = CONTENT_ADDRESSED_NAME.match(path)
+            if e.status_code != 404 or match is None or not match["size"]:
+                raise
+            for extension in ORIGINAL_EXTENSIONS:
+                original = f"{match['digest']}.{extension}"
+                full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, original)
+                if stat_result is not None:
+                    response = FileResponse(full_path, stat_result=stat_result)
+                    # short-lived: the real derivative should replace it soon
+                    response.headers["cache-control"] = "public, max-age=60"
+                    return response
+            raise
@@ -0,0 +1,273 @@
+import asyncio
+import logging
+import math
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import orjson
+from sqlalchemy import select
+from app.core.config import settings
+from app.db.database import async_session
+from app.db.models import Projects
+from app.db.notify import pg_notifier
+
+logger = logging.getLogger(__name__)
+
+# Index changes made by one worker, applied by the others
+MATCHING_CHANNEL = "project_matcher"
+# top_k scores the matched slots alone while they number under 1/ratio of all
+# slots, and switches to a pass over every slot past that
+DENSE_SCORING_RATIO = 8
+
+
+def normalize_skill(skill: str) -> str:
+    return skill.strip().lower()
+
+
+class _Posting:
+    """Growable int32 array of project slots for a single skill"""
+    __slots__ = ("slots", "size")
+
+    def __init__(self):
+        self.slots = np.empty(8, dtype=np.int32)
+        self.size = 0
+
+    def append(self, slot: int):
+        if self.size == len(self.slots):
+            self.slots = np.concatenate([self.slots, np.empty(len(self.slots), dtype=np.int32)])
+        self.slots[self.size] = slot
+        self.size += 1
+
+    def view(self) -> np.ndarray:
+        return self.slots[:self.size]
+
+
+class ProjectMatcher:
+    """In-memory inverted index from skill to project slots.
+
+    Each project gets a slot in a set of parallel NumPy arrays (project id,
+    creation time, liveness); each skill keeps an int32 posting list of slots.
+    Updates and deletes tombstone the old slot instead of rewriting postings,
+    and the index compacts itself once tombstones outnumber live slots.
+    Scoring only touches the postings of the caller's skills, so a lookup costs
+    in proportion to the projects sharing a skill with the caller, never to
+    every project.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._project_ids = np.zeros(capacity, dtype=np.int64)
+        self._created_at = np.zeros(capacity, dtype=np.float64)
+        self._live = np.zeros(capacity, dtype=bool)
+        self._used = 0
+        self._slot_by_project: Dict[int, int] = {}
+        self._skills_by_project: Dict[int, Tuple[str, ...]] = {}
+        self._postings: Dict[str, _Posting] = {}
+        self._document_frequency: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self._slot_by_project)
+
+    def _grow(self):
+        capacity = len(self._project_ids) * 2
+        self._project_ids = np.resize(self._project_ids, capacity)
+        self._created_at = np.resize(self._created_at, capacity)
+        live = np.zeros(capacity, dtype=bool)
+        live[:self._used] = self._live[:self._used]
+        self._live = live
+
+    def add(self, project_id: int, skills: Optional[Iterable[str]], created_at: Optional[datetime]):
+        """Insert a project, replacing any previous entry for the same id"""
+        normalized = tuple(sorted({normalize_skill(s) for s in skills or () if s and s.strip()}))
+        self._insert(project_id, normalized, created_at.timestamp() if created_at else time.time())
+
+    def _insert(self, project_id: int, skills: Tuple[str, ...], created_at: float):
+        self.remove(project_id)
+        if self._used == len(self._project_ids):
+            self._grow()
+        slot = self._used
+        self._used += 1
+        self._project_ids[slot] = project_id
+        self._created_at[slot] = created_at
+        self._live[slot] = True
+        for skill in skills:
+            posting = self._postings.get(skill)
+            if posting is None:
+                posting = self._postings[skill] = _Posting()
+            posting.append(slot)
+        self._document_frequency.update(skills)
+        self._slot_by_project[project_id] = slot
+        self._skills_by_project[project_id] = skills
+
+    def remove(self, project_id: int):
+        slot = self._slot_by_project.pop(project_id, None)
+        if slot is None:
+            return
+        self._live[slot] = False
+        self._document_frequency.subtract(self._skills_by_project.pop(project_id))
+        if self._used - len(self._slot_by_project) > max(len(self._slot_by_project), 1024):
+            self._compact()
+
+    def _compact(self):
+        live = [
+            (int(self._project_ids[slot]), float(self._created_at[slot]))
+            for slot in np.flatnonzero(self._live[:self._used])
+        ]
+        skills_by_project = self._skills_by_project
+        self.__init__(max(1024, 2 * len(live)))
+        for project_id, created_at in live:
+            self._insert(project_id, skills_by_project[project_id], created_at)
+
+    def top_k(
+        self,
+        skills: Iterable[str],
+        k: int = 10,
+        recency_weight: float = 0.3,
+        half_life_days: float = 14.0,
+        now: Optional[float] = None
+    ) -> List[Tuple[int, float]]:
+        """Return up to k (project_id, score) pairs, best first.
+
+        The overlap term is the IDF-weighted share of the caller's skills a
+        project asks for, so rare skills count for more than common ones. The
+        recency term halves every ``half_life_days``. Only projects sharing at
+        least one skill are ranked.
+        """
+        wanted = {normalize_skill(s) for s in skills if s and s.strip()}
+        live_count = max(len(self._slot_by_project), 1)
+        weights = {
+            skill: math.log1p(live_count / self._document_frequency[skill])
+            for skill in wanted
+            if self._document_frequency[skill] > 0
+        }
+        if not weights or k <= 0:
+            return []
+        total_weight = sum(weights.values())
+
+        postings = {skill: self._postings[skill].view() for skill in weights}
+        if sum(len(p) for p in postings.values()) * DENSE_SCORING_RATIO < self._used:
+            # Sum each matched slot's skill weights over the matched slots only
+            candidates, positions = np.unique(np.concatenate(list(postings.values())), return_inverse=True)
+            scores = np.bincount(positions, weights=np.concatenate([
+                np.full(len(posting), weights[skill]) for skill, posting in postings.items()
+            ]))
+        else:
+            # The postings cover much of the index: one pass over every slot beats sorting them
+            scores = np.zeros(self._used, dtype=np.float64)
+            for skill, posting in postings.items():
+                scores[posting] += weights[skill]
+            candidates = np.flatnonzero(scores)
+            scores = scores[candidates]
+        live = self._live[candidates]
+        candidates, scores = candidates[live], scores[live]
+        if not len(candidates):
+            return []
+
+        overlap = scores / total_weight
+        age_days = ((now or time.time()) - self._created_at[candidates]) / 86400.0
+        recency = np.exp2(-np.maximum(age_days, 0.0) / half_life_days)
+        combined = (1.0 - recency_weight) * overlap + recency_weight * recency
+
+        if len(candidates) > k:
+            best = np.argpartition(-combined, k - 1)[:k]
+        else:
+            best = np.arange(len(candidates))
+        best = best[np.argsort(-combined[best], kind="stable")]
+        return [(int(self._project_ids[candidates[i]]), float(combined[i])) for i in best]
+
+
+project_matcher = ProjectMatcher()
+# Mutations seen while a rebuild is streaming the table, replayed onto the new index
+_pending_changes: Optional[list] = None
+# False until the first full load; the worker serves other routes meanwhile
+_loaded = False
+
+
+def get_project_matcher() -> ProjectMatcher:
+    return project_matcher
+
+
+def project_matcher_loaded() -> bool:
+    return _loaded
+
+
+def _apply(change: str, project_id: int, skills: Optional[Iterable[str]], created_at: Optional[datetime]):
+    if change == "remove":
+        project_matcher.remove(project_id)
+    else:
+        project_matcher.add(project_id, skills, created_at)
+    if _pending_changes is not None:
+        _pending_changes.append((change, project_id, skills, created_at))
+
+
+def _publish(change: str, project_id: int, skills: Optional[Iterable[str]] = None, created_at: Optional[datetime] = None):
+    payload = orjson.dumps([
+        change, project_id, list(skills or ()), created_at.timestamp() if created_at else None
+    ]).decode()
+    try:
+        pg_notifier.publish(MATCHING_CHANNEL, payload)
+    except ValueError:
+        # Too many or too long skills for one NOTIFY; the periodic rebuild brings the others in line
+        logger.warning(f"Project {project_id} left out of the matcher sync: payload too large")
+
+
+def index_project(project_id: int, skills: Optional[Iterable[str]], created_at: Optional[datetime]):
+    """Record a created or updated project in this worker's matcher and send it to the others"""
+    _apply("add", project_id, skills, created_at)
+    _publish("add", project_id, skills, created_at)
+
+
+def unindex_project(project_id: int):
+    """Drop a deleted project from this worker's matcher and from the others'"""
+    _apply("remove", project_id, None, None)
+    _publish("remove", project_id)
+
+
+def receive_change(payload: str):
+    """Apply an index change another worker published"""
+    change, project_id, skills, created_at = orjson.loads(payload)
+    _apply(change, project_id, skills, datetime.fromtimestamp(created_at, timezone.utc) if created_at else None)
+
+
+async def rebuild_project_matcher():
+    """Load every project into a fresh index and swap it in"""
+    global project_matcher, _pending_changes, _loaded
+    matcher = ProjectMatcher()
+    _pending_changes = []
+    try:
+        async with async_session() as session:
+            result = await session.stream(
+                select(Projects.project_id, Projects.skill_required, Projects.created_at)
+                .execution_options(yield_per=5000)
+            )
+            async for row in result:
+                matcher.add(row.project_id, row.skill_required, row.created_at)
+        for change, project_id, skills, created_at in _pending_changes:
+            if change == "remove":
+                matcher.remove(project_id)
+            else:
+                matcher.add(project_id, skills, created_at)
+        project_matcher = matcher
+        _loaded = True
+    finally:
+        _pending_changes = None
+    logger.info(f"Project matcher loaded {len(matcher)} projects")
+
+
+async def refresh_project_matcher_periodically():
+    """Build the index once startup is done, then rebuild it on a timer.
+
+    Other workers' writes arrive as changes over MATCHING_CHANNEL; the rebuild
+    only catches what that missed, such as changes sent while this worker's
+    LISTEN connection was down or writes made outside the API.
+    """
+    while True:
+        try:
+            await rebuild_project_matcher()
+        except Exception as e:
+            logger.error(f"Project matcher refresh failed: {str(e)}")
+        await asyncio.sleep(settings.MATCHING_REFRESH_SECONDS)
+
+
+pg_notifier.subscribe(MATCHING_CHANNEL, receive_change)
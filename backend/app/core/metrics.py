@@ -0,0 +1,191 @@
+import asyncio
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds; Prometheus adds +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    """Fixed-bucket histogram; observing is a bisect and two additions.
+
+    Buckets are stored non-cumulatively and summed up only when rendered.
+    Like every collector here it is only touched from the event loop thread,
+    so it takes no locks.
+    """
+
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def lines(self, name: str, labels: str) -> List[str]:
+        prefix = f"{labels}," if labels else ""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+        cumulative += self.counts[-1]
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {cumulative}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {self.sum}")
+        lines.append(f"{name}_count{suffix} {cumulative}")
+        return lines
+
+
+def route_template(scope: Scope) -> str:
+    """The matched route's path template, e.g. ``/api/projects/{project_id}``.
+
+    Routes of included routers only know their path below the router's
+    prefix, so the prefix is taken back from the request path. Mounted apps
+    (static files) report their mount point; unrouted paths share one label.
+    """
+    route = scope.get("route")
+    if route is None:
+        return scope.get("root_path") or UNMATCHED_ROUTE
+    depth = route.path.count("/")
+    prefix = "/".join(scope["path"].split("/")[:-depth])
+    return prefix + route.path
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class AppMetrics:
+    """Request latency, status counts, in-flight requests and event-loop lag.
+
+    Metrics are per worker process; with several workers Prometheus scrapes
+    each one and the series are summed at query time.
+    """
+
+    def __init__(self):
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.responses: Counter = Counter()  # (method, route, status) -> count
+        self.in_flight = 0
+        self.loop_lag = 0.0
+        self.loop_lag_max = 0.0
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float):
+        histogram = self.latency.get((method, route))
+        if histogram is None:
+            histogram = self.latency[(method, route)] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(seconds)
+        self.responses[(method, route, status)] += 1
+
+    def render(self, pools: Dict[str, object], sql) -> str:
+        """Prometheus text exposition of these metrics, the pools' and the SQL totals"""
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by route template",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in self.latency.items():
+            lines += histogram.lines("http_request_duration_seconds", f'method="{method}",route="{_label(route)}"')
+        lines += [
+            "# HELP http_responses_total Responses by route template and status code",
+            "# TYPE http_responses_total counter",
+        ]
+        for (method, route, status), count in self.responses.items():
+            lines.append(f'http_responses_total{{method="{method}",route="{_label(route)}",status="{status}"}} {count}')
+        lines += [
+            "# HELP http_requests_in_flight Requests currently being served",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP event_loop_lag_seconds How late the last event-loop probe woke up",
+            "# TYPE event_loop_lag_seconds gauge",
+            f"event_loop_lag_seconds {self.loop_lag}",
+            "# HELP event_loop_lag_max_seconds Worst event-loop lag seen since startup",
+            "# TYPE event_loop_lag_max_seconds gauge",
+            f"event_loop_lag_max_seconds {self.loop_lag_max}",
+        ]
+
+        gauges = (
+            ("db_pool_size", "Connections the pool keeps open", lambda pool: pool.size()),
+            ("db_pool_checked_out", "Connections currently checked out", lambda pool: pool.checkedout()),
+            ("db_pool_checked_in", "Idle connections in the pool", lambda pool: pool.checkedin()),
+            ("db_pool_overflow", "Connections open beyond pool_size", lambda pool: max(pool.overflow(), 0)),
+        )
+        for name, help_text, read in gauges:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            lines += [f'{name}{{pool="{label}"}} {read(pool)}' for label, pool in pools.items()]
+        lines += [
+            "# HELP db_pool_checkout_wait_seconds Time spent waiting for a pooled connection",
+            "# TYPE db_pool_checkout_wait_seconds histogram",
+        ]
+        for label, pool in pools.items():
+            lines += pool.checkout_wait.lines("db_pool_checkout_wait_seconds", f'pool="{label}"')
+        lines += [
+            "# HELP db_pool_timeouts_total Checkouts that gave up after pool_timeout",
+            "# TYPE db_pool_timeouts_total counter",
+        ]
+        lines += [f'db_pool_timeouts_total{{pool="{label}"}} {pool.timeouts}' for label, pool in pools.items()]
+
+        lines += [
+            "# HELP db_statements_total SQL statements executed",
+            "# TYPE db_statements_total counter",
+            f"db_statements_total {sql.statements}",
+            "# HELP db_statement_seconds_total Time spent executing SQL statements",
+            "# TYPE db_statement_seconds_total counter",
+            f"db_statement_seconds_total {sql.total_seconds}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+app_metrics = AppMetrics()
+
+
+class MetricsMiddleware:
+    """Time every HTTP request and count it by route template and status.
+
+    Routes are labelled by their template rather than the raw path, so label
+    cardinality stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+        start = time.perf_counter()
+        app_metrics.in_flight += 1
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            app_metrics.in_flight -= 1
+            app_metrics.observe_request(scope["method"], route_template(scope), status, time.perf_counter() - start)
+
+
+async def monitor_event_loop_lag(interval: float = 0.5):
+    """Sleep ``interval`` in a loop and record how late each wake-up is"""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(loop.time() - started - interval, 0.0)
+        app_metrics.loop_lag = lag
+        app_metrics.loop_lag_max = max(app_metrics.loop_lag_max, lag)
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import httpx
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class OAuthHTTPClient:
+    """One keep-alive connection pool for the provider calls the app makes itself:
+    discovery documents, JWKS and the GitHub API. authlib opens a fresh client,
+    and with it a fresh TLS handshake, for every call it makes.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=settings.OAUTH_HTTP_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=settings.OAUTH_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OAUTH_MAX_CONNECTIONS,
+                ),
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+oauth_http = OAuthHTTPClient()
+
+
+class ProviderMetadataCache:
+    """OpenID discovery documents and their JWKS, kept for a TTL in memory and on disk.
+
+    A worker that restarts within the TTL reads both from the cache file and
+    makes no discovery request at all. Past the TTL the stale copy keeps
+    serving while one background task refetches it. A key rotated before
+    then is still picked up: authlib refetches the JWKS itself when an ID
+    token names a key id it does not know.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float):
+        self._path = Path(path)
+        self._ttl = ttl_seconds
+        # url -> {"fetched_at", "metadata", "jwks"}; fetched_at is wall-clock so it survives restarts
+        self._entries: Dict[str, dict] = {}
+        self._disk_loaded = False
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    def _load_from_disk(self):
+        self._disk_loaded = True
+        try:
+            entries = json.loads(self._path.read_text())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable OAuth metadata cache {self._path}: {str(e)}")
+            return
+        for url, entry in entries.items():
+            self._entries.setdefault(url, entry)
+
+    def _save(self):
+        """Write every entry atomically, so a crash mid-write cannot leave a torn file"""
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self._path.parent, prefix=f".{self._path.name}.")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp, self._path)
+        except OSError as e:
+            logger.warning(f"Could not write OAuth metadata cache {self._path}: {str(e)}")
+            Path(tmp).unlink(missing_ok=True)
+
+    async def _fetch(self, url: str) -> dict:
+        client = oauth_http.client
+        response = await client.get(url)
+        response.raise_for_status()
+        metadata = response.json()
+        jwks = None
+        if metadata.get("jwks_uri"):
+            response = await client.get(metadata["jwks_uri"])
+            response.raise_for_status()
+            jwks = response.json()
+        entry = self._entries[url] = {"fetched_at": time.time(), "metadata": metadata, "jwks": jwks}
+        await asyncio.to_thread(self._save)
+        return entry
+
+    async def _refresh_in_background(self, url: str):
+        try:
+            await self._fetch(url)
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning(f"Refreshing OAuth metadata from {url} failed, serving the cached copy: {str(e)}")
+        finally:
+            self._refreshing.pop(url, None)
+
+    async def get(self, url: str) -> dict:
+        if not self._disk_loaded:
+            self._load_from_disk()
+        entry = self._entries.get(url)
+        if entry is None:
+            # Cold: concurrent callers wait on one fetch instead of each making their own
+            async with self._locks.setdefault(url, asyncio.Lock()):
+                entry = self._entries.get(url) or await self._fetch(url)
+        elif time.time() - entry["fetched_at"] > self._ttl and url not in self._refreshing:
+            self._refreshing[url] = asyncio.create_task(self._refresh_in_background(url))
+        return entry
+
+    async def apply(self, app, url: str):
+        """Hand an authlib client the cached metadata and JWKS, so it never fetches them itself"""
+        entry = await self.get(url)
+        if app.server_metadata.get("_loaded_at") != entry["fetched_at"]:
+            app.server_metadata.update(entry["metadata"], _loaded_at=entry["fetched_at"])
+            if entry["jwks"] is not None:
+                app.server_metadata["jwks"] = entry["jwks"]
+
+
+provider_metadata = ProviderMetadataCache(settings.OAUTH_METADATA_CACHE_PATH, settings.OAUTH_METADATA_TTL_SECONDS)
+
+
+async def fetch_github_profile(access_token: str) -> Tuple[dict, List[dict]]:
+    """The GitHub user and their email addresses, fetched concurrently"""
+    base_url = settings.GITHUB_API_BASE_URL.rstrip("/")
+    headers = {"Authorization": f"Bearer {access_token}", "Accept": "application/vnd.github+json"}
+    user, emails = await asyncio.gather(
+        oauth_http.client.get(f"{base_url}/user", headers=headers),
+        oauth_http.client.get(f"{base_url}/user/emails", headers=headers),
+    )
+    user.raise_for_status()
+    emails.raise_for_status()
+    return user.json(), emails.json()
@@ -0,0 +1,55 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+from fastapi import HTTPException, status
+
+# projects.project_id is a Postgres integer; a larger id would fail in the query
+MAX_PROJECT_ID = 2 ** 31 - 1
+
+
+def _project_id(value) -> int:
+    project_id = int(value)
+    if not 0 <= project_id <= MAX_PROJECT_ID:
+        raise ValueError(project_id)
+    return project_id
+
+
+def encode_cursor(created_at: datetime, project_id: int) -> str:
+    """Encode a (created_at, project_id) keyset position into an opaque cursor"""
+    raw = json.dumps([created_at.isoformat(), project_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor, raising 400 if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, project_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), _project_id(project_id)
+    except (ValueError, TypeError, OverflowError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def encode_search_cursor(mode: str, score: float, project_id: int) -> str:
+    """Encode a search keyset position: the ranking mode, the row's score and its id"""
+    raw = json.dumps([mode, score, project_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> Tuple[str, float, int]:
+    """Decode a cursor produced by encode_search_cursor, raising 400 if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        mode, score, project_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if mode not in ("fulltext", "fuzzy"):
+            raise ValueError(mode)
+        return mode, float(score), _project_id(project_id)
+    except (ValueError, TypeError, OverflowError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import math
+from array import array
+from collections import Counter
+from typing import Iterable, List
+from app.core.config import settings
+from app.db.notify import pg_notifier
+
+logger = logging.getLogger(__name__)
+
+PRESENCE_CHANNEL = "presence"
+# Ids per NOTIFY: up to 11 characters each, comma separated, stays under MAX_PAYLOAD_BYTES
+SYNC_IDS_PER_PAYLOAD = 600
+
+
+class PresenceRegistry:
+    """Who is online, keyed by ``User.id``.
+
+    A user is online for ``ttl_seconds`` after their last heartbeat, rounded
+    up to the next tick. Expiry runs on a hashed timing wheel with one slot
+    per tick: a heartbeat appends the user's id to the slot of the tick it
+    now expires at, and each tick only looks at the ids in its own slot
+    rather than scanning every user.
+
+    User ids come from one serial, so the registry keeps a ``bytearray``
+    indexed by id holding each user's slot + 1, or 0 while offline: one byte
+    per id, online or not, plus four per id in the wheel. A heartbeat that
+    moves a user to a later slot leaves the old entry behind instead of
+    searching for it; when a slot fires, ids whose byte no longer points at
+    it are skipped.
+
+    With ``sync``, heartbeats that moved a user and explicit leaves are
+    collected per tick and sent to the other workers in a few NOTIFYs, so
+    every worker answers for users whose heartbeats land elsewhere. A worker
+    that starts late learns about each user at their next heartbeat.
+    """
+
+    def __init__(self, ttl_seconds: float, tick_seconds: float, sync: bool = False):
+        self.tick_seconds = tick_seconds
+        self.ttl_ticks = max(1, math.ceil(ttl_seconds / tick_seconds))
+        # Never reuse a slot within one TTL; slot + 1 must fit in a byte
+        slots = self.ttl_ticks + 2
+        if slots > 255:
+            raise ValueError("PRESENCE_TTL_SECONDS / PRESENCE_TICK_SECONDS must be under 254")
+        self._wheel: List[array] = [array("i") for _ in range(slots)]
+        self._slot_of = bytearray()
+        self._tick = 0
+        self._point_at_expiry_slot()
+        self.online_count = 0
+        self.heartbeats = 0
+        self.sync = sync
+        self._arrived: List[int] = []
+        self._departed: List[int] = []
+        self.counters = Counter()
+
+    def _point_at_expiry_slot(self):
+        """Heartbeats during the current tick expire a full TTL after its end"""
+        slot = (self._tick + self.ttl_ticks + 1) % len(self._wheel)
+        self._expiry_marker = slot + 1
+        self._expiring = self._wheel[slot]
+
+    def _grow(self, user_id: int):
+        # At least double, so growing to the highest id stays amortized O(1)
+        self._slot_of.extend(bytes(max(user_id + 1 - len(self._slot_of), len(self._slot_of))))
+
+    def _touch(self, user_id: int) -> bool:
+        """Push a user's expiry to a full TTL from now; False if it already was"""
+        try:
+            current = self._slot_of[user_id]
+        except IndexError:
+            self._grow(user_id)
+            current = 0
+        if current == self._expiry_marker:
+            return False
+        if not current:
+            self.online_count += 1
+        self._slot_of[user_id] = self._expiry_marker
+        self._expiring.append(user_id)
+        return True
+
+    def _remove(self, user_id: int) -> bool:
+        if user_id < len(self._slot_of) and self._slot_of[user_id]:
+            self._slot_of[user_id] = 0
+            self.online_count -= 1
+            return True
+        return False
+
+    def heartbeat(self, user_id: int):
+        """Mark a user online for another TTL"""
+        # _touch inlined: this runs for every heartbeat of every user
+        self.heartbeats += 1
+        slot_of = self._slot_of
+        try:
+            current = slot_of[user_id]
+        except IndexError:
+            self._grow(user_id)
+            current = 0
+        if current == self._expiry_marker:
+            return  # already moved this tick, and shared if it was ours
+        if not current:
+            self.online_count += 1
+        slot_of[user_id] = self._expiry_marker
+        self._expiring.append(user_id)
+        if self.sync:
+            self._arrived.append(user_id)
+
+    def leave(self, user_id: int):
+        """Mark a user offline now, instead of when their TTL runs out"""
+        if self._remove(user_id) and self.sync:
+            self._departed.append(user_id)
+
+    def is_online(self, user_id: int) -> bool:
+        return 0 <= user_id < len(self._slot_of) and self._slot_of[user_id] != 0
+
+    def online(self, user_ids: Iterable[int]) -> List[int]:
+        """The given users that are online, in the order given"""
+        slot_of, size = self._slot_of, len(self._slot_of)
+        return [user_id for user_id in user_ids if 0 <= user_id < size and slot_of[user_id]]
+
+    def advance(self, tick: int):
+        """Expire everyone whose last tick is before ``tick``"""
+        steps = tick - self._tick
+        if steps <= 0:
+            return
+        slots = len(self._wheel)
+        expired = 0
+        for offset in range(1, min(steps, slots) + 1):
+            index = (self._tick + offset) % slots
+            marker = index + 1
+            slot_of = self._slot_of
+            for user_id in self._wheel[index]:
+                if slot_of[user_id] == marker:
+                    slot_of[user_id] = 0
+                    expired += 1
+            self._wheel[index] = array("i")
+        self._tick = tick
+        self._point_at_expiry_slot()
+        self.online_count -= expired
+        self.counters["expired"] += expired
+
+    def _flush(self):
+        """Send this tick's arrivals and departures to the other workers"""
+        for sign, user_ids in (("+", self._arrived), ("-", self._departed)):
+            for start in range(0, len(user_ids), SYNC_IDS_PER_PAYLOAD):
+                pg_notifier.publish(
+                    PRESENCE_CHANNEL, sign + ",".join(map(str, user_ids[start:start + SYNC_IDS_PER_PAYLOAD]))
+                )
+            self.counters["synced"] += len(user_ids)
+        self._arrived = []
+        self._departed = []
+
+    def receive(self, payload: str):
+        """Apply another worker's arrivals (``+1,2``) or departures (``-3``)"""
+        apply = self._touch if payload[0] == "+" else self._remove
+        for user_id in map(int, payload[1:].split(",")):
+            apply(user_id)
+
+    async def run(self):
+        """Advance the wheel every tick for the life of the worker"""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        while True:
+            await asyncio.sleep(self.tick_seconds - (loop.time() - started) % self.tick_seconds)
+            try:
+                self.advance(int((loop.time() - started) / self.tick_seconds))
+                if self.sync:
+                    self._flush()
+            except Exception:
+                logger.exception("Presence tick failed")
+
+    def stats(self) -> dict:
+        return {
+            "online": self.online_count,
+            "tracked_ids": len(self._slot_of),
+            "wheel_entries": sum(len(slot) for slot in self._wheel),
+            "ttl_ticks": self.ttl_ticks,
+            "tick_seconds": self.tick_seconds,
+            "heartbeats": self.heartbeats,
+            **self.counters,
+        }
+
+
+presence_registry = PresenceRegistry(
+    settings.PRESENCE_TTL_SECONDS, settings.PRESENCE_TICK_SECONDS, settings.PRESENCE_SYNC
+)
+if presence_registry.sync:
+    pg_notifier.subscribe(PRESENCE_CHANNEL, presence_registry.receive)
@@ -0,0 +1,171 @@
+import asyncio
+from collections import Counter, deque
+from typing import Dict, FrozenSet, List, Optional, Set
+import orjson
+from app.core.config import settings
+from app.core.responses import dumps
+from app.db.notify import MAX_PAYLOAD_BYTES, pg_notifier
+
+PROJECT_FEED_CHANNEL = "project_feed"
+# Room for the "<project_id>:<part>:<parts>:" prefix of a chunked notification
+CHUNK_BYTES = MAX_PAYLOAD_BYTES - 64
+# Sent when a resuming client may have missed projects: reload the dashboard, then keep listening
+RESET_FRAME = b"event: reset\ndata: {}\n\n"
+KEEPALIVE_FRAME = b": keepalive\n\n"
+
+
+class FeedEvent:
+    """A new project, with its SSE frame encoded once for every stream"""
+
+    __slots__ = ("id", "payment_type", "skills", "frame")
+
+    def __init__(self, item: dict):
+        self.id: int = item["project_id"]
+        self.payment_type: str = item["paymentType"]
+        self.skills: FrozenSet[str] = frozenset(item["skills"] or ())
+        self.frame = b"id: %d\nevent: project\ndata: %s\n\n" % (self.id, dumps(item))
+
+
+class FeedSubscriber:
+    """One stream's filter and its outgoing frames.
+
+    Filters behave like the dashboard's query string: ``skills`` match any
+    (or with ``all_skills``, all) of a project's skills, case-sensitively.
+    """
+
+    __slots__ = ("skills", "all_skills", "payment_type", "queue", "dropped")
+
+    def __init__(self, skills: Optional[List[str]], all_skills: bool, payment_type: Optional[str], queue_size: int):
+        self.skills = frozenset(skills or ())
+        self.all_skills = all_skills
+        self.payment_type = payment_type
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+    def wants(self, event: FeedEvent) -> bool:
+        if self.payment_type and event.payment_type != self.payment_type:
+            return False
+        if not self.skills:
+            return True
+        if self.all_skills:
+            return self.skills <= event.skills
+        return not self.skills.isdisjoint(event.skills)
+
+
+class ProjectFeed:
+    """Fan-out of newly created projects to this worker's SSE streams.
+
+    Projects are published with NOTIFY and every worker, the publishing one
+    included, takes them from its shared LISTEN connection, so all workers
+    see them in the same order and the streams themselves never touch the
+    database. The last PROJECT_FEED_BACKLOG_SIZE projects are kept in that
+    order for clients resuming with ``Last-Event-ID``, whichever worker they
+    reconnect to.
+
+    A stream that falls PROJECT_FEED_QUEUE_SIZE events behind is removed and
+    ended once it has sent what was queued; EventSource reconnects on its own
+    with the last id it received and catches up from the backlog.
+    """
+
+    def __init__(self, backlog_size: int, queue_size: int):
+        self.queue_size = queue_size
+        self._backlog: deque = deque(maxlen=backlog_size)
+        self._subscribers: Set[FeedSubscriber] = set()
+        self._partial: Dict[str, List[str]] = {}
+        self.counters = Counter()
+
+    def subscribe(
+            self,
+            skills: Optional[List[str]] = None,
+            all_skills: bool = False,
+            payment_type: Optional[str] = None
+    ) -> FeedSubscriber:
+        subscriber = FeedSubscriber(skills, all_skills, payment_type, self.queue_size)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: FeedSubscriber):
+        self._subscribers.discard(subscriber)
+
+    def replay(self, subscriber: FeedSubscriber, last_event_id: int) -> List[bytes]:
+        """Frames a client resuming after ``last_event_id`` missed, oldest first.
+
+        Call it right after ``subscribe``, with no await in between, so that
+        nothing is either missed or sent twice. Commits can land out of
+        project id order, so the backlog is resumed by position, not by id.
+        If the id is no longer in the backlog the client gets a reset event.
+        """
+        events = list(self._backlog)
+        for index, event in enumerate(events):
+            if event.id == last_event_id:
+                self.counters["resumed"] += 1
+                return [event.frame for event in events[index + 1:] if subscriber.wants(event)]
+        self.counters["resets"] += 1
+        return [RESET_FRAME]
+
+    def publish(self, items: List[dict]):
+        """NOTIFY every worker, this one included, of committed projects.
+
+        Items that do not fit in one NOTIFY payload, such as long multi-byte
+        details, are sent as consecutive ``<project_id>:<part>:<parts>:``
+        chunks and reassembled on arrival.
+        """
+        for item in items:
+            payload = dumps(item)
+            if len(payload) <= MAX_PAYLOAD_BYTES:
+                pg_notifier.publish(PROJECT_FEED_CHANNEL, payload.decode())
+                continue
+            chunks = []
+            while payload:
+                cut = min(CHUNK_BYTES, len(payload))
+                while cut < len(payload) and payload[cut] & 0xC0 == 0x80:
+                    cut -= 1  # keep multi-byte characters whole
+                chunks.append(payload[:cut].decode())
+                payload = payload[cut:]
+            for part, chunk in enumerate(chunks):
+                pg_notifier.publish(PROJECT_FEED_CHANNEL, f"{item['project_id']}:{part}:{len(chunks)}:{chunk}")
+
+    def receive(self, payload: str):
+        if payload.startswith("{"):
+            self.deliver(orjson.loads(payload))
+            return
+        # One publisher's chunks arrive in order, possibly interleaved with other notifications
+        project_id, part, parts, chunk = payload.split(":", 3)
+        if part == "0":
+            self._partial[project_id] = []
+        chunks = self._partial.get(project_id)
+        if chunks is None:
+            return
+        chunks.append(chunk)
+        if len(chunks) == int(parts):
+            del self._partial[project_id]
+            self.deliver(orjson.loads("".join(chunks)))
+
+    def deliver(self, item: dict):
+        """Add a new project to the backlog and queue it for every stream whose filter matches"""
+        event = FeedEvent(item)
+        self._backlog.append(event)
+        queued = 0
+        for subscriber in list(self._subscribers):
+            if not subscriber.wants(event):
+                continue
+            try:
+                subscriber.queue.put_nowait(event.frame)
+                queued += 1
+            except asyncio.QueueFull:
+                self._subscribers.discard(subscriber)
+                subscriber.dropped = True
+                self.counters["slow_consumers_dropped"] += 1
+        self.counters["projects"] += 1
+        self.counters["frames_queued"] += queued
+
+    def stats(self) -> dict:
+        return {
+            "streams": len(self._subscribers),
+            "backlog": len(self._backlog),
+            **self.counters,
+        }
+
+
+project_feed = ProjectFeed(settings.PROJECT_FEED_BACKLOG_SIZE, settings.PROJECT_FEED_QUEUE_SIZE)
+pg_notifier.subscribe(PROJECT_FEED_CHANNEL, project_feed.receive, own=True)
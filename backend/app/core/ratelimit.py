@@ -0,0 +1,197 @@
+import math
+import random
+import time
+from collections import Counter
+from typing import Dict, Optional, Tuple
+import phonenumbers
+from fastapi import HTTPException, Request, status
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from app.core.config import settings
+from app.db.database import engine
+from app.db.models import RateLimitClaim, RateLimitCounter
+
+
+def normalize_phone_number(raw: str) -> str:
+    """Normalize user input to E.164, assuming PHONE_DEFAULT_REGION without a country code"""
+    try:
+        number = phonenumbers.parse(raw.strip(), settings.PHONE_DEFAULT_REGION)
+    except phonenumbers.NumberParseException:
+        raise ValueError("Invalid phone number format")
+    if not phonenumbers.is_possible_number(number):
+        raise ValueError("Invalid phone number format")
+    return phonenumbers.format_number(number, phonenumbers.PhoneNumberFormat.E164)
+
+
+def client_ip(request: Request) -> str:
+    """The address TRUSTED_PROXY_HOPS proxies away, when proxy headers are trusted.
+
+    Each proxy appends the address it received the request from, so only the
+    rightmost TRUSTED_PROXY_HOPS entries of X-Forwarded-For were written by our
+    own proxies; anything left of them came from the client and can be forged.
+    """
+    if settings.TRUST_PROXY_HEADERS and settings.TRUSTED_PROXY_HOPS > 0:
+        forwarded = [
+            entry.strip() for header in request.headers.getlist("x-forwarded-for") for entry in header.split(",")
+        ]
+        forwarded = [entry for entry in forwarded if entry]
+        if forwarded:
+            return forwarded[-min(settings.TRUSTED_PROXY_HOPS, len(forwarded))]
+    return request.client.host if request.client else "unknown"
+
+
+class InMemoryRateLimitStore:
+    """Per-process counters; enough for a single worker"""
+
+    def __init__(self):
+        # (key, window_start) -> [count, expires_at]
+        self._counters: Dict[Tuple[str, int], list] = {}
+        self._claims: Dict[str, float] = {}
+        self._ops = 0
+
+    def _prune(self, now: float):
+        self._ops += 1
+        if self._ops % 1000:
+            return
+        self._claims = {key: exp for key, exp in self._claims.items() if exp > now}
+        self._counters = {key: entry for key, entry in self._counters.items() if entry[1] > now}
+
+    async def hit(self, key: str, window: int, now: float) -> Tuple[int, int]:
+        self._prune(now)
+        start = int(now // window * window)
+        entry = self._counters.setdefault((key, start), [0, start + 2 * window])
+        entry[0] += 1
+        previous = self._counters.get((key, start - window))
+        return entry[0], previous[0] if previous else 0
+
+    async def claim(self, key: str, ttl: float, now: float) -> bool:
+        if self._claims.get(key, 0) > now:
+            return False
+        self._claims[key] = now + ttl
+        return True
+
+    async def release(self, key: str):
+        self._claims.pop(key, None)
+
+
+class PostgresRateLimitStore:
+    """Counters in Postgres so every worker shares the same budget.
+
+    Each call is a single statement: an upsert that bumps the current window
+    and reads the previous one, or a conditional upsert for claims.
+    """
+
+    async def hit(self, key: str, window: int, now: float) -> Tuple[int, int]:
+        start = int(now // window * window)
+        bumped = (
+            insert(RateLimitCounter)
+            .values(key=key, window_start=start, count=1, expires_at=start + 2 * window)
+            .on_conflict_do_update(
+                index_elements=[RateLimitCounter.key, RateLimitCounter.window_start],
+                set_={"count": RateLimitCounter.count + 1}
+            )
+            .returning(RateLimitCounter.count)
+            .cte("bumped")
+        )
+        previous = (
+            select(RateLimitCounter.count)
+            .where(RateLimitCounter.key == key, RateLimitCounter.window_start == start - window)
+            .scalar_subquery()
+        )
+        async with engine.begin() as conn:
+            current, prev = (await conn.execute(
+                select(bumped.c.count, func.coalesce(previous, 0))
+            )).one()
+            if random.random() < 0.01:
+                await conn.execute(delete(RateLimitCounter).where(RateLimitCounter.expires_at < now))
+                await conn.execute(delete(RateLimitClaim).where(RateLimitClaim.expires_at < func.now()))
+        return current, prev
+
+    async def claim(self, key: str, ttl: float, now: float) -> bool:
+        expires_at = func.now() + func.make_interval(0, 0, 0, 0, 0, 0, ttl)
+        stmt = (
+            insert(RateLimitClaim)
+            .values(key=key, expires_at=expires_at)
+            .on_conflict_do_update(
+                index_elements=[RateLimitClaim.key],
+                set_={"expires_at": expires_at},
+                where=RateLimitClaim.expires_at <= func.now()
+            )
+            .returning(RateLimitClaim.key)
+        )
+        async with engine.begin() as conn:
+            return (await conn.execute(stmt)).first() is not None
+
+    async def release(self, key: str):
+        async with engine.begin() as conn:
+            await conn.execute(delete(RateLimitClaim).where(RateLimitClaim.key == key))
+
+
+class OtpAdmission:
+    """Admission control for OTP sends and checks.
+
+    Budgets are sliding windows (the previous fixed window weighted by how much
+    of it still overlaps) per normalized phone number and per client IP.
+    A resend for the same number inside OTP_RESEND_DEDUP_SECONDS is answered
+    as if sent, without calling Twilio again.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.counters = Counter()
+
+    async def _within(self, key: str, limit: int, window: int, now: float) -> Optional[int]:
+        """Count a hit; return None if allowed, else seconds until it would be"""
+        current, previous = await self.store.hit(key, window, now)
+        elapsed = (now % window) / window
+        if previous * (1 - elapsed) + current <= limit:
+            return None
+        return max(1, math.ceil(window - now % window))
+
+    def _reject(self, reason: str, retry_after: int):
+        self.counters[f"rejected_{reason}"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many verification requests. Please try again later",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    async def admit_send(self, phone_number: str, ip: str) -> bool:
+        """Return False if this send is a duplicate to skip; raise 429 if over budget"""
+        now = time.time()
+        if not await self.store.claim(f"otp:resend:{phone_number}", settings.OTP_RESEND_DEDUP_SECONDS, now):
+            self.counters["deduplicated_send"] += 1
+            return False
+        for reason, key, limit in (
+            ("send_ip", f"otp:send:ip:{ip}", settings.OTP_SEND_PER_IP),
+            ("send_phone", f"otp:send:phone:{phone_number}", settings.OTP_SEND_PER_PHONE),
+        ):
+            retry_after = await self._within(key, limit, settings.OTP_SEND_WINDOW_SECONDS, now)
+            if retry_after is not None:
+                await self.store.release(f"otp:resend:{phone_number}")
+                self._reject(reason, retry_after)
+        self.counters["admitted_send"] += 1
+        return True
+
+    async def send_failed(self, phone_number: str):
+        """Let the caller retry right away when the upstream send did not go through"""
+        await self.store.release(f"otp:resend:{phone_number}")
+
+    async def admit_check(self, phone_number: str, ip: str):
+        now = time.time()
+        for reason, key, limit in (
+            ("check_ip", f"otp:check:ip:{ip}", settings.OTP_CHECK_PER_IP),
+            ("check_phone", f"otp:check:phone:{phone_number}", settings.OTP_CHECK_PER_PHONE),
+        ):
+            retry_after = await self._within(key, limit, settings.OTP_CHECK_WINDOW_SECONDS, now)
+            if retry_after is not None:
+                self._reject(reason, retry_after)
+        self.counters["admitted_check"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counters)
+
+
+otp_admission = OtpAdmission(
+    PostgresRateLimitStore() if settings.OTP_RATE_LIMIT_STORE == "postgres" else InMemoryRateLimitStore()
+)
@@ -0,0 +1,152 @@
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+from urllib.parse import urlencode
+from fastapi import Request
+from fastapi.responses import Response
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCacheBackend:
+    """Per-worker LRU of serialized responses and an in-process version counter.
+
+    Only exact for a single worker: a write on one worker does not bump the
+    version seen by the others, whose entries then live until their TTL.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self._entries = TTLCache(max_entries, ttl)
+        self._versions: Dict[str, int] = {}
+
+    async def version(self, namespace: str) -> int:
+        return self._versions.get(namespace, 0)
+
+    async def bump(self, namespace: str):
+        self._versions[namespace] = self._versions.get(namespace, 0) + 1
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes):
+        self._entries.set(key, value)
+
+    def stats(self) -> Dict[str, int]:
+        stats = self._entries.stats()
+        return {"size": stats["size"], "max_size": stats["max_size"], "evictions": stats["evictions"]}
+
+    async def aclose(self):
+        pass
+
+
+class RedisCacheBackend:
+    """Responses and version counters in Redis, shared by every worker.
+
+    Entries expire after ``ttl``; bounding memory beyond that is left to the
+    server's ``maxmemory`` with an LRU eviction policy.
+    """
+
+    def __init__(self, url: str, ttl: float):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the redis package")
+        self._redis = redis.from_url(url)
+        self.ttl = ttl
+
+    async def version(self, namespace: str) -> int:
+        return int(await self._redis.get(f"version:{namespace}") or 0)
+
+    async def bump(self, namespace: str):
+        await self._redis.incr(f"version:{namespace}")
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: bytes):
+        await self._redis.set(key, value, px=int(self.ttl * 1000))
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+    async def aclose(self):
+        await self._redis.aclose()
+
+
+class VersionedResponseCache:
+    """Read-through cache of JSON response bodies, invalidated by version.
+
+    Every key embeds the namespace's current version, so bumping the version
+    after a committed write orphans all older pages at once; they are never
+    read again and age out of the LRU. Backend failures fall through to the
+    loader instead of failing the request.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get_or_load(self, namespace: str, key: str, load: Callable[[], Awaitable[bytes]]) -> tuple:
+        """Return (body, hit), calling ``load`` for the body on a miss"""
+        try:
+            versioned_key = f"{namespace}:v{await self.backend.version(namespace)}:{key}"
+            body = await self.backend.get(versioned_key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Response cache read failed: {str(e)}")
+            return await load(), False
+        if body is not None:
+            self.hits += 1
+            return body, True
+
+        self.misses += 1
+        body = await load()
+        try:
+            await self.backend.set(versioned_key, body)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Response cache write failed: {str(e)}")
+        return body, False
+
+    async def invalidate(self, namespace: str):
+        try:
+            await self.backend.bump(namespace)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Response cache invalidation failed: {str(e)}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": settings.RESPONSE_CACHE_BACKEND,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            **self.backend.stats(),
+        }
+
+
+def request_cache_key(request: Request) -> str:
+    """Path plus query string with parameters in a canonical order"""
+    return f"{request.url.path}?{urlencode(sorted(request.query_params.multi_items()))}"
+
+
+async def cached_json_response(
+        request: Request,
+        namespace: str,
+        load: Callable[[], Awaitable[bytes]]
+) -> Response:
+    """Serve the cached body for this request, or load, store and serve it"""
+    body, hit = await response_cache.get_or_load(namespace, request_cache_key(request), load)
+    return Response(content=body, media_type="application/json", headers={"X-Cache": "HIT" if hit else "MISS"})
+
+
+response_cache = VersionedResponseCache(
+    RedisCacheBackend(settings.REDIS_URL, settings.RESPONSE_CACHE_TTL_SECONDS)
+    if settings.RESPONSE_CACHE_BACKEND == "redis"
+    else MemoryCacheBackend(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_TTL_SECONDS)
+)
@@ -0,0 +1,24 @@
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+
+# UTC datetimes end in "Z", matching what Pydantic's serializer emitted before
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(content: Any) -> bytes:
+    """Encode plain dicts/lists (datetimes included) to JSON bytes in one pass"""
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """App-wide default response class, rendering with orjson.
+
+    Routes on hot paths build plain dicts and return this response themselves,
+    so their payload is encoded exactly once: no Pydantic model is built for
+    it and FastAPI does not re-validate it against ``response_model``, which
+    is kept only for the OpenAPI schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,13 +1,21 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
 from app.core.config import settings
+from app.core.cache import TTLCache
 from pydantic import BaseModel, EmailStr
 from fastapi import HTTPException, Depends, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.db.database import get_db
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from app.db.database import async_session, get_read_db
 from app.db.models import User
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -18,6 +26,71 @@ def verify_password(plain_password: str, hashed_password: str):
 def get_password_hash(password: str):
     return pwd_context.hash(password)
 
+# bcrypt burns hundreds of milliseconds of CPU per call, so the async handlers
+# run it on a bounded pool and shed load once too many calls are waiting.
+_password_executor: Optional[Executor] = None
+_password_calls_pending = 0
+
+def _lower_worker_priority(niceness: int):
+    """Deprioritize a hashing worker so the event loop wins any CPU contention"""
+    try:
+        # On Linux the thread id addresses just this worker thread (or process)
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), niceness)
+    except (AttributeError, OSError):
+        pass
+
+def _get_password_executor() -> Executor:
+    global _password_executor
+    if _password_executor is None:
+        workers = settings.PASSWORD_HASH_WORKERS or min(4, os.cpu_count() or 1)
+        initargs = (settings.PASSWORD_HASH_NICE,)
+        if settings.PASSWORD_HASH_EXECUTOR == "process":
+            _password_executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=_lower_worker_priority, initargs=initargs
+            )
+        else:
+            _password_executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="password-hash",
+                initializer=_lower_worker_priority, initargs=initargs
+            )
+    return _password_executor
+
+def shutdown_password_executor():
+    global _password_executor
+    if _password_executor is not None:
+        _password_executor.shutdown(wait=False, cancel_futures=True)
+        _password_executor = None
+
+def ensure_password_capacity():
+    """Raise 503 if the hashing pool is saturated.
+
+    Handlers call this before doing any other work so a login storm is shed
+    without spending database round-trips on requests that would be refused.
+    """
+    if _password_calls_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many authentication requests. Please try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+async def _run_password_call(fn, *args):
+    global _password_calls_pending
+    ensure_password_capacity()
+    _password_calls_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_password_executor(), fn, *args)
+    finally:
+        _password_calls_pending -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the hashing pool; raises 503 when the pool is saturated"""
+    return await _run_password_call(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the hashing pool; raises 503 when the pool is saturated"""
+    return await _run_password_call(get_password_hash, password)
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -28,18 +101,87 @@ class PasswordReset(BaseModel):
     reset_token: str
     new_password: str
 
+def principal_claims(user: User) -> dict:
+    """Claims to sign into access tokens so claims-only auth can skip the DB"""
+    return {"user_id": str(user.id), "role": user.role}
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller, detached from any database session"""
+    id: int
+    email: Optional[str] = None
+    role: Optional[str] = None
+    name: Optional[str] = None
+    phone_number: Optional[str] = None
+    profile_pic_url: Optional[str] = None
+    is_active: bool = True
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            name=user.name,
+            phone_number=user.phone_number,
+            profile_pic_url=user.profile_pic_url,
+            is_active=user.is_active,
+        )
+
+# Token subject -> Principal, so authenticated requests skip the users lookup
+principal_cache = TTLCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+def invalidate_principal(subject: Optional[str]):
+    """Drop the cached principal for a token subject (email or phone number)"""
+    if subject:
+        principal_cache.invalidate(subject)
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_principals(session, flush_context):
+    subjects = session.info.setdefault("principal_subjects", set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            state = inspect(obj)
+            for attr in ("email", "phone_number"):
+                history = state.attrs[attr].history
+                subjects.update(history.deleted or ())
+                subjects.update(history.unchanged or ())
+                subjects.update(history.added or ())
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_principals(session):
+    for subject in session.info.pop("principal_subjects", ()):
+        invalidate_principal(subject)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_principals(session):
+    session.info.pop("principal_subjects", None)
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_read_db)
+) -> Principal:
+    return await authenticate_token(token, db)
+
+async def authenticate_token(token: Optional[str], db: AsyncSession) -> Principal:
+    """The principal a bearer token belongs to, or 401.
+
+    Shared by get_current_user and connections that cannot use the
+    dependency, like WebSocket handshakes.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    if not token:
+        raise credentials_exception
     try:
         payload = jwt.decode(
             token,
@@ -51,12 +193,30 @@ async def get_current_user(
             raise credentials_exception
     except JWTError:
         raise credentials_exception
+
+    # Claims-only mode trusts the signed user id and role and never hits the DB
+    if settings.AUTH_CLAIMS_ONLY and payload.get("user_id"):
+        return Principal(
+            id=int(payload["user_id"]),
+            email=username if "@" in username else None,
+            role=payload.get("role")
+        )
+
+    principal = principal_cache.get(username)
+    if principal is not None:
+        return principal
         
     user = await db.execute(
         select(User).where(User.email == username)
     )
     user = user.scalar()
+    if user is None and db.info.get("replica"):
+        # the account may be newer than what the replica has replayed
+        async with async_session() as primary:
+            user = (await primary.execute(select(User).where(User.email == username))).scalar()
     
     if user is None:
         raise credentials_exception
-    return user
+    principal = Principal.from_user(user)
+    principal_cache.set(username, principal)
+    return principal
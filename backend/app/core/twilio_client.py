@@ -1,49 +1,113 @@
-from twilio.rest import Client
-from twilio.base.exceptions import TwilioRestException
-from app.core.config import settings
-import logging
-
-logger = logging.getLogger(__name__)
-
-class TwilioService:
-    def __init__(self):
-        self.client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
-        self.verify = self.client.verify.v2.services(settings.TWILIO_VERIFY_SID)
-
-    async def send_verification(self, phone_number: str) -> bool:
-        """Send verification code to phone number"""
-        try:
-            verification = self.verify.verifications.create(
-                to=phone_number,
-                channel="sms"
-            )
-            logger.info(f"Verification sent to {phone_number}: {verification.status}")
-            return verification.status == "pending"
-        except TwilioRestException as e:
-            logger.error(f"Twilio error: {str(e)}")
-            if e.code == 60200:
-                raise ValueError("Invalid phone number format")
-            elif e.code == 60203:
-                raise ValueError("Too many attempts. Please try again later")
-            raise ValueError("Failed to send verification code")
-
-    async def check_verification(self, phone_number: str, code: str) -> bool:
-        """Verify the code sent to phone number"""
-        try:
-            verification_check = self.verify.verification_checks.create(
-                to=phone_number,  # This should be in E.164 format (+1XXXXXXXXXX)
-                code=code
-            )
-            logger.info(f"Verification check response: {verification_check.status}")
-            return verification_check.status == "approved"
-        except TwilioRestException as e:
-            logger.error(f"Twilio error: {str(e)}")
-            if e.code == 60200:
-                raise ValueError("Invalid phone number")
-            elif e.code == 60202:
-                raise ValueError("Invalid verification code")
-            elif e.code == 60203:
-                raise ValueError("Max check attempts reached")
-            raise ValueError(f"Verification failed: {str(e)}")
-
-twilio_service = TwilioService()
+import asyncio
+import random
+from typing import Optional
+import httpx
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: the request was throttled or never reached Twilio's app tier
+RETRYABLE_STATUS = {429, 502, 503}
+
+
+class TwilioError(Exception):
+    """An error response from the Twilio API, carrying Twilio's error code"""
+
+    def __init__(self, code: Optional[int], message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class TwilioService:
+    """Async client for the Twilio Verify v2 REST API.
+
+    One keep-alive connection pool is shared by every request on the worker,
+    each call is bounded by TWILIO_TIMEOUT_SECONDS, and throttled or failed
+    connections are retried with full-jitter exponential backoff. Only
+    failures where Twilio never processed the request are retried, so a
+    retry cannot send a second SMS.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=f"{settings.TWILIO_VERIFY_BASE_URL.rstrip('/')}/v2/Services/{settings.TWILIO_VERIFY_SID}/",
+                auth=(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN),
+                timeout=settings.TWILIO_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=settings.TWILIO_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.TWILIO_MAX_CONNECTIONS,
+                ),
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _post(self, path: str, data: dict) -> dict:
+        """POST a form to the Verify API, returning the JSON body or raising TwilioError"""
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.post(path, data=data)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                if attempt >= settings.TWILIO_MAX_RETRIES:
+                    raise TwilioError(None, f"Could not reach Twilio: {str(e)}")
+            else:
+                if response.status_code not in RETRYABLE_STATUS or attempt >= settings.TWILIO_MAX_RETRIES:
+                    try:
+                        body = response.json()
+                    except ValueError:
+                        body = {}
+                    if response.is_error:
+                        raise TwilioError(body.get("code"), body.get("message", response.text))
+                    return body
+            await asyncio.sleep(random.uniform(0, settings.TWILIO_RETRY_BACKOFF_SECONDS * 2 ** attempt))
+            attempt += 1
+
+    async def send_verification(self, phone_number: str) -> bool:
+        """Send verification code to phone number"""
+        try:
+            verification = await self._post("Verifications", {"To": phone_number, "Channel": "sms"})
+            logger.info(f"Verification sent to {phone_number}: {verification.get('status')}")
+            return verification.get("status") == "pending"
+        except (TwilioError, httpx.HTTPError) as e:
+            logger.error(f"Twilio error: {str(e)}")
+            code = getattr(e, "code", None)
+            if code == 60200:
+                raise ValueError("Invalid phone number format")
+            elif code == 60203:
+                raise ValueError("Too many attempts. Please try again later")
+            raise ValueError("Failed to send verification code")
+
+    async def check_verification(self, phone_number: str, code: str) -> bool:
+        """Verify the code sent to phone number"""
+        try:
+            verification_check = await self._post(
+                "VerificationCheck",
+                {"To": phone_number, "Code": code}  # To should be in E.164 format (+1XXXXXXXXXX)
+            )
+            logger.info(f"Verification check response: {verification_check.get('status')}")
+            return verification_check.get("status") == "approved"
+        except (TwilioError, httpx.HTTPError) as e:
+            logger.error(f"Twilio error: {str(e)}")
+            error_code = getattr(e, "code", None)
+            if error_code == 60200:
+                raise ValueError("Invalid phone number")
+            elif error_code == 60202:
+                raise ValueError("Invalid verification code")
+            elif error_code == 60203:
+                raise ValueError("Max check attempts reached")
+            elif error_code == 20404:
+                raise ValueError("Verification code expired. Please request a new one")
+            raise ValueError(f"Verification failed: {str(e)}")
+
+
+twilio_service = TwilioService()
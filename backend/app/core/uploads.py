@@ -0,0 +1,117 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional, Tuple
+from fastapi import HTTPException, status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CHUNK_SIZE = 64 * 1024
+
+# Magic bytes -> canonical extension; the client's content_type is never trusted
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+)
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    for signature, extension in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    return None
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class UnsupportedUpload(Exception):
+    pass
+
+
+def save_content_addressed(source: BinaryIO, directory: Path, max_bytes: int) -> Tuple[str, bool]:
+    """Copy an upload into ``directory`` named by its SHA-256, in bounded chunks.
+
+    Blocking; run it in a worker thread. Returns the stored file name and
+    whether it was new. Raises UploadTooLarge as soon as the cap is crossed
+    and UnsupportedUpload if the magic bytes are not an allowed image type.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    extension = None
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as temp:
+            while chunk := source.read(CHUNK_SIZE):
+                if extension is None:
+                    extension = sniff_image_type(chunk)
+                    if extension is None:
+                        raise UnsupportedUpload()
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge()
+                digest.update(chunk)
+                temp.write(chunk)
+        if extension is None:
+            raise UnsupportedUpload()
+
+        filename = f"{digest.hexdigest()}.{extension}"
+        destination = directory / filename
+        if destination.exists():
+            os.unlink(temp_path)
+            return filename, False
+        os.replace(temp_path, destination)
+        return filename, True
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+class RequestSizeLimitMiddleware:
+    """Reject request bodies larger than ``max_bytes`` before they are spooled.
+
+    Declared Content-Length is checked up front; chunked bodies are counted as
+    they stream in, so an oversized upload is cut off instead of being written
+    to the multipart parser's temp file in full. ``path_limits`` overrides the
+    cap for specific paths, such as bulk imports.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int, path_limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        max_bytes = self.path_limits.get(scope["path"].rstrip("/"), self.max_bytes)
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > max_bytes:
+                return await self._reject(send)
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="Request body too large"
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    async def _reject(self, send: Send):
+        await send({
+            "type": "http.response.start",
+            "status": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            "headers": [(b"content-type", b"application/json")],
+        })
+        await send({"type": "http.response.body", "body": b'{"detail":"Request body too large"}'})
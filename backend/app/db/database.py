@@ -1,12 +1,19 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from uuid import uuid4
+from fastapi import Request
+from starlette.requests import HTTPConnection
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import NullPool
 from app.core.config import settings
+from app.db.replicas import ReplicaSet, token_subject
+from app.db.telemetry import InstrumentedQueuePool, instrument_engine
 
 # Add pooling configuration
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=True,
+ENGINE_OPTIONS = dict(
+    echo=settings.DATABASE_ECHO,
+    poolclass=InstrumentedQueuePool,  # exports checkout wait and timeouts to /metrics
     pool_pre_ping=True,  # Add connection health check
     pool_size=5,         # Set maximum number of connections
     max_overflow=10,     # Allow up to 10 connections to overflow
@@ -14,6 +21,28 @@ engine = create_async_engine(
     pool_recycle=1800,   # Recycle connections every 30 minutes
 )
 
+if settings.DATABASE_PGBOUNCER:
+    # Behind PgBouncer in transaction mode consecutive transactions can land on
+    # different server connections, so never cache prepared statements and give
+    # every one a unique name instead of asyncpg's per-connection counter.
+    ENGINE_OPTIONS["connect_args"] = {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+
+engine = create_async_engine(settings.DATABASE_URL, **ENGINE_OPTIONS)
+
+# Optional read replicas; GET routes read from them through get_read_db
+replica_set = ReplicaSet([
+    create_async_engine(url.strip(), **ENGINE_OPTIONS)
+    for url in settings.DATABASE_REPLICA_URLS.split(",")
+    if url.strip()
+])
+
+for _engine in (engine, *replica_set.engines):
+    instrument_engine(_engine)
+
 async_session = sessionmaker(
     engine,
     class_=AsyncSession,
@@ -22,13 +51,75 @@ async_session = sessionmaker(
     autoflush=False
 )
 
-async def get_db():
+# Read sessions run in autocommit: each SELECT is its own implicit transaction,
+# so a read costs no BEGIN and no COMMIT/ROLLBACK round trip. Reads that need
+# one snapshot (server-side cursors) get a BEGIN READ ONLY transaction instead.
+_autocommit_engines = {
+    base: base.execution_options(isolation_level="AUTOCOMMIT")
+    for base in (engine, *replica_set.engines)
+}
+_read_only_engines = {
+    base: base.execution_options(postgresql_readonly=True)
+    for base in (engine, *replica_set.engines)
+}
+
+async def get_db(request: Request):
     async with async_session() as session:
+        # lets a committed write send this caller's next reads to the primary
+        session.info["writer"] = token_subject(request)
         try:
             yield session
-            await session.commit()
+            # routes commit their own writes; only commit what they left pending
+            if session.new or session.dirty or session.deleted or session.info.get("wrote"):
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
         finally:
             await session.close()
+
+def read_engine(connection: HTTPConnection) -> AsyncEngine:
+    """A healthy replica for this caller's reads, else the primary"""
+    return replica_set.pick(token_subject(connection)) or engine
+
+def read_only_session(request: Request) -> AsyncSession:
+    """Session whose transaction is BEGIN READ ONLY, for multi-statement reads"""
+    session = async_session(bind=_read_only_engines[read_engine(request)])
+    session.info["read_only"] = True
+    return session
+
+def read_session(connection: HTTPConnection) -> AsyncSession:
+    """Autocommit session, on a replica when one is usable, for use outside a dependency"""
+    base = read_engine(connection)
+    session = async_session(bind=_autocommit_engines[base])
+    session.info["read_only"] = True
+    session.info["replica"] = base is not engine
+    return session
+
+async def get_read_db(request: Request):
+    """Autocommit session for read-only routes, on a replica when one is usable"""
+    async with read_session(request) as session:
+        yield session
+
+@event.listens_for(Session, "before_flush")
+def _refuse_read_only_flush(session, flush_context, instances):
+    if session.info.get("read_only"):
+        raise InvalidRequestError("Attempted to write through a read-only session")
+
+@event.listens_for(Session, "after_flush")
+def _note_flushed_write(session, flush_context):
+    session.info["wrote"] = True
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_statement_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+@event.listens_for(Session, "after_commit")
+def _start_read_your_writes(session):
+    if session.info.pop("wrote", False) and session.info.get("writer"):
+        replica_set.mark_write(session.info["writer"])
+
+@event.listens_for(Session, "after_rollback")
+def _forget_write(session):
+    session.info.pop("wrote", None)
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, DateTime, Integer, Numeric, String, Boolean, ForeignKey, Text, ARRAY, TIMESTAMP
+from sqlalchemy import BigInteger, Column, Computed, DateTime, Index, Integer, Numeric, String, Boolean, ForeignKey, Text, TIMESTAMP
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime, timezone
 
 Base = declarative_base()
@@ -25,16 +26,22 @@ class Profile(Base):
     __tablename__ = "profiles"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey('users.id'))
+    user_id = Column(Integer, ForeignKey('users.id'), index=True)
     bio = Column(Text)
     skills = Column(ARRAY(String))
     hourly_rate = Column(Numeric)
 
+# Weighted full-text document of a project: name (A) ranks above details (B)
+PROJECT_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(project_name, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(details, '')), 'B')"
+)
+
 class Projects(Base):
     __tablename__ = "projects"
 
     project_id = Column(Integer, primary_key=True, index=True)
-    client_id = Column(Integer, ForeignKey("users.id"))
+    client_id = Column(Integer, ForeignKey("users.id"), index=True)
     project_name = Column(String)
     client_name = Column(String)
     details = Column(Text)
@@ -48,6 +55,77 @@ class Projects(Base):
     pay_per_project = Column(Numeric, nullable=True)
     duration = Column(Integer, nullable=True)
     created_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc))
+    # Maintained by Postgres on insert and update; deferred so loading a project never fetches it
+    search_vector = deferred(Column(TSVECTOR, Computed(PROJECT_SEARCH_VECTOR, persisted=True)))
 
     # Define the relationship with User
     client = relationship("User", back_populates="projects")
+
+    __table_args__ = (
+        # Backs keyset pagination on (created_at, project_id) for the project feeds
+        Index("ix_projects_created_at_project_id", "created_at", "project_id"),
+        # Back the faceted filters on GET /api/projects
+        Index("ix_projects_skill_required", "skill_required", postgresql_using="gin"),
+        Index("ix_projects_payment_type", "payment_type"),
+        Index("ix_projects_project_status", "project_status"),
+        Index("ix_projects_pay_per_hour", "pay_per_hour"),
+        Index("ix_projects_pay_per_project", "pay_per_project"),
+        # Full-text search; the migration also adds a pg_trgm index on project_name where available
+        Index("ix_projects_search_vector", "search_vector", postgresql_using="gin"),
+    )
+    # Only the primary key comes back from INSERT ... RETURNING, not the computed search_vector
+    __mapper_args__ = {"eager_defaults": False}
+
+class ProjectSkillStats(Base):
+    """Projects and pay totals per skill, maintained by app.core.aggregates"""
+    __tablename__ = "project_skill_stats"
+
+    skill = Column(String, primary_key=True)
+    projects = Column(Integer, nullable=False, default=0)
+    pay_per_hour_count = Column(Integer, nullable=False, default=0)
+    pay_per_hour_sum = Column(Numeric, nullable=False, default=0)
+    pay_per_project_count = Column(Integer, nullable=False, default=0)
+    pay_per_project_sum = Column(Numeric, nullable=False, default=0)
+
+class ProjectPayHistogram(Base):
+    """Per-skill pay histograms on a log scale, for medians; see app.core.aggregates"""
+    __tablename__ = "project_pay_histogram"
+
+    skill = Column(String, primary_key=True)
+    field = Column(String, primary_key=True)  # "pay_per_hour" or "pay_per_project"
+    bucket = Column(Integer, primary_key=True)
+    projects = Column(Integer, nullable=False, default=0)
+
+class ProjectStatusCounts(Base):
+    """Projects per project_status, maintained by app.core.aggregates"""
+    __tablename__ = "project_status_counts"
+
+    project_status = Column(String, primary_key=True)
+    projects = Column(Integer, nullable=False, default=0)
+
+class ProjectAggregateLog(Base):
+    """Project writes not yet folded into the summary tables; see app.core.aggregates"""
+    __tablename__ = "project_aggregate_log"
+
+    id = Column(BigInteger, primary_key=True)
+    sign = Column(Integer, nullable=False)  # 1 counts the values in, -1 takes them out
+    skill_required = Column(ARRAY(String))
+    project_status = Column(String)
+    pay_per_hour = Column(Numeric)
+    pay_per_project = Column(Numeric)
+
+class RateLimitCounter(Base):
+    """Fixed-window hit counter backing the shared OTP rate limiter"""
+    __tablename__ = "rate_limit_counters"
+
+    key = Column(String, primary_key=True)
+    window_start = Column(BigInteger, primary_key=True)  # epoch seconds
+    count = Column(Integer, nullable=False, default=0)
+    expires_at = Column(BigInteger, nullable=False, index=True)  # epoch seconds
+
+class RateLimitClaim(Base):
+    """Short-lived claim used to deduplicate OTP resends across workers"""
+    __tablename__ = "rate_limit_claims"
+
+    key = Column(String, primary_key=True)
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False)
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional, Set
+import asyncpg
+from sqlalchemy.engine import make_url
+from app.core.config import settings
+from app.db.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_PAYLOAD_BYTES = 7999
+MAX_BATCH = 500
+NOTIFY_BATCH_SQL = "SELECT pg_notify(channel, payload) FROM unnest($1::text[], $2::text[]) AS n(channel, payload)"
+
+
+class PgNotifier:
+    """Postgres LISTEN/NOTIFY for cross-worker fan-out over one dedicated connection.
+
+    Every subscriber in the worker shares the listening connection, so the
+    number of database connections stays flat however many sockets or streams
+    are open. Outgoing notifications are queued and sent in batches, one round
+    trip per batch, over the same connection. Notifications this worker sent
+    are not delivered back to it, as publishers fan out locally themselves,
+    unless the channel is subscribed with ``own=True``: then every worker sees
+    the channel in the same order, the order Postgres committed the NOTIFYs.
+
+    The connection sits outside the engine's pool and is reopened with backoff
+    when it drops. Notifications queued past NOTIFY_OUTBOX_SIZE, or sent by
+    other workers while the connection was down, are lost.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable[[str], None]]] = defaultdict(list)
+        self._own_channels: Set[str] = set()
+        self._outbox: Optional[asyncio.Queue] = None
+        self._connection: Optional[asyncpg.Connection] = None
+        self._server_pid: Optional[int] = None
+        self.counters = Counter()
+
+    @property
+    def outbox(self) -> asyncio.Queue:
+        if self._outbox is None:
+            self._outbox = asyncio.Queue(maxsize=settings.NOTIFY_OUTBOX_SIZE)
+        return self._outbox
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    def subscribe(self, channel: str, handler: Callable[[str], None], own: bool = False):
+        """Call ``handler(payload)`` on the event loop for each notification other workers send,
+        or with ``own`` for every notification on the channel"""
+        self._handlers[channel].append(handler)
+        if own:
+            self._own_channels.add(channel)
+        if self.connected and len(self._handlers[channel]) == 1:
+            asyncio.ensure_future(self._connection.add_listener(channel, self._dispatch))
+
+    def publish(self, channel: str, payload: str) -> bool:
+        """Queue a notification without waiting; False if the outbox is full and it was dropped"""
+        if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+            raise ValueError(f"NOTIFY payload exceeds {MAX_PAYLOAD_BYTES} bytes")
+        try:
+            self.outbox.put_nowait((channel, payload))
+        except asyncio.QueueFull:
+            self.counters["dropped"] += 1
+            return False
+        return True
+
+    def _dispatch(self, connection, pid: int, channel: str, payload: str):
+        if pid == self._server_pid and channel not in self._own_channels:
+            return
+        self.counters["received"] += 1
+        for handler in self._handlers.get(channel, ()):
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception(f"NOTIFY handler for {channel} failed")
+
+    async def _connect(self) -> asyncpg.Connection:
+        url = make_url(settings.DATABASE_LISTEN_URL or settings.DATABASE_URL)
+        _, params = engine.dialect.create_connect_args(url)
+        # SQLAlchemy-only options; the listener prepares nothing anyway
+        params.pop("prepared_statement_cache_size", None)
+        params.pop("prepared_statement_name_func", None)
+        connection = await asyncpg.connect(**params, statement_cache_size=0)
+        self._server_pid = connection.get_server_pid()
+        for channel in self._handlers:
+            await connection.add_listener(channel, self._dispatch)
+        return connection
+
+    async def _send_batches(self, connection: asyncpg.Connection):
+        while True:
+            try:
+                first = await asyncio.wait_for(self.outbox.get(), timeout=settings.NOTIFY_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # An idle connection that died quietly would otherwise stop delivering unnoticed
+                await connection.execute("SELECT 1")
+                continue
+            batch = [first]
+            while len(batch) < MAX_BATCH and not self.outbox.empty():
+                batch.append(self.outbox.get_nowait())
+            channels, payloads = zip(*batch)
+            await connection.execute(NOTIFY_BATCH_SQL, list(channels), list(payloads))
+            self.counters["sent"] += len(batch)
+            self.counters["batches"] += 1
+
+    async def run(self):
+        """Hold the listening connection open for the life of the worker"""
+        backoff = 0.5
+        while True:
+            try:
+                self._connection = await self._connect()
+                backoff = 0.5
+                await self._send_batches(self._connection)
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                self.counters["reconnects"] += 1
+                logger.warning(f"LISTEN/NOTIFY connection lost, retrying in {backoff:.1f}s: {str(e)}")
+            finally:
+                if self._connection is not None:
+                    self._connection.terminate()
+                    self._connection = None
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "channels": sorted(self._handlers),
+            "outbox": self.outbox.qsize(),
+            **self.counters,
+        }
+
+
+pg_notifier = PgNotifier()
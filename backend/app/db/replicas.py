@@ -0,0 +1,147 @@
+import asyncio
+import logging
+from collections import Counter
+from typing import List, Optional
+from starlette.requests import HTTPConnection
+from jose import JWTError, jwt
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Subjects that just committed a write, so every worker opens their window
+READ_YOUR_WRITES_CHANNEL = "read_your_writes"
+
+# Seconds the replica trails the primary, and the state of its WAL receiver.
+# A replica that has replayed all the WAL it received is caught up even if the
+# last replayed commit is old, but only while it is still receiving: with the
+# receiver down nothing new arrives and receive and replay LSNs stay equal.
+# Roles without pg_read_all_stats see the receiver's pid but not its status.
+REPLICA_LAG_SQL = text("""
+    SELECT pg_is_in_recovery(),
+           receiver.pid IS NOT NULL AND coalesce(receiver.status = 'streaming', true),
+           EXTRACT(EPOCH FROM now() - receiver.last_msg_receipt_time),
+           CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+           END
+    FROM (SELECT 1) AS one LEFT JOIN pg_stat_wal_receiver AS receiver ON true
+""")
+
+
+def token_subject(connection: HTTPConnection) -> Optional[str]:
+    """The bearer token's subject, read without verifying it.
+
+    Only used to route reads; authentication still verifies the token.
+    """
+    scheme, _, token = connection.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.get_unverified_claims(token).get("sub")
+    except JWTError:
+        return None
+
+
+class ReplicaSet:
+    """Read replicas, their last measured lag and a read-your-writes window.
+
+    Reads go round-robin to replicas whose lag is within REPLICA_MAX_LAG_SECONDS.
+    Everything falls back to the primary while lag is unknown or too high or the
+    replica's WAL receiver is down, and a caller who committed a write in the
+    last READ_YOUR_WRITES_SECONDS reads from the primary too. Each worker keeps
+    its own windows; with ``share_writes`` a write is also announced over
+    LISTEN/NOTIFY, so the caller's next request reads from the primary
+    whichever worker it lands on. The announcement usually arrives within a
+    few milliseconds of the commit, well before that next request; while the
+    LISTEN connection is down other workers miss it and may serve a read up to
+    REPLICA_MAX_LAG_SECONDS stale.
+    """
+
+    def __init__(self, engines: List[AsyncEngine]):
+        self.engines = engines
+        self.lag: List[Optional[float]] = [None] * len(engines)
+        self.recent_writers = TTLCache(max_size=100_000, ttl=settings.READ_YOUR_WRITES_SECONDS)
+        self.counters = Counter()
+        self._notifier = None
+        self._next = 0
+
+    def pick(self, subject: Optional[str]) -> Optional[AsyncEngine]:
+        """A replica engine to read from, or None to use the primary"""
+        if not self.engines:
+            return None
+        if subject is not None and self.recent_writers.get(subject):
+            self.counters["primary_read_your_writes"] += 1
+            return None
+        healthy = [
+            engine for engine, lag in zip(self.engines, self.lag)
+            if lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
+        ]
+        if not healthy:
+            self.counters["primary_fallback"] += 1
+            return None
+        self._next = (self._next + 1) % len(healthy)
+        self.counters["replica"] += 1
+        return healthy[self._next]
+
+    def share_writes(self, notifier):
+        """Announce every write to the other workers over ``notifier`` and honor theirs"""
+        if not self.engines:
+            return
+        self._notifier = notifier
+        notifier.subscribe(READ_YOUR_WRITES_CHANNEL, self._receive_write)
+
+    def _receive_write(self, subject: str):
+        self.recent_writers.set(subject, True)
+
+    def mark_write(self, subject: str):
+        self.recent_writers.set(subject, True)
+        if self._notifier is not None:
+            try:
+                self._notifier.publish(READ_YOUR_WRITES_CHANNEL, subject)
+            except ValueError:
+                # Subject too long for one NOTIFY; only this worker holds the window
+                self.counters["write_not_shared"] += 1
+
+    @staticmethod
+    def _lag(in_recovery: bool, receiving: bool, silence: Optional[float], lag: Optional[float]) -> Optional[float]:
+        """Seconds behind from one REPLICA_LAG_SQL row, or None if the replica stopped receiving WAL"""
+        # A server that is not in recovery is not replicating; treat it as current
+        if not in_recovery:
+            return 0.0
+        if not receiving or (silence is not None and silence > settings.REPLICA_RECEIVER_TIMEOUT_SECONDS):
+            return None
+        return float(lag or 0)
+
+    async def _measure(self, engine: AsyncEngine) -> Optional[float]:
+        async with engine.connect() as conn:
+            return self._lag(*(await conn.execute(REPLICA_LAG_SQL)).one())
+
+    async def check(self):
+        """Measure every replica's lag, marking unreachable or disconnected ones unusable"""
+        for index, engine in enumerate(self.engines):
+            try:
+                lag = await asyncio.wait_for(self._measure(engine), settings.REPLICA_LAG_CHECK_SECONDS)
+                if lag is None and self.lag[index] is not None:
+                    logger.warning(f"Replica {index} is not receiving WAL, reading from primary")
+            except Exception as e:
+                if self.lag[index] is not None:
+                    logger.warning(f"Replica {index} unreachable, reading from primary: {str(e)}")
+                lag = None
+            self.lag[index] = lag
+
+    def stats(self) -> dict:
+        return {
+            "replicas": [
+                {"lag_seconds": lag, "healthy": lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS}
+                for lag in self.lag
+            ],
+            **self.counters,
+        }
+
+
+async def monitor_replicas_periodically(replicas: ReplicaSet):
+    while True:
+        await asyncio.sleep(settings.REPLICA_LAG_CHECK_SECONDS)
+        await replicas.check()
@@ -0,0 +1,66 @@
+import asyncio
+import logging
+from pathlib import Path
+from typing import List
+from alembic.script import ScriptDirectory
+from alembic.util import CommandError
+from sqlalchemy import Executable, text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+async def check_schema_version(engine: AsyncEngine):
+    """Refuse to start unless the database is migrated to this code's Alembic head.
+
+    One query, instead of create_all's catalog lookup per table. A revision
+    this code does not know is assumed to be newer (a rolling deploy that
+    migrated ahead of this worker) and only logged.
+    """
+    script = ScriptDirectory(str(MIGRATIONS_DIR))
+    heads = script.get_heads()
+    try:
+        async with engine.connect() as conn:
+            current = (await conn.execute(text("SELECT version_num FROM alembic_version"))).scalar()
+    except ProgrammingError:
+        current = None
+
+    if current in heads:
+        return
+    if current is None:
+        raise SchemaOutOfDate(
+            "Database has no Alembic version; run `alembic upgrade head` (see backend/README.md)"
+        )
+    try:
+        script.get_revision(current)
+    except CommandError:
+        logger.warning(f"Database schema {current} is newer than this code ({', '.join(heads)}); continuing")
+        return
+    raise SchemaOutOfDate(
+        f"Database schema is at {current} but this code needs {', '.join(heads)}; run `alembic upgrade head`"
+    )
+
+
+async def warm_up_pool(engine: AsyncEngine, statements: List[Executable], connections: int):
+    """Open ``connections`` pooled connections and run every hot statement on each.
+
+    The first request then finds a connected pool, SQLAlchemy's compiled
+    cache already holds the statements and each connection has them prepared.
+    """
+    opened = await asyncio.gather(*(engine.connect() for _ in range(connections)))
+    try:
+        async def warm(conn):
+            async with AsyncSession(bind=conn) as session:
+                for statement in statements:
+                    await session.execute(statement)
+        await asyncio.gather(*(warm(conn) for conn in opened))
+    finally:
+        for conn in opened:
+            await conn.close()
@@ -0,0 +1,195 @@
+import logging
+import re
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.metrics import POOL_WAIT_BUCKETS, Histogram, route_template
+
+logger = logging.getLogger(__name__)
+
+# Literals, bind parameters and repeated value lists all collapse to
+# placeholders, so every execution of one statement shares a fingerprint
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_OR_PARAM = re.compile(r"\$\d+|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_TUPLE = r"\(\s*\?(?:\s*,\s*\?)*\s*\)"
+_VALUE_LIST = re.compile(rf"\b(IN|VALUES)\s*{_PLACEHOLDER_TUPLE}", re.IGNORECASE)
+_REPEATED_TUPLES = re.compile(rf"\(\.\.\.\)(?:\s*,\s*{_PLACEHOLDER_TUPLE})+")
+_WHITESPACE = re.compile(r"\s+")
+
+# Aggregates are kept for this many distinct fingerprints; the rest are pooled
+MAX_FINGERPRINTS = 500
+OTHER_FINGERPRINT = "<other>"
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Normalized SQL: literals and parameters become ?, value lists (...)"""
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _NUMBER_OR_PARAM.sub("?", sql)
+    sql = _VALUE_LIST.sub(r"\1 (...)", sql)
+    sql = _REPEATED_TUPLES.sub("(...), ...", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class RequestQueries:
+    """Statements run while serving one request"""
+
+    __slots__ = ("count", "duration", "by_fingerprint")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.by_fingerprint: Counter = Counter()
+
+
+_current_request: ContextVar[Optional[RequestQueries]] = ContextVar("sql_request_queries", default=None)
+
+
+class QueryTelemetry:
+    """Process-wide SQL aggregates, the slow-query log and N+1 reports.
+
+    Statements are timed with engine cursor events, so the cost per statement
+    is two clock reads and a cached fingerprint lookup; nothing is formatted
+    unless a statement is slow or a request repeats one too often.
+    """
+
+    def __init__(self):
+        self.statements = 0
+        self.total_seconds = 0.0
+        self.by_fingerprint: Dict[str, List[float]] = {}  # fingerprint -> [calls, seconds, max seconds]
+        self.slow_queries = deque(maxlen=settings.SQL_SLOW_QUERY_LOG_SIZE)
+        self.n_plus_one = deque(maxlen=settings.SQL_SLOW_QUERY_LOG_SIZE)
+        self.requests = 0
+        self.request_statements = 0
+
+    def record(self, statement: str, seconds: float):
+        sql = fingerprint(statement)
+        self.statements += 1
+        self.total_seconds += seconds
+
+        current = _current_request.get()
+        if current is not None:
+            current.count += 1
+            current.duration += seconds
+            current.by_fingerprint[sql] += 1
+
+        key = sql if sql in self.by_fingerprint or len(self.by_fingerprint) < MAX_FINGERPRINTS else OTHER_FINGERPRINT
+        totals = self.by_fingerprint.setdefault(key, [0, 0.0, 0.0])
+        totals[0] += 1
+        totals[1] += seconds
+        totals[2] = max(totals[2], seconds)
+
+        if seconds * 1000 >= settings.SQL_SLOW_QUERY_MS:
+            self.slow_queries.append({"fingerprint": sql, "duration_ms": round(seconds * 1000, 2), "at": time.time()})
+            logger.warning(f"Slow query ({seconds * 1000:.1f} ms): {sql}")
+
+    def finish_request(self, route: str, queries: RequestQueries):
+        self.requests += 1
+        self.request_statements += queries.count
+        for sql, calls in queries.by_fingerprint.items():
+            if calls >= settings.SQL_N_PLUS_ONE_THRESHOLD:
+                self.n_plus_one.append({"route": route, "fingerprint": sql, "calls": calls, "at": time.time()})
+                logger.warning(f"Possible N+1 on {route}: {calls} runs of {sql}")
+
+    def stats(self, top: int = 20) -> dict:
+        slowest = sorted(self.by_fingerprint.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        return {
+            "statements": self.statements,
+            "total_ms": round(self.total_seconds * 1000, 2),
+            "requests": self.requests,
+            "statements_per_request": round(self.request_statements / self.requests, 2) if self.requests else 0,
+            "top_fingerprints": [
+                {
+                    "fingerprint": sql,
+                    "calls": calls,
+                    "total_ms": round(seconds * 1000, 2),
+                    "mean_ms": round(seconds * 1000 / calls, 3),
+                    "max_ms": round(max_seconds * 1000, 2),
+                }
+                for sql, (calls, seconds, max_seconds) in slowest
+            ],
+            "slow_queries": list(self.slow_queries),
+            "n_plus_one": list(self.n_plus_one),
+        }
+
+
+query_telemetry = QueryTelemetry()
+
+
+def instrument_engine(engine: AsyncEngine):
+    """Time every statement the engine runs, including its execution_options variants"""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        query_telemetry.record(statement, time.perf_counter() - conn.info["query_start"].pop())
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _drop_timer(exception_context):
+        starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+        if starts:
+            starts.pop()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """The default async queue pool, also timing checkouts and counting timeouts"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_wait = Histogram(POOL_WAIT_BUCKETS)
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.checkout_wait.observe(time.perf_counter() - start)
+
+
+class SQLTelemetryMiddleware:
+    """Collect the statements each request runs.
+
+    Adds a ``Server-Timing: db`` header with the request's statement count and
+    database time so far, and reports statements repeated N+1 style once the
+    request is done.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        queries = RequestQueries()
+        token = _current_request.set(queries)
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start" and queries.count:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing", f'db;dur={queries.duration * 1000:.2f};desc="{queries.count} queries"'
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_request.reset(token)
+            query_telemetry.finish_request(route_template(scope), queries)
@@ -1,19 +1,75 @@
 from fastapi import FastAPI
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from contextlib import asynccontextmanager
-from app.routes import auth, oauth, addproject
-from app.db.database import get_db, engine
-from app.db.models import Base
+import asyncio
+from app.routes import auth, oauth, addproject, chat, presence
+from app.routes.addproject import PROJECT_COLUMNS, dashboard_query, paginate_newest
+from sqlalchemy import select
+from app.db.database import get_db, engine, replica_set
+from app.db.notify import pg_notifier
+from app.db.replicas import monitor_replicas_periodically
+from app.db.schema import check_schema_version, warm_up_pool
+from app.db.telemetry import SQLTelemetryMiddleware, query_telemetry
+from app.db.models import Projects, User
 from app.core.config import settings
+from app.core.chat import chat_hub
+from app.core.project_feed import project_feed
+from app.core.presence import presence_registry
+from app.core.aggregates import marketplace_aggregates
+from app.core.matching import refresh_project_matcher_periodically
+from app.core.security import shutdown_password_executor
+from app.core.twilio_client import twilio_service
+from app.core.oauth_providers import oauth_http
+from app.core.uploads import RequestSizeLimitMiddleware
+from app.core.images import ProfilePicFiles, shutdown_image_executor
+from app.core.response_cache import response_cache
+from app.core.responses import FastJSONResponse
+from app.core.metrics import PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, app_metrics, monitor_event_loop_lag
+
+def hot_statements() -> list:
+    """What the login/auth lookup, the project feeds and project detail run"""
+    return [
+        select(User).where(User.email == ""),
+        paginate_newest(dashboard_query(), 10),
+        paginate_newest(select(*PROJECT_COLUMNS), 10),
+        select(Projects).where(Projects.project_id == 0),
+    ]
+
+# A caller's read-your-writes window opens in every worker, not just the one that took the write
+replica_set.share_writes(pg_notifier)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # The schema is owned by Alembic (`alembic upgrade head`); only verify it here
+    await check_schema_version(engine)
+    await warm_up_pool(engine, hot_statements(), min(settings.DATABASE_WARM_CONNECTIONS, engine.pool.size()))
+    # Loads the recommendation index in the background; startup does not wait for it
+    matcher_refresh = asyncio.create_task(refresh_project_matcher_periodically())
+    await replica_set.check()
+    replica_monitor = asyncio.create_task(monitor_replicas_periodically(replica_set))
+    loop_lag_monitor = asyncio.create_task(monitor_event_loop_lag())
+    # One LISTEN connection per worker for cross-worker chat and project feed fan-out
+    notifier = asyncio.create_task(pg_notifier.run())
+    presence_wheel = asyncio.create_task(presence_registry.run())
+    aggregates_folder = asyncio.create_task(marketplace_aggregates.run())
     yield
+    aggregates_folder.cancel()
+    presence_wheel.cancel()
+    notifier.cancel()
+    matcher_refresh.cancel()
+    replica_monitor.cancel()
+    loop_lag_monitor.cancel()
+    for replica in replica_set.engines:
+        await replica.dispose()
+    shutdown_password_executor()
+    shutdown_image_executor()
+    await twilio_service.aclose()
+    await oauth_http.aclose()
+    await response_cache.backend.aclose()
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Add SessionMiddleware BEFORE CORSMiddleware
 app.add_middleware(
@@ -31,7 +87,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Cap request bodies before the multipart parser spools them
+app.add_middleware(
+    RequestSizeLimitMiddleware,
+    max_bytes=settings.MAX_REQUEST_BODY_BYTES,
+    path_limits={"/api/projects/bulk": settings.PROJECT_BULK_MAX_BYTES}
+)
+
+# Per-request statement counts and timings, slow queries and N+1 reports
+app.add_middleware(SQLTelemetryMiddleware)
+
+# Route latency histograms and status counts for /metrics; outermost so it times everything
+app.add_middleware(MetricsMiddleware)
+
 # Route registration
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(oauth.router, prefix="/api/oauth", tags=["oauth"])
 app.include_router(addproject.router, prefix="/api", tags=["projects"])  # Updated prefix
+app.include_router(chat.router, prefix="/api")
+app.include_router(presence.router, prefix="/api")
+
+# Content-addressed profile pictures and their thumbnails, cacheable forever
+app.mount("/static/profile_pics", ProfilePicFiles(directory=settings.PROFILE_PIC_DIR, check_dir=False), name="profile_pics")
+
+@app.get("/health", tags=["health"])
+async def health():
+    """Liveness probe that touches neither the database nor auth"""
+    return {"status": "ok"}
+
+@app.get("/health/replicas", tags=["health"])
+async def replica_health():
+    """Measured replica lag and how reads were routed"""
+    return replica_set.stats()
+
+@app.get("/health/sql", tags=["health"])
+async def sql_health():
+    """Statement aggregates by fingerprint, recent slow queries and N+1 reports"""
+    return query_telemetry.stats()
+
+@app.get("/health/chat", tags=["health"])
+async def chat_health():
+    """Rooms and sockets on this worker, fan-out counters and the LISTEN/NOTIFY connection"""
+    return {"chat": chat_hub.stats(), "notify": pg_notifier.stats()}
+
+@app.get("/health/feed", tags=["health"])
+async def project_feed_health():
+    """Open project streams on this worker, the resume backlog and fan-out counters"""
+    return {"feed": project_feed.stats(), "notify": pg_notifier.stats()}
+
+@app.get("/health/presence", tags=["health"])
+async def presence_health():
+    """Online users as this worker sees them and the expiry wheel's counters"""
+    return presence_registry.stats()
+
+@app.get("/health/aggregates", tags=["health"])
+async def aggregates_health():
+    """Age of this worker's marketplace stats snapshot and the fold and reconciliation counters"""
+    return marketplace_aggregates.stats()
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics for this worker"""
+    pools = {"primary": engine.pool}
+    pools.update({f"replica{index}": replica.pool for index, replica in enumerate(replica_set.engines)})
+    return Response(app_metrics.render(pools, query_telemetry), media_type=PROMETHEUS_CONTENT_TYPE)
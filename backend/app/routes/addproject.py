@@ -1,17 +1,48 @@
+import asyncio
+import csv
+import html
+import io
 from datetime import datetime, timezone
-from typing import List, Optional
-from pydantic import BaseModel, HttpUrl, field_validator, Field, ValidationInfo
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import BaseModel, HttpUrl, field_validator, Field, ValidationError, ValidationInfo
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
-from sqlalchemy import select
-from app.db.models import Projects, User
-from app.db.database import get_db
-from app.core.security import get_current_user
+from sqlalchemy import JSON, Float, Select, String, func, insert, literal, literal_column, select, true, tuple_
+from app.db.models import Profile, Projects, User
+from app.db.database import get_db, get_read_db, read_only_session, read_session, replica_set
+from app.core.config import settings
+from app.core.security import Principal, authenticate_token, get_current_user
+from app.core.pagination import decode_cursor, decode_search_cursor, encode_cursor, encode_search_cursor
+from app.core.matching import get_project_matcher, index_project, project_matcher_loaded, unindex_project
+from app.core.images import avatar_url
+from app.core.response_cache import cached_json_response, response_cache
+from app.core.responses import FastJSONResponse, dumps
+from app.core.project_feed import KEEPALIVE_FRAME, project_feed
+from app.core.aggregates import log_projects_added, log_projects_removed, marketplace_aggregates
 
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
+# Cache namespace of the project read routes; bumped by every committed write
+PROJECTS_CACHE = "projects"
+_delayed_invalidations = set()
+
+async def invalidate_project_reads():
+    """Bump the project cache version after a committed write.
+
+    With replicas it is bumped again once they are within their lag bound, so
+    a page read from a replica that had not replayed the write yet is dropped.
+    """
+    await response_cache.invalidate(PROJECTS_CACHE)
+    if replica_set.engines:
+        async def invalidate_later():
+            await asyncio.sleep(settings.REPLICA_MAX_LAG_SECONDS)
+            await response_cache.invalidate(PROJECTS_CACHE)
+        task = asyncio.create_task(invalidate_later())
+        _delayed_invalidations.add(task)
+        task.add_done_callback(_delayed_invalidations.discard)
+
 class ProjectBase(BaseModel):
     """Base model for project creation and updates"""
     projectName: str = Field(min_length=3, max_length=100)
@@ -64,14 +95,405 @@ class ProjectWithUserResponse(BaseModel):
     details: str
     skills: List[str]
     paymentType: str
-    client_name: str
-    client_email: str
+    client_name: Optional[str]
+    client_email: Optional[str]
     client_profile_pic: Optional[str]
     created_at: datetime
 
     class Config:
         from_attributes = True
 
+class ProjectFacets(BaseModel):
+    """Counts of matching projects per skill and per payment type"""
+    skills: Dict[str, int]
+    payment_type: Dict[str, int]
+
+class ProjectPage(BaseModel):
+    """A page of projects plus the cursor for the next page"""
+    items: List[ProjectResponse]
+    next_cursor: Optional[str] = None
+    facets: Optional[ProjectFacets] = None
+
+class PaySummary(BaseModel):
+    """Pay of the projects of one skill that set it; the median is within 2%"""
+    projects: int
+    average: float
+    median: Optional[float] = None
+
+class SkillStats(BaseModel):
+    """Open projects and pay for one skill"""
+    skill: str
+    open_projects: int
+    pay_per_hour: Optional[PaySummary] = None
+    pay_per_project: Optional[PaySummary] = None
+
+class MarketplaceStats(BaseModel):
+    """Marketplace aggregates as of ``as_of``, at most ``max_staleness_seconds`` old when served"""
+    skills: List[SkillStats]
+    project_status: Dict[str, int]
+    open_projects: int
+    as_of: datetime
+    max_staleness_seconds: float
+
+class BulkImportCreated(BaseModel):
+    """A bulk import item that was inserted"""
+    index: int
+    project_id: int
+
+class BulkImportError(BaseModel):
+    """A bulk import item that failed validation, with Pydantic's error list"""
+    index: int
+    errors: List[Dict[str, Any]]
+
+class BulkImportResult(BaseModel):
+    """Per-item outcome of a bulk import, indexed by position in the request"""
+    created: List[BulkImportCreated]
+    errors: List[BulkImportError]
+
+class RecommendedProject(BaseModel):
+    """A recommended project with its match score"""
+    project: ProjectResponse
+    score: float
+
+class ProjectFilters:
+    """Query-string filters for the project listings.
+
+    Every condition maps onto an index on ``projects``: the GIN index on
+    ``skill_required`` serves overlap (``any``) and containment (``all``), the
+    B-tree indexes serve the equality and range filters.
+    """
+    def __init__(
+        self,
+        skills: Optional[List[str]] = Query(None, max_length=20),
+        skills_match: str = Query("any", pattern="^(any|all)$"),
+        payment_type: Optional[str] = Query(None, pattern="^(project|hourly)$"),
+        project_status: Optional[str] = Query(None, pattern="^(featured|urgent)$"),
+        min_pay_per_hour: Optional[float] = Query(None, ge=0),
+        max_pay_per_hour: Optional[float] = Query(None, ge=0),
+        min_pay_per_project: Optional[float] = Query(None, ge=0),
+        max_pay_per_project: Optional[float] = Query(None, ge=0),
+    ):
+        self.skills = skills
+        self.skills_match = skills_match
+        self.payment_type = payment_type
+        self.project_status = project_status
+        self.min_pay_per_hour = min_pay_per_hour
+        self.max_pay_per_hour = max_pay_per_hour
+        self.min_pay_per_project = min_pay_per_project
+        self.max_pay_per_project = max_pay_per_project
+
+    def conditions(self) -> list:
+        conditions = []
+        if self.skills:
+            if self.skills_match == "all":
+                conditions.append(Projects.skill_required.contains(self.skills))
+            else:
+                conditions.append(Projects.skill_required.overlap(self.skills))
+        if self.payment_type:
+            conditions.append(Projects.payment_type == self.payment_type)
+        if self.project_status:
+            conditions.append(Projects.project_status == self.project_status)
+        if self.min_pay_per_hour is not None:
+            conditions.append(Projects.pay_per_hour >= self.min_pay_per_hour)
+        if self.max_pay_per_hour is not None:
+            conditions.append(Projects.pay_per_hour <= self.max_pay_per_hour)
+        if self.min_pay_per_project is not None:
+            conditions.append(Projects.pay_per_project >= self.min_pay_per_project)
+        if self.max_pay_per_project is not None:
+            conditions.append(Projects.pay_per_project <= self.max_pay_per_project)
+        return conditions
+
+class DashboardPage(BaseModel):
+    """A page of dashboard projects plus the cursor for the next page"""
+    items: List[ProjectWithUserResponse]
+    next_cursor: Optional[str] = None
+
+class SearchHighlights(BaseModel):
+    """HTML-escaped name and details snippet, with the matched words in <mark> tags"""
+    projectName: str
+    details: str
+
+class SearchResult(ProjectWithUserResponse):
+    """A dashboard project with its search score and highlights"""
+    score: float
+    highlights: SearchHighlights
+
+class SearchPage(BaseModel):
+    """A page of search results, best match first, plus the cursor for the next page"""
+    items: List[SearchResult]
+    next_cursor: Optional[str] = None
+    mode: str
+
+def to_project_response(project) -> dict:
+    """Map a Projects object or projected row to the ProjectResponse fields.
+
+    Returns a plain dict for FastJSONResponse; the data was validated on the
+    way in, so no model is built for it on the way out.
+    """
+    return {
+        "projectName": project.project_name,
+        "clientName": project.client_name,
+        "details": project.details,
+        "skills": project.skill_required,
+        "paymentType": project.payment_type,  # Changed from Payment_Type
+        "projectStatus": project.project_status,
+        "githubLink": project.github_link,  # Changed from Github_link
+        "startDate": project.start_date.strftime("%Y-%m-%d") if project.start_date else None,
+        "endDate": project.end_date.strftime("%Y-%m-%d") if project.end_date else None,
+        "payPerHour": float(project.pay_per_hour) if project.pay_per_hour else None,
+        "payPerProject": float(project.pay_per_project) if project.pay_per_project else None,
+        "duration": project.duration,
+        "project_id": project.project_id,
+        "client_id": project.client_id,
+        "created_at": project.created_at
+    }
+
+# Column order of the CSV export, matching the JSON field names
+EXPORT_FIELDS = tuple(ProjectResponse.model_fields)
+
+def ndjson_lines(rows) -> bytes:
+    return b"".join(dumps(to_project_response(row)) + b"\n" for row in rows)
+
+def csv_lines(rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        item = to_project_response(row)
+        item["skills"] = ";".join(item["skills"] or ())
+        item["created_at"] = item["created_at"].isoformat() if item["created_at"] else None
+        writer.writerow(item.values())
+    return buffer.getvalue().encode()
+
+# Projection mode: list endpoints select plain columns and map rows straight to
+# the response, so no ORM objects are hydrated or lazy-loaded per row.
+PROJECT_COLUMNS = tuple(column for column in Projects.__table__.columns if column.key != "search_vector")
+
+DASHBOARD_COLUMNS = (
+    Projects.project_id,
+    Projects.project_name,
+    Projects.client_name,
+    Projects.details,
+    Projects.skill_required,
+    Projects.payment_type,
+    Projects.created_at,
+    User.name.label("user_name"),
+    User.email.label("user_email"),
+    User.profile_pic_url.label("user_profile_pic"),
+)
+
+def dashboard_query() -> Select:
+    """Single joined query selecting only what ProjectWithUserResponse needs"""
+    return select(*DASHBOARD_COLUMNS).join(User, Projects.client_id == User.id)
+
+def to_dashboard_response(row) -> dict:
+    """Map a dashboard_query row to the ProjectWithUserResponse fields"""
+    return {
+        "project_id": row.project_id,
+        "projectName": row.project_name,
+        "clientName": row.client_name,
+        "details": row.details,
+        "skills": row.skill_required,
+        "paymentType": row.payment_type,  # Changed from Payment_Type
+        "client_name": row.user_name,
+        "client_email": row.user_email,
+        "client_profile_pic": avatar_url(row.user_profile_pic),
+        "created_at": row.created_at
+    }
+
+def paginate_newest(
+        query: Select,
+        limit: int,
+        cursor: Optional[str] = None,
+        skip: Optional[int] = None
+) -> Select:
+    """Order a projects query newest first and page it by keyset cursor.
+
+    Fetches one extra row so the caller can tell whether a next page exists.
+    ``skip`` is only honoured when no cursor is given and is kept for old clients.
+    """
+    query = query.order_by(Projects.created_at.desc(), Projects.project_id.desc())
+    if cursor:
+        created_at, project_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(Projects.created_at, Projects.project_id) < (created_at, project_id)
+        )
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
+def _json_counts(column, source) -> Select:
+    """Scalar subquery returning {value: count} for a column of source as JSON.
+
+    NULL values are left out: json_object_agg refuses a NULL key, and a project
+    without a payment type (or with a NULL skill) would fail the whole page.
+    """
+    counts = (
+        select(column.label("value"), func.count().label("n"))
+        .select_from(source)
+        .group_by(literal_column("value"))
+        .subquery()
+    )
+    return select(
+        func.coalesce(
+            func.json_object_agg(counts.c.value, counts.c.n).filter(counts.c.value.isnot(None)),
+            literal_column("'{}'::json"),
+            type_=JSON
+        )
+    ).scalar_subquery()
+
+def with_facets(page: Select, conditions: list) -> Select:
+    """Attach skill and payment type facet counts to a page query.
+
+    The facet counts cover every project matching ``conditions``, not just the
+    page. Both are computed in the same statement: the one-row facet subquery
+    is left joined to the page so an empty page still carries its facets.
+    """
+    matching = select(Projects.skill_required, Projects.payment_type).where(*conditions).cte("matching")
+    facets = select(
+        _json_counts(func.unnest(matching.c.skill_required), matching).label("skill_facets"),
+        _json_counts(matching.c.payment_type, matching).label("payment_type_facets"),
+    ).subquery("facets")
+    page = page.subquery("page")
+    return (
+        select(facets, page)
+        .select_from(facets.outerjoin(page, true()))
+        .order_by(page.c.created_at.desc(), page.c.project_id.desc())
+    )
+
+def next_page_cursor(rows: list, limit: int) -> Optional[str]:
+    """Return the cursor after the last row of a page fetched with limit + 1"""
+    if len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor(last.created_at, last.project_id)
+
+# The text search configuration of PROJECT_SEARCH_VECTOR; queries must be parsed with the same one
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+# Highlight markers. They are stripped from the text before ts_headline runs, so
+# after HTML-escaping they can only be the ones ts_headline put in
+HIGHLIGHT_START, HIGHLIGHT_STOP = "\x02", "\x03"
+NAME_HEADLINE_OPTIONS = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, HighlightAll=true"
+DETAILS_HEADLINE_OPTIONS = (
+    f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, "
+    "MaxFragments=2, MinWords=10, MaxWords=30, FragmentDelimiter=\" … \""
+)
+# Created by the search migration only where pg_trgm is available
+TRIGRAM_INDEX = "ix_projects_project_name_trgm"
+_trigram_index_present: Optional[bool] = None
+
+def _without_markers(column):
+    return func.translate(column, HIGHLIGHT_START + HIGHLIGHT_STOP, "")
+
+def fulltext_search(q: str, conditions: list, limit: int, after: Optional[Tuple[float, int]] = None) -> Select:
+    """Page of projects matching ``q``, best ``ts_rank`` first.
+
+    The GIN index on the stored ``search_vector`` finds the matches, so only
+    matching rows are ranked, and ``ts_headline`` runs on the page alone.
+    Keyset pagination is on (score, project_id); fetches one extra row.
+    """
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    # Normalization 1 divides by 1 + log(document length), so long details do not win on volume
+    rank = func.ts_rank(Projects.search_vector, tsquery, 1)
+    page = (
+        dashboard_query()
+        .add_columns(rank.label("score"))
+        .where(Projects.search_vector.bool_op("@@")(tsquery), *conditions)
+    )
+    if after:
+        page = page.where(tuple_(rank, Projects.project_id) < after)
+    page = page.order_by(rank.desc(), Projects.project_id.desc()).limit(limit + 1).subquery("page")
+    return select(
+        page,
+        func.ts_headline(SEARCH_CONFIG, _without_markers(page.c.project_name), tsquery, NAME_HEADLINE_OPTIONS)
+        .label("name_highlight"),
+        func.ts_headline(SEARCH_CONFIG, _without_markers(page.c.details), tsquery, DETAILS_HEADLINE_OPTIONS)
+        .label("details_highlight"),
+    ).order_by(page.c.score.desc(), page.c.project_id.desc())
+
+def fuzzy_search(q: str, conditions: list, limit: int, after: Optional[Tuple[float, int]] = None) -> Select:
+    """Page of projects whose name is closest to ``q`` by pg_trgm word similarity.
+
+    The inner query walks the GiST trigram index nearest first; the distance
+    cutoff is applied outside it, because as a WHERE clause it would make a
+    query with few close names scan the whole index. Keyset pagination is on
+    (distance, project_id); fetches one extra row.
+    """
+    distance = literal(q, String).op("<<->", return_type=Float)(Projects.project_name)
+    nearest = dashboard_query().add_columns(distance.label("score")).where(*conditions)
+    if after:
+        nearest = nearest.where(tuple_(distance, Projects.project_id) > after)
+    nearest = nearest.order_by(distance, Projects.project_id).limit(limit + 1).subquery("nearest")
+    return (
+        select(
+            nearest,
+            _without_markers(nearest.c.project_name).label("name_highlight"),
+            func.left(_without_markers(nearest.c.details), settings.SEARCH_SNIPPET_CHARS).label("details_highlight"),
+        )
+        .where(nearest.c.score < settings.SEARCH_FUZZY_MAX_DISTANCE)
+        .order_by(nearest.c.score, nearest.c.project_id)
+    )
+
+async def trigram_index_present(db: AsyncSession) -> bool:
+    """Whether the fuzzy fallback can run here; looked up once per worker"""
+    global _trigram_index_present
+    if _trigram_index_present is None:
+        _trigram_index_present = (await db.execute(
+            select(func.to_regclass(literal(TRIGRAM_INDEX, String)).isnot(None))
+        )).scalar()
+    return _trigram_index_present
+
+def highlighted(text: Optional[str]) -> str:
+    """HTML-escape a snippet and turn its highlight markers into <mark> tags"""
+    return html.escape(text or "").replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_STOP, "</mark>")
+
+def to_search_response(row, mode: str) -> dict:
+    """Map a fulltext_search or fuzzy_search row to the SearchResult fields"""
+    item = to_dashboard_response(row)
+    # ts_rank in fulltext mode; word similarity, 1 - distance, in fuzzy mode
+    item["score"] = row.score if mode == "fulltext" else 1 - row.score
+    item["highlights"] = {
+        "projectName": highlighted(row.name_highlight),
+        "details": highlighted(row.details_highlight)
+    }
+    return item
+
+def project_values(project: ProjectBase, client_id: int) -> dict:
+    """Column values for a new Projects row from a validated ProjectBase.
+
+    Dates are already known to be YYYY-MM-DD by ProjectBase's validator.
+    """
+    return {
+        "client_id": client_id,
+        "project_name": project.projectName,
+        "client_name": project.clientName,
+        "details": project.details,
+        "skill_required": project.skills,
+        "payment_type": project.paymentType,  # Changed from Payment_Type
+        "project_status": project.projectStatus,
+        "github_link": str(project.githubLink) if project.githubLink else None,  # Changed from Github_link
+        "start_date": datetime.strptime(project.startDate, "%Y-%m-%d") if project.startDate else None,
+        "end_date": datetime.strptime(project.endDate, "%Y-%m-%d") if project.endDate else None,
+        "pay_per_hour": float(project.payPerHour) if project.payPerHour else None,
+        "pay_per_project": float(project.payPerProject) if project.payPerProject else None,
+        "duration": int(project.duration) if project.duration else None,
+        "created_at": datetime.now(timezone.utc)
+    }
+
+def new_project_item(values: dict, project_id: int, client: Principal) -> dict:
+    """ProjectWithUserResponse fields of a project ``client`` just inserted, without reading it back"""
+    return {
+        "project_id": project_id,
+        "projectName": values["project_name"],
+        "clientName": values["client_name"],
+        "details": values["details"],
+        "skills": values["skill_required"],
+        "paymentType": values["payment_type"],
+        "client_name": client.name,
+        "client_email": client.email,
+        "client_profile_pic": avatar_url(client.profile_pic_url),
+        "created_at": values["created_at"]
+    }
+
 async def get_project_or_404(
         project_id: int,
         db: AsyncSession,
@@ -98,71 +520,25 @@ async def get_project_or_404(
 async def create_project(
     project: ProjectBase,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Create a new project"""
     try:
-        # First, validate the dates if they exist
-        start_date = None
-        end_date = None
-        
-        if project.startDate:
-            try:
-                start_date = datetime.strptime(project.startDate, "%Y-%m-%d")
-            except ValueError:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid start date format. Use YYYY-MM-DD"
-                )
-        
-        if project.endDate:
-            try:
-                end_date = datetime.strptime(project.endDate, "%Y-%m-%d")
-            except ValueError:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid end date format. Use YYYY-MM-DD"
-                )
-
         # Create new project with validated data
-        new_project = Projects(
-            client_id=current_user.id,
-            project_name=project.projectName,
-            client_name=project.clientName,
-            details=project.details,
-            skill_required=project.skills,
-            payment_type=project.paymentType,  # Changed from Payment_Type
-            project_status=project.projectStatus,
-            github_link=str(project.githubLink) if project.githubLink else None,  # Changed from Github_link
-            start_date=start_date,
-            end_date=end_date,
-            pay_per_hour=float(project.payPerHour) if project.payPerHour else None,
-            pay_per_project=float(project.payPerProject) if project.payPerProject else None,
-            duration=int(project.duration) if project.duration else None,
-            created_at=datetime.now(timezone.utc)
-        )
+        values = project_values(project, current_user.id)
+        new_project = Projects(**values)
 
         db.add(new_project)
+        # every column was set here and the id came back from INSERT ... RETURNING,
+        # so there is nothing to refresh
+        await db.flush()
+        await log_projects_added(db, [new_project.project_id])
         await db.commit()
-        await db.refresh(new_project)
-
-        return ProjectResponse(
-            project_id=new_project.project_id,
-            client_id=new_project.client_id,
-            projectName=new_project.project_name,
-            clientName=new_project.client_name,
-            details=new_project.details,
-            skills=new_project.skill_required,
-            paymentType=new_project.payment_type,  # Changed from Payment_Type
-            projectStatus=new_project.project_status,
-            githubLink=new_project.github_link,  # Changed from Github_link
-            startDate=new_project.start_date.strftime("%Y-%m-%d") if new_project.start_date else None,
-            endDate=new_project.end_date.strftime("%Y-%m-%d") if new_project.end_date else None,
-            payPerHour=float(new_project.pay_per_hour) if new_project.pay_per_hour else None,
-            payPerProject=float(new_project.pay_per_project) if new_project.pay_per_project else None,
-            duration=new_project.duration,
-            created_at=new_project.created_at
-        )
+        index_project(new_project.project_id, new_project.skill_required, new_project.created_at)
+        await invalidate_project_reads()
+        project_feed.publish([new_project_item(values, new_project.project_id, current_user)])
+
+        return FastJSONResponse(to_project_response(new_project), status_code=status.HTTP_201_CREATED)
 
     except Exception as e:
         await db.rollback()
@@ -172,43 +548,126 @@ async def create_project(
             detail=f"Failed to create project: {str(e)}"
         )
     
-@router.get("/dashboard", response_model=List[ProjectWithUserResponse])
-async def get_dashboard_projects(
-    skip: int = 0,
-    limit: int = 10,
+@router.post("/bulk", response_model=BulkImportResult)
+async def bulk_import_projects(
+    items: List[Dict[str, Any]] = Body(..., max_length=settings.PROJECT_BULK_MAX_ITEMS),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
+):
+    """Create many projects in one round trip.
+
+    Each item is validated as a ProjectBase on its own; invalid items are
+    reported by index and skipped. The valid ones go in as a single multi-row
+    ``INSERT ... RETURNING`` under one commit.
+    """
+    values, indexes, errors = [], [], []
+    for index, item in enumerate(items):
+        try:
+            project = ProjectBase.model_validate(item)
+        except ValidationError as e:
+            errors.append({
+                "index": index,
+                "errors": e.errors(include_url=False, include_context=False, include_input=False)
+            })
+            continue
+        values.append(project_values(project, current_user.id))
+        indexes.append(index)
+
+    created = []
+    if values:
+        try:
+            result = await db.execute(
+                insert(Projects).returning(
+                    Projects.project_id, Projects.skill_required, Projects.created_at,
+                    sort_by_parameter_order=True
+                ),
+                values
+            )
+            rows = result.all()
+            await log_projects_added(db, [row.project_id for row in rows])
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to import projects: {str(e)}"
+            )
+        for index, row in zip(indexes, rows):
+            index_project(row.project_id, row.skill_required, row.created_at)
+            created.append({"index": index, "project_id": row.project_id})
+        await invalidate_project_reads()
+        project_feed.publish([
+            new_project_item(item, row.project_id, current_user) for item, row in zip(values, rows)
+        ])
+
+    return FastJSONResponse({"created": created, "errors": errors})
+
+@router.get("/export")
+async def export_projects(
+    request: Request,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    filters: ProjectFilters = Depends(),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Stream every matching project, oldest first, as NDJSON or CSV.
+
+    Rows are read through a server-side cursor in batches of
+    PROJECT_EXPORT_BATCH_SIZE on the export's own session, so memory stays
+    flat however many projects there are.
+    """
+    query = (
+        select(*PROJECT_COLUMNS)
+        .where(*filters.conditions())
+        .order_by(Projects.project_id)
+        .execution_options(yield_per=settings.PROJECT_EXPORT_BATCH_SIZE)
+    )
+    encode = csv_lines if export_format == "csv" else ndjson_lines
+
+    async def body():
+        if export_format == "csv":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow(EXPORT_FIELDS)
+            yield buffer.getvalue().encode()
+        async with read_only_session(request) as session:
+            result = await session.stream(query)
+            async for rows in result.partitions():
+                yield encode(rows)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/csv" if export_format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="projects.{export_format}"'}
+    )
+
+@router.get("/dashboard", response_model=DashboardPage)
+async def get_dashboard_projects(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    skip: Optional[int] = Query(None, ge=0, deprecated=True),
+    filters: ProjectFilters = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get projects with user details for dashboard"""
-    try:
-        query = (
-            select(Projects)
-            .join(User, Projects.client_id == User.id)
-            .order_by(Projects.created_at.desc())
-            .offset(skip)
-            .limit(limit)
+    async def load() -> bytes:
+        query = paginate_newest(
+            dashboard_query().where(*filters.conditions()), limit, cursor, skip
         )
         
         result = await db.execute(query)
-        projects = result.scalars().all()
-        
-        response_data = []
-        for project in projects:
-            response_data.append({
-                "project_id": project.project_id,
-                "projectName": project.project_name,
-                "clientName": project.client_name,
-                "details": project.details,
-                "skills": project.skill_required,
-                "paymentType": project.payment_type,  # Changed from Payment_Type
-                "client_name": project.client.name if project.client else None,
-                "client_email": project.client.email if project.client else None,
-                "client_profile_pic": project.client.profile_pic_url if project.client else None,
-                "created_at": project.created_at
-            })
+        rows = result.all()
         
-        return response_data
+        return dumps({
+            "items": [to_dashboard_response(row) for row in rows[:limit]],
+            "next_cursor": next_page_cursor(rows, limit)
+        })
 
+    try:
+        return await cached_json_response(request, PROJECTS_CACHE, load)
+
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in get_dashboard_projects: {str(e)}")  # Add this for debugging
         raise HTTPException(
@@ -216,49 +675,239 @@ async def get_dashboard_projects(
             detail=str(e)
         )
 
-@router.get("/", response_model=List[ProjectResponse])
+@router.get("/stream")
+async def stream_new_projects(
+    request: Request,
+    skills: Optional[List[str]] = Query(None, max_length=20),
+    skills_match: str = Query("any", pattern="^(any|all)$"),
+    payment_type: Optional[str] = Query(None, pattern="^(project|hourly)$"),
+    token: Optional[str] = Query(None, description="Access token, for EventSource clients that cannot set headers"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """Server-sent events: each new project, as a dashboard item, as soon as it is committed.
+
+    Events are ``project`` (id is the project id) and ``reset``, sent on
+    resume when the backlog no longer covers ``Last-Event-ID``: reload the
+    dashboard's first page, then carry on with the stream.
+    """
+    scheme, _, bearer = request.headers.get("authorization", "").partition(" ")
+    token = token or (bearer if scheme.lower() == "bearer" else None)
+    # A short-lived session: open streams must not hold database connections
+    async with read_session(request) as db:
+        await authenticate_token(token, db)
+
+    subscriber = project_feed.subscribe(skills, skills_match == "all", payment_type)
+    missed = []
+    if last_event_id is not None and last_event_id.strip().isdigit():
+        missed = project_feed.replay(subscriber, int(last_event_id))
+
+    async def events():
+        try:
+            yield b"retry: %d\n\n" % settings.PROJECT_FEED_RETRY_MS
+            for frame in missed:
+                yield frame
+            # A dropped stream still sends what was queued, then ends and the client resumes
+            while not (subscriber.dropped and subscriber.queue.empty()):
+                try:
+                    yield await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=settings.PROJECT_FEED_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield KEEPALIVE_FRAME
+        finally:
+            project_feed.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/", response_model=ProjectPage)
 async def get_all_projects(
-    skip: int = 0,
-    limit: int = 10,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    skip: Optional[int] = Query(None, ge=0, deprecated=True),
+    facets: bool = False,
+    filters: ProjectFilters = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Get all available projects, including client's own projects"""
-    try:
-        query = (
-            select(Projects)
-            .options(joinedload(Projects.client))
-            .order_by(Projects.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-        )
+    """Get all available projects, including client's own projects.
+
+    Pass the ``next_cursor`` of the previous page as ``cursor`` to continue;
+    ``skip`` is deprecated because Postgres still has to scan every skipped row.
+    With ``facets=true`` the page also carries per-skill and per-payment-type
+    counts over all matching projects, fetched in the same query.
+    """
+    async def load() -> bytes:
+        conditions = filters.conditions()
+        query = paginate_newest(select(*PROJECT_COLUMNS).where(*conditions), limit, cursor, skip)
+        if facets:
+            query = with_facets(query, conditions)
         
         result = await db.execute(query)
-        projects = result.unique().scalars().all()
+        rows = result.all()
+        page_rows = [row for row in rows if row.project_id is not None]
         
-        return projects
+        return dumps({
+            "items": [to_project_response(row) for row in page_rows[:limit]],
+            "next_cursor": next_page_cursor(page_rows, limit),
+            "facets": {
+                "skills": rows[0].skill_facets,
+                "payment_type": rows[0].payment_type_facets
+            } if facets else None
+        })
 
+    try:
+        return await cached_json_response(request, PROJECTS_CACHE, load)
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
 
+@router.get("/cache-stats")
+async def project_cache_stats(current_user: Principal = Depends(get_current_user)):
+    """Hit rate and size of the project read cache"""
+    return response_cache.stats()
+
+@router.get("/recommended", response_model=List[RecommendedProject])
+async def get_recommended_projects(
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Get the projects that best match the caller's profile skills.
+
+    Ranking runs against the in-memory skill index; the database is only hit
+    for the caller's skills and the primary-key fetch of the winners. Until the
+    index has loaded after a worker starts, the route answers 503.
+    """
+    if not project_matcher_loaded():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Recommendations are still loading. Please try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    skills = (await db.execute(
+        select(Profile.skills).where(Profile.user_id == current_user.id)
+    )).scalar()
+    matches = get_project_matcher().top_k(
+        skills or [],
+        limit,
+        recency_weight=settings.MATCHING_RECENCY_WEIGHT,
+        half_life_days=settings.MATCHING_RECENCY_HALF_LIFE_DAYS
+    )
+    if not matches:
+        return FastJSONResponse([])
+
+    result = await db.execute(
+        select(*PROJECT_COLUMNS).where(Projects.project_id.in_([project_id for project_id, _ in matches]))
+    )
+    rows = {row.project_id: row for row in result.all()}
+    return FastJSONResponse([
+        {"project": to_project_response(rows[project_id]), "score": score}
+        for project_id, score in matches
+        if project_id in rows
+    ])
+
+@router.get("/search", response_model=SearchPage)
+async def search_projects(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    filters: ProjectFilters = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Search projects by name and details, best match first.
+
+    ``q`` takes web search syntax: ``"quoted phrases"``, ``or`` and ``-excluded``
+    words. A match in the project name outranks one in the details. When
+    nothing matches and pg_trgm is installed, the first page falls back to the
+    project names closest to ``q``, so a typo still finds something; ``mode``
+    says which ranking the page comes from, and its ``next_cursor`` stays in
+    that mode. The project filters apply as on the dashboard.
+    """
+    mode, after = "fulltext", None
+    if cursor:
+        mode, score, project_id = decode_search_cursor(cursor)
+        after = (score, project_id)
+
+    async def load() -> bytes:
+        conditions = filters.conditions()
+        page_mode = mode
+        rows = []
+        if page_mode == "fulltext":
+            rows = (await db.execute(fulltext_search(q, conditions, limit, after))).all()
+            if not rows and after is None and await trigram_index_present(db):
+                page_mode = "fuzzy"
+        if page_mode == "fuzzy" and await trigram_index_present(db):
+            rows = (await db.execute(fuzzy_search(q, conditions, limit, after))).all()
+
+        last = rows[limit - 1] if len(rows) > limit else None
+        return dumps({
+            "items": [to_search_response(row, page_mode) for row in rows[:limit]],
+            "next_cursor": encode_search_cursor(page_mode, last.score, last.project_id) if last else None,
+            "mode": page_mode
+        })
+
+    try:
+        return await cached_json_response(request, PROJECTS_CACHE, load)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get("/stats", response_model=MarketplaceStats)
+async def get_marketplace_stats(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Open projects per skill, pay per skill and projects per status.
+
+    Skills are listed most projects first. Every project is open until it is
+    deleted. The numbers come from summary tables that project writes are
+    folded into, through a per-worker snapshot: a write shows up within
+    AGGREGATES_MAX_STALENESS_SECONDS, plus replica lag when reads go to a replica.
+    The body is cached with the project pages, so a cached copy can outlive a
+    newer snapshot by up to RESPONSE_CACHE_TTL_SECONDS when no project is written.
+    """
+    async def load() -> bytes:
+        return await marketplace_aggregates.response_body(db)
+
+    return await cached_json_response(request, PROJECTS_CACHE, load)
+
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(
+    request: Request,
     project_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get a project by ID"""
-    return await get_project_or_404(project_id, db)
+    async def load() -> bytes:
+        return dumps(to_project_response(await get_project_or_404(project_id, db)))
+
+    return await cached_json_response(request, PROJECTS_CACHE, load)
 
 @router.put("/{project_id}", response_model=ProjectResponse)
 async def update_project(
     project_id: int,
     project_update: ProjectBase,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Update the project based on ID"""
     project = await get_project_or_404(project_id, db, current_user.id)
@@ -275,6 +924,7 @@ async def update_project(
     field_mapping = {
         'projectName': 'project_name',
         'clientName': 'client_name',
+        'skills': 'skill_required',
         'paymentType': 'payment_type',  # Changed from Payment_Type
         'projectStatus': 'project_status',
         'githubLink': 'github_link',  # Changed from Github_link
@@ -282,13 +932,17 @@ async def update_project(
         'payPerProject': 'pay_per_project',
     }
 
-    for key, val in update_data.items():
-        db_field = field_mapping.get(key, key)
-        setattr(project, db_field, val)
     try:
+        await log_projects_removed(db, [project_id])
+        for key, val in update_data.items():
+            db_field = field_mapping.get(key, key)
+            setattr(project, db_field, val)
+        await db.flush()
+        await log_projects_added(db, [project_id])
         await db.commit()
-        await db.refresh(project)
-        return project
+        index_project(project.project_id, project.skill_required, project.created_at)
+        await invalidate_project_reads()
+        return FastJSONResponse(to_project_response(project))
     except Exception as e:
         await db.rollback()
         raise HTTPException(
@@ -300,45 +954,20 @@ async def update_project(
 async def delete_project(
     project_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Delete a project based on its ID"""
     project = await get_project_or_404(project_id, db, current_user.id)
     
     try:
+        await log_projects_removed(db, [project_id])
         await db.delete(project)
         await db.commit()
+        unindex_project(project_id)
+        await invalidate_project_reads()
     except Exception as e:
         await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
-
-@router.get("/", response_model=List[ProjectResponse])
-async def get_all_projects(
-    skip: int = 0,
-    limit: int = 10,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Get all available projects, including client's own projects"""
-    try:
-        query = (
-            select(Projects)
-            .options(joinedload(Projects.client))
-            .order_by(Projects.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-        )
-        
-        result = await db.execute(query)
-        projects = result.unique().scalars().all()
-        
-        return projects
-
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
@@ -1,10 +1,10 @@
 import re
-import uuid
 import logging
 from typing import Annotated
 from pathlib import Path
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, status
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
@@ -12,15 +12,22 @@ from app.db.models import User
 from app.db.database import get_db
 from app.core.config import settings
 from app.core.security import (
-    get_password_hash,
-    verify_password,
+    ensure_password_capacity,
+    get_password_hash_async,
+    verify_password_async,
     create_access_token,
-    get_current_user
+    principal_claims,
+    principal_cache,
+    get_current_user,
+    Principal
 )
 from pydantic import BaseModel
 from app.core.twilio_client import twilio_service
+from app.core.ratelimit import client_ip, normalize_phone_number, otp_admission
+from app.core.uploads import UnsupportedUpload, UploadTooLarge, save_content_addressed
+from app.core.images import UNREADABLE_IMAGE_ERRORS, generate_avatar_variants
 
-UPLOAD_DIR = Path("uploads/profile_pic")
+UPLOAD_DIR = Path(settings.PROFILE_PIC_DIR)
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 router = APIRouter()
@@ -35,33 +42,40 @@ class VerifyOTPRequest(BaseModel):
 
 # Helper function for profile pic upload
 async def store_file(file: UploadFile):
+    """Store a profile picture under its SHA-256 and return its static URL.
 
-    # validate file path
-    if file.content_type not in ["image/jpeg", "image/png"]:
+    The upload is copied in fixed-size chunks on a worker thread, so memory
+    stays bounded whatever the request size; identical pictures share a file.
+    Avatar thumbnails are rendered in the image process pool before returning.
+    """
+    try:
+        filename, is_new = await run_in_threadpool(
+            save_content_addressed, file.file, UPLOAD_DIR, settings.PROFILE_PIC_MAX_BYTES
+        )
+    except UnsupportedUpload:
         raise HTTPException(
             status_code = status.HTTP_400_BAD_REQUEST, 
             detail = "Only JPEG/PNG images allowed"
         )
-    
-    # validate file size max 2MB
-    max_size = 2 * 1024 * 1024
-    content = await file.read()
-    if len(content) > max_size:
+    except UploadTooLarge:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
             detail = "File too large (max allowed size upto 2MB)"
         )
-    
-    # generate unique filename
-    file_ext = file.filename.split(".")[-1]
-    filename = f"{uuid.uuid4()}.{file_ext}"
-    file_path = UPLOAD_DIR / filename
 
-    
-    # save the file
-    with open(file_path, "wb") as buffer:
-        buffer.write(content)
-    
+    try:
+        await generate_avatar_variants(filename)
+    except UNREADABLE_IMAGE_ERRORS:
+        if is_new:
+            (UPLOAD_DIR / filename).unlink(missing_ok=True)
+        raise HTTPException(
+            status_code = status.HTTP_400_BAD_REQUEST,
+            detail = "Could not read image"
+        )
+    except Exception as e:
+        # the static handler serves the original until the thumbnails exist
+        logger.warning(f"Avatar thumbnails failed for {filename}: {str(e)}")
+
     return f"/static/profile_pics/{filename}"
 
 @router.post("/signup")
@@ -73,6 +87,7 @@ async def signup(
     profile_pic: UploadFile = File(None),
     db: AsyncSession = Depends(get_db)
 ):
+    ensure_password_capacity()
     # validating email format
     if not re.match(r"[^@]+@[^@]+\.[^@]+", email):
         raise HTTPException(
@@ -88,7 +103,9 @@ async def signup(
             status_code = status.HTTP_400_BAD_REQUEST, 
             detail = "Email already registered"
         )
-    hashed_password = get_password_hash(password)
+    # end the read transaction so the connection goes back to the pool while hashing
+    await db.commit()
+    hashed_password = await get_password_hash_async(password)
 
     # process profile picture
     profile_pic_url = None
@@ -105,7 +122,6 @@ async def signup(
     )
     db.add(new_user)
     await db.commit()
-    await db.refresh(new_user)
 
     return {
         "message": "User created successfully",
@@ -117,20 +133,23 @@ async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     db: AsyncSession = Depends(get_db)
 ):
+    ensure_password_capacity()
     try:
         user = await db.execute(
             select(User).where(User.email == form_data.username)
         )
         user = user.scalar()
+        # end the read transaction so the connection goes back to the pool while hashing
+        await db.commit()
         
-        if not user or not verify_password(form_data.password, user.hashed_password):
+        if not user or not user.hashed_password or not await verify_password_async(form_data.password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        access_token = create_access_token(data={"sub": user.email})
+        access_token = create_access_token(data={"sub": user.email, **principal_claims(user)})
         return {
             "access_token": access_token, 
             "token_type": "bearer",
@@ -147,20 +166,29 @@ async def login(
 @router.post("/phone/start")
 async def start_phone_verification(
     request: PhoneNumberRequest,
+    http_request: Request,
     db: AsyncSession = Depends(get_db)
 ):
     """Start phone verification process"""
     try:
-        # Validate and format phone number
-        phone_number = request.phone_number.strip()
-        if not phone_number.startswith('+'):
-            phone_number = f"+1{phone_number}"  # Assuming US numbers
+        # Validate and normalize phone number to E.164
+        phone_number = normalize_phone_number(request.phone_number)
+
+        # Rate limit per number and IP; a quick resend reuses the code already sent
+        if not await otp_admission.admit_send(phone_number, client_ip(http_request)):
+            return {"message": "Verification code sent successfully"}
 
         # Send verification code
-        await twilio_service.send_verification(phone_number)
+        try:
+            await twilio_service.send_verification(phone_number)
+        except Exception:
+            await otp_admission.send_failed(phone_number)
+            raise
         
         return {"message": "Verification code sent successfully"}
     
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -173,12 +201,21 @@ async def start_phone_verification(
         )
 
 @router.post("/phone/verify")
-async def verify_phone(request: VerifyOTPRequest, db: AsyncSession = Depends(get_db)):
+async def verify_phone(
+    request: VerifyOTPRequest,
+    http_request: Request,
+    db: AsyncSession = Depends(get_db)
+):
     try:
-        # Format phone number
-        phone_number = request.phone_number.strip()
-        if not phone_number.startswith('+'):
-            phone_number = f"+1{phone_number}"
+        # Normalize phone number to E.164
+        try:
+            phone_number = normalize_phone_number(request.phone_number)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        await otp_admission.admit_check(phone_number, client_ip(http_request))
         
         # Verify code with Twilio
         try:
@@ -210,11 +247,10 @@ async def verify_phone(request: VerifyOTPRequest, db: AsyncSession = Depends(get
             )
             db.add(user)
             await db.commit()
-            await db.refresh(user)
 
         # Generate access token
         access_token = create_access_token(
-            data={"sub": phone_number, "user_id": str(user.id)}
+            data={"sub": phone_number, **principal_claims(user)}
         )
 
         return {
@@ -223,9 +259,21 @@ async def verify_phone(request: VerifyOTPRequest, db: AsyncSession = Depends(get
             "user_id": user.id
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Phone verification error: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
+
+@router.get("/principal-cache")
+async def principal_cache_stats(current_user: Principal = Depends(get_current_user)):
+    """Hit/miss counters of the authenticated-principal cache"""
+    return principal_cache.stats()
+
+@router.get("/otp-admission")
+async def otp_admission_stats(current_user: Principal = Depends(get_current_user)):
+    """Admitted, rejected and deduplicated OTP request counters"""
+    return otp_admission.stats()
@@ -0,0 +1,121 @@
+import asyncio
+import contextlib
+import time
+from typing import Optional
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from app.core.chat import ROOM_NAME, ChatSubscriber, chat_hub
+from app.core.config import settings
+from app.core.security import Principal, authenticate_token, get_current_user
+from app.db.database import read_session
+
+router = APIRouter(prefix="/chat", tags=["chat"])
+
+# Close codes: 1008 policy violation (bad token or room), 1013 try again later (fell behind)
+CLOSE_UNAUTHORIZED = status.WS_1008_POLICY_VIOLATION
+CLOSE_SLOW_CONSUMER = status.WS_1013_TRY_AGAIN_LATER
+
+
+def _error_frame(detail: str) -> str:
+    return orjson.dumps({"type": "error", "detail": detail}).decode()
+
+
+async def _send_frames(websocket: WebSocket, subscriber: ChatSubscriber):
+    while True:
+        await websocket.send_text(await subscriber.queue.get())
+
+
+async def _receive_messages(websocket: WebSocket, room: str, principal: Principal, subscriber: ChatSubscriber):
+    # Token bucket: one socket posting a burst would otherwise overflow every queue in the room
+    allowance, refilled_at = float(settings.CHAT_MESSAGE_BURST), time.monotonic()
+    while True:
+        try:
+            text = orjson.loads(await websocket.receive_text())["message"]
+        except (ValueError, TypeError, KeyError):
+            text = None
+        now = time.monotonic()
+        allowance = min(settings.CHAT_MESSAGE_BURST, allowance + (now - refilled_at) * settings.CHAT_MESSAGES_PER_SECOND)
+        refilled_at = now
+        if not isinstance(text, str) or not text.strip():
+            frame = _error_frame('Expected {"message": "<text>"}')
+        elif len(text.encode()) > settings.CHAT_MAX_MESSAGE_BYTES:
+            frame = _error_frame(f"Messages are limited to {settings.CHAT_MAX_MESSAGE_BYTES} bytes")
+        elif allowance < 1:
+            frame = _error_frame("Sending too fast; message discarded")
+        else:
+            allowance -= 1
+            try:
+                chat_hub.post(room, principal, text)
+            except ValueError:
+                frame = _error_frame("Message too long once encoded; shorten it or use fewer special characters")
+            else:
+                # Frames a client had buffered arrive back to back; let the senders drain between them
+                await asyncio.sleep(0)
+                continue
+        try:
+            subscriber.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            pass
+
+
+@router.websocket("/ws/{room}")
+async def chat_socket(websocket: WebSocket, room: str, token: Optional[str] = None, since: Optional[str] = None):
+    """Join a room: receive its recent history, then every new message.
+
+    Browsers cannot set headers on a WebSocket, so the access token may come
+    as ``?token=``. Send ``{"message": "..."}`` frames to post.
+    """
+    scheme, _, bearer = websocket.headers.get("authorization", "").partition(" ")
+    token = token or (bearer if scheme.lower() == "bearer" else None)
+    if not ROOM_NAME.match(room):
+        await websocket.close(code=CLOSE_UNAUTHORIZED, reason="Invalid room name")
+        return
+    try:
+        # A short-lived session: open sockets must not hold database connections
+        async with read_session(websocket) as db:
+            principal = await authenticate_token(token, db)
+    except HTTPException:
+        await websocket.close(code=CLOSE_UNAUTHORIZED, reason="Could not validate credentials")
+        return
+
+    await websocket.accept()
+    subscriber = chat_hub.join(room)
+    try:
+        await websocket.send_text(orjson.dumps({"type": "history", "messages": chat_hub.history(room, since)}).decode())
+        dropped = asyncio.create_task(subscriber.dropped.wait())
+        tasks = {
+            dropped,
+            asyncio.create_task(_send_frames(websocket, subscriber)),
+            asyncio.create_task(_receive_messages(websocket, room, principal, subscriber)),
+        }
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        if dropped in done:
+            # The sender may be stuck on a full socket buffer, so don't wait long on the close frame
+            with contextlib.suppress(asyncio.TimeoutError, RuntimeError, WebSocketDisconnect):
+                await asyncio.wait_for(
+                    websocket.close(code=CLOSE_SLOW_CONSUMER, reason="Too far behind; reconnect with since"),
+                    timeout=1
+                )
+            return
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                raise error
+    except WebSocketDisconnect:
+        pass
+    finally:
+        chat_hub.leave(room, subscriber)
+
+
+@router.get("/rooms/{room}/messages")
+async def room_messages(
+    room: str,
+    since: Optional[str] = Query(None, description="Only messages after this message id"),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Recent messages buffered for a room on this worker, oldest first"""
+    if not ROOM_NAME.match(room):
+        raise HTTPException(status_code=404, detail="Room not found")
+    return {"room": room, "messages": chat_hub.history(room, since)}
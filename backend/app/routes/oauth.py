@@ -3,7 +3,8 @@ from authlib.integrations.starlette_client import OAuth
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.config import settings
-from app.core.security import create_access_token
+from app.core.oauth_providers import fetch_github_profile, provider_metadata
+from app.core.security import create_access_token, principal_claims
 from app.db.database import get_db
 from app.db.models import User
 from starlette.responses import RedirectResponse
@@ -16,7 +17,7 @@ oauth.register(
     name='google',
     client_id=settings.GOOGLE_CLIENT_ID,
     client_secret=settings.GOOGLE_CLIENT_SECRET,
-    server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
+    server_metadata_url=settings.GOOGLE_METADATA_URL,  # served from provider_metadata's cache
     client_kwargs={'scope': 'openid email profile'}
 )
 
@@ -25,22 +26,24 @@ oauth.register(
     name='github',
     client_id=settings.GITHUB_CLIENT_ID,
     client_secret=settings.GITHUB_CLIENT_SECRET,
-    access_token_url='https://github.com/login/oauth/access_token',
+    access_token_url=f'{settings.GITHUB_OAUTH_BASE_URL}/login/oauth/access_token',
     access_token_params=None,
-    authorize_url='https://github.com/login/oauth/authorize',
+    authorize_url=f'{settings.GITHUB_OAUTH_BASE_URL}/login/oauth/authorize',
     authorize_params=None,
-    api_base_url='https://api.github.com/',
+    api_base_url=f"{settings.GITHUB_API_BASE_URL.rstrip('/')}/",
     client_kwargs={'scope': 'user:email'},
 )
 
 @router.get("/auth/google")
 async def google_auth(request: Request):
     redirect_uri = settings.GOOGLE_REDIRECT_URI
+    await provider_metadata.apply(oauth.google, settings.GOOGLE_METADATA_URL)
     return await oauth.google.authorize_redirect(request, redirect_uri)
 
 @router.get("/auth/google/callback")
 async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
     try:
+        await provider_metadata.apply(oauth.google, settings.GOOGLE_METADATA_URL)
         token = await oauth.google.authorize_access_token(request)
         user_info = token.get('userinfo')
         if not user_info:
@@ -60,7 +63,7 @@ async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
             db.add(user)
             await db.commit()
 
-        access_token = create_access_token(data={"sub": user.email})
+        access_token = create_access_token(data={"sub": user.email, **principal_claims(user)})
         
         # Redirect to frontend with token
         frontend_url = "http://localhost:3000/oauth-callback"
@@ -79,12 +82,8 @@ async def github_auth(request: Request):
 async def github_callback(request: Request, db: AsyncSession = Depends(get_db)):
     try:
         token = await oauth.github.authorize_access_token(request)
-        resp = await oauth.github.get('user', token=token)
-        user_info = resp.json()
-        
-        # Get email
-        resp = await oauth.github.get('user/emails', token=token)
-        emails = resp.json()
+        # Profile and emails in parallel over the shared connection pool
+        user_info, emails = await fetch_github_profile(token['access_token'])
         primary_email = next(e['email'] for e in emails if e['primary'])
 
         user = await db.execute(
@@ -101,7 +100,7 @@ async def github_callback(request: Request, db: AsyncSession = Depends(get_db)):
             db.add(user)
             await db.commit()
 
-        access_token = create_access_token(data={"sub": user.email})
+        access_token = create_access_token(data={"sub": user.email, **principal_claims(user)})
         
         # Redirect to frontend with token
         frontend_url = "http://localhost:3000/oauth-callback"
@@ -0,0 +1,29 @@
+from typing import List
+from fastapi import APIRouter, Depends, Query, status
+from app.core.config import settings
+from app.core.presence import presence_registry
+from app.core.security import Principal, get_current_user
+
+router = APIRouter(prefix="/presence", tags=["presence"])
+
+
+@router.post("/heartbeat")
+async def heartbeat(current_user: Principal = Depends(get_current_user)):
+    """Mark the caller online for another TTL; clients should call this at least every ``ttl_seconds / 2``"""
+    presence_registry.heartbeat(current_user.id)
+    return {"ttl_seconds": settings.PRESENCE_TTL_SECONDS}
+
+
+@router.delete("/heartbeat", status_code=status.HTTP_204_NO_CONTENT)
+async def leave(current_user: Principal = Depends(get_current_user)):
+    """Mark the caller offline now, e.g. when the page unloads"""
+    presence_registry.leave(current_user.id)
+
+
+@router.get("")
+async def online_users(
+    user_ids: List[int] = Query(..., max_length=settings.PRESENCE_QUERY_MAX_IDS),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Which of ``user_ids`` are online, plus how many users are online in total"""
+    return {"online": presence_registry.online(user_ids), "online_count": presence_registry.online_count}
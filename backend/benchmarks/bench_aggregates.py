@@ -0,0 +1,134 @@
+"""Compare serving marketplace stats from the summary tables with a GROUP BY over projects.
+
+Seed the bench database first (``python -m benchmarks.seed``), then from backend/:
+
+    BENCH_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.bench_aggregates
+
+Reported:
+
+- group_by: the same numbers straight from ``projects``, with exact medians
+  from percentile_cont, which each dashboard view would otherwise run
+- summary_load: one read of the summary tables, what a snapshot reload costs
+- snapshot_hit: ``response_body`` while the snapshot is fresh, what most
+  requests cost
+- write: one project update in its transaction, without and with its two
+  log rows, rolled back
+- fold: folding the log rows of ``--writes`` committed updates, which raise
+  the hourly pay of seeded projects by one
+- reconcile: the recount that corrects drift, and how many rows it found off
+
+It also checks every median served against the exact one; buckets are
+PAY_BUCKET_RATIO wide, so none should be more than 2% off.
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Optional
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.aggregates import FOLD_LOG, LOG_PROJECTS, RECONCILE, MarketplaceAggregates
+from app.db.models import Projects
+from benchmarks.common import bench_database_url, migrate_bench_database, summarize, time_async
+
+GROUP_BY_SKILLS = text("""
+    WITH per_skill AS (
+        SELECT skills.skill, projects.pay_per_hour, projects.pay_per_project
+        FROM projects CROSS JOIN LATERAL (SELECT DISTINCT unnest(projects.skill_required) AS skill) AS skills
+    )
+    SELECT skill, count(*) AS projects,
+           avg(pay_per_hour) AS pay_per_hour_average,
+           percentile_cont(0.5) WITHIN GROUP (ORDER BY pay_per_hour) FILTER (WHERE pay_per_hour > 0)
+               AS pay_per_hour_median,
+           avg(pay_per_project) AS pay_per_project_average,
+           percentile_cont(0.5) WITHIN GROUP (ORDER BY pay_per_project) FILTER (WHERE pay_per_project > 0)
+               AS pay_per_project_median
+    FROM per_skill
+    GROUP BY skill
+""")
+GROUP_BY_STATUSES = text("SELECT project_status, count(*) FROM projects GROUP BY project_status")
+
+
+def median_error(exact: Optional[float], served: Optional[dict]) -> float:
+    if exact is None or served is None or served["median"] is None:
+        return 0.0
+    return abs(served["median"] - exact) / exact
+
+
+async def main(iterations: int, writes: int):
+    migrate_bench_database()
+    engine = create_async_engine(bench_database_url())
+    aggregates = MarketplaceAggregates(max_staleness_seconds=60, fold_seconds=1, reconcile_seconds=3600)
+    report = {}
+
+    async with engine.connect() as conn:
+        report["projects"] = (await conn.execute(select(func.count()).select_from(Projects))).scalar()
+
+        async def group_by():
+            await conn.execute(GROUP_BY_SKILLS)
+            await conn.execute(GROUP_BY_STATUSES)
+
+        report["group_by"] = summarize(await time_async(group_by, max(iterations // 10, 3), warmup=1))
+        report["summary_load"] = summarize(await time_async(lambda: aggregates._load(conn), iterations))
+        report["snapshot_hit"] = summarize(await time_async(lambda: aggregates.response_body(conn), iterations))
+
+        exact = {row.skill: row for row in (await conn.execute(GROUP_BY_SKILLS)).all()}
+        served = json.loads(await aggregates._load(conn))["skills"]
+        errors = [
+            error
+            for skill in served
+            for error in (
+                median_error(exact[skill["skill"]].pay_per_hour_median, skill["pay_per_hour"]),
+                median_error(exact[skill["skill"]].pay_per_project_median, skill["pay_per_project"]),
+            )
+        ]
+        report["median_error"] = {"skills": len(served), "max_pct": round(max(errors) * 100, 3)}
+        project_ids = (await conn.execute(
+            select(Projects.project_id).order_by(Projects.project_id).limit(writes)
+        )).scalars().all()
+        await conn.rollback()
+
+    bump = update(Projects).values(pay_per_hour=Projects.pay_per_hour + 1)
+    for logged in (False, True):
+        async def write(project_id=project_ids[0]):
+            async with engine.connect() as conn:
+                if logged:
+                    await conn.execute(LOG_PROJECTS, {"project_ids": [project_id], "sign": -1})
+                await conn.execute(bump.where(Projects.project_id == project_id))
+                if logged:
+                    await conn.execute(LOG_PROJECTS, {"project_ids": [project_id], "sign": 1})
+                await conn.rollback()
+
+        report["write_logged" if logged else "write_plain"] = summarize(await time_async(write, iterations))
+
+    for project_id in project_ids:
+        async with engine.begin() as conn:
+            await conn.execute(LOG_PROJECTS, {"project_ids": [project_id], "sign": -1})
+            await conn.execute(bump.where(Projects.project_id == project_id))
+            await conn.execute(LOG_PROJECTS, {"project_ids": [project_id], "sign": 1})
+    async with engine.begin() as conn:
+        start = time.perf_counter()
+        folded = (await conn.execute(FOLD_LOG)).scalar()
+        report["fold"] = {"log_rows": folded, "ms": round((time.perf_counter() - start) * 1000, 3)}
+    async with engine.begin() as conn:
+        start = time.perf_counter()
+        corrected = (await conn.execute(RECONCILE)).scalar()
+        report["reconcile"] = {"rows_corrected": corrected, "ms": round((time.perf_counter() - start) * 1000, 3)}
+    await engine.dispose()
+
+    print(json.dumps(report, indent=2))
+    print(f"{report['projects']} projects: group_by p50 {report['group_by']['p50_ms']:.1f} ms  "
+          f"summary_load p50 {report['summary_load']['p50_ms']:.3f} ms  "
+          f"snapshot_hit p50 {report['snapshot_hit']['p50_ms'] * 1000:.1f} us")
+    print(f"write p50 {report['write_plain']['p50_ms']:.3f} ms plain, {report['write_logged']['p50_ms']:.3f} ms logged  "
+          f"fold {report['fold']['log_rows']} rows {report['fold']['ms']:.1f} ms  "
+          f"reconcile {report['reconcile']['ms']:.0f} ms ({report['reconcile']['rows_corrected']} rows off)  "
+          f"median error max {report['median_error']['max_pct']}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--writes", type=int, default=1000, help="committed updates folded in one go")
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.writes))
@@ -0,0 +1,113 @@
+"""Compare the ORM and projection paths of the dashboard feed.
+
+Run from backend/:
+
+    BENCH_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.bench_dashboard_projection
+
+Tables are created and seeded inside a transaction that is rolled back at the
+end, so the target database is left untouched.
+"""
+import argparse
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import joinedload
+from app.db.models import Base, Projects, User
+from app.routes.addproject import dashboard_query, paginate_newest, to_dashboard_response
+from benchmarks.common import bench_database_url, summarize, time_async
+
+PAGE_SIZES = (10, 100, 1000)
+
+
+async def seed(conn, projects: int, users: int):
+    await conn.run_sync(Base.metadata.create_all)
+    user_ids = (await conn.execute(
+        insert(User).returning(User.id),
+        [
+            {"name": f"bench user {i}", "email": f"bench{i}@example.com", "role": "client"}
+            for i in range(users)
+        ]
+    )).scalars().all()
+    now = datetime.now(timezone.utc)
+    await conn.execute(insert(Projects), [
+        {
+            "client_id": user_ids[i % len(user_ids)],
+            "project_name": f"Project {i}",
+            "client_name": f"Client {i % users}",
+            "details": "Benchmark project details " * 8,
+            "skill_required": ["python", "postgres", "react"],
+            "payment_type": "hourly",
+            "project_status": "featured",
+            "pay_per_hour": 50,
+            "created_at": now - timedelta(seconds=i),
+        }
+        for i in range(projects)
+    ])
+
+
+async def orm_page(session: AsyncSession, limit: int):
+    """The previous path: hydrate Projects and their client, then map attributes"""
+    query = paginate_newest(
+        select(Projects)
+        .join(User, Projects.client_id == User.id)
+        .options(joinedload(Projects.client)),
+        limit
+    )
+    projects = (await session.execute(query)).unique().scalars().all()
+    session.expunge_all()
+    return [
+        {
+            "project_id": project.project_id,
+            "projectName": project.project_name,
+            "clientName": project.client_name,
+            "details": project.details,
+            "skills": project.skill_required,
+            "paymentType": project.payment_type,
+            "client_name": project.client.name if project.client else None,
+            "client_email": project.client.email if project.client else None,
+            "client_profile_pic": project.client.profile_pic_url if project.client else None,
+            "created_at": project.created_at
+        }
+        for project in projects[:limit]
+    ]
+
+
+async def projection_page(session: AsyncSession, limit: int):
+    rows = (await session.execute(paginate_newest(dashboard_query(), limit))).all()
+    return [to_dashboard_response(row) for row in rows[:limit]]
+
+
+async def main(iterations: int, projects: int, users: int):
+    engine = create_async_engine(bench_database_url())
+    results = {}
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            await seed(conn, projects, users)
+            session = AsyncSession(bind=conn, expire_on_commit=False)
+            for limit in PAGE_SIZES:
+                assert len(await orm_page(session, limit)) == len(await projection_page(session, limit))
+                results[limit] = {
+                    "orm": summarize(await time_async(lambda: orm_page(session, limit), iterations)),
+                    "projection": summarize(await time_async(lambda: projection_page(session, limit), iterations)),
+                }
+        finally:
+            await trans.rollback()
+    await engine.dispose()
+
+    print(json.dumps(results, indent=2))
+    for limit, paths in results.items():
+        speedup = paths["orm"]["p50_ms"] / max(paths["projection"]["p50_ms"], 1e-9)
+        print(f"limit={limit:>5}: orm p50 {paths['orm']['p50_ms']:.2f} ms, "
+              f"projection p50 {paths['projection']['p50_ms']:.2f} ms ({speedup:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--projects", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.projects, args.users))
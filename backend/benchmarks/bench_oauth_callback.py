@@ -0,0 +1,140 @@
+"""Time the Google and GitHub OAuth callbacks end to end against the local stub provider.
+
+Run from backend/:
+
+    BENCH_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.bench_oauth_callback --upstream-ms 40
+
+Starts ``stubs.oauth_provider`` with ``--upstream-ms`` of latency per call and
+points the app at it. Each login is the real flow: the app's authorize
+redirect, the stub's redirect back with a code, then the timed callback
+(token exchange, ID token check or GitHub profile fetch, user lookup, JWT).
+The stub counts discovery and JWKS requests, which shows:
+
+- google cold: first logins with an empty metadata cache
+- google warm restart: a fresh cache object reading the file the cold run wrote,
+  as a restarted worker would; it should make no discovery or JWKS request
+- github sequential: ``user`` then ``user/emails``, the previous behaviour
+- github concurrent: both at once over the shared pool, the current code
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+import httpx
+from benchmarks.common import BACKEND_DIR, bench_database_url, free_port, migrate_bench_database, summarize
+
+DISCOVERY_PATHS = ("/.well-known/openid-configuration", "/oauth2/v3/certs")
+
+
+async def start_stub(upstream_ms: float) -> tuple:
+    port = free_port()
+    stub = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "stubs.oauth_provider:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env={**os.environ, "OAUTH_STUB_LATENCY_MS": str(upstream_ms)},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for _ in range(100):
+            try:
+                (await client.get("/stats")).raise_for_status()
+                return stub, base_url
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    stub.terminate()
+    sys.exit("OAuth stub did not start within 10s")
+
+
+async def login(app_client: httpx.AsyncClient, stub_client: httpx.AsyncClient, provider: str) -> float:
+    """Walk one login through both redirects and return the callback's duration"""
+    authorize = await app_client.get(f"/api/oauth/auth/{provider}")
+    assert authorize.status_code == 302, (authorize.status_code, authorize.text)
+    consent = await stub_client.get(authorize.headers["location"])
+    assert consent.status_code == 302, (consent.status_code, consent.text)
+    callback = urlsplit(consent.headers["location"])
+    start = time.perf_counter()
+    response = await app_client.get(f"{callback.path}?{callback.query}")
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 307 and "token=" in response.headers["location"], (response.status_code, response.text)
+    return elapsed
+
+
+async def main(iterations: int, upstream_ms: float):
+    stub, stub_url = await start_stub(upstream_ms)
+    cache_path = Path(tempfile.mkdtemp()) / "oauth_metadata.json"
+    os.environ.update({
+        "DATABASE_URL": bench_database_url(),
+        "GOOGLE_METADATA_URL": f"{stub_url}/.well-known/openid-configuration",
+        "GITHUB_OAUTH_BASE_URL": stub_url,
+        "GITHUB_API_BASE_URL": f"{stub_url}/api",
+        "OAUTH_METADATA_CACHE_PATH": str(cache_path),
+        "GOOGLE_CLIENT_ID": "bench", "GOOGLE_CLIENT_SECRET": "bench",
+        "GITHUB_CLIENT_ID": "bench", "GITHUB_CLIENT_SECRET": "bench",
+    })
+    logging.disable(logging.INFO)
+
+    from app.core.config import settings
+    from app.core.oauth_providers import ProviderMetadataCache, oauth_http
+    from app.db.database import engine
+    from app.main import app
+    from app.routes import oauth as oauth_routes
+
+    async def sequential_github_profile(access_token: str):
+        headers = {"Authorization": f"Bearer {access_token}"}
+        user = await oauth_http.client.get(f"{settings.GITHUB_API_BASE_URL}/user", headers=headers)
+        emails = await oauth_http.client.get(f"{settings.GITHUB_API_BASE_URL}/user/emails", headers=headers)
+        return user.json(), emails.json()
+
+    migrate_bench_database()
+    results = {}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://localhost:8000") as app_client, \
+                httpx.AsyncClient() as stub_client:
+
+            async def discovery_calls() -> int:
+                stats = (await stub_client.get(f"{stub_url}/stats")).json()
+                return sum(stats.get(path, 0) for path in DISCOVERY_PATHS)
+
+            async def phase(name: str, provider: str):
+                before = await discovery_calls()
+                samples = [await login(app_client, stub_client, provider) for _ in range(iterations)]
+                results[name] = {**summarize(samples), "first_ms": round(samples[0] * 1000, 2),
+                                 "discovery_requests": await discovery_calls() - before}
+
+            await phase("google_cold", "google")
+            # A restarted worker: nothing in memory, only the cache file
+            oauth_routes.provider_metadata = ProviderMetadataCache(str(cache_path), settings.OAUTH_METADATA_TTL_SECONDS)
+            oauth_routes.oauth.google.server_metadata.clear()
+            await phase("google_warm_restart", "google")
+
+            real_github_profile = oauth_routes.fetch_github_profile
+            oauth_routes.fetch_github_profile = sequential_github_profile
+            await login(app_client, stub_client, "github")  # warm the pool
+            await phase("github_sequential", "github")
+            oauth_routes.fetch_github_profile = real_github_profile
+            await phase("github_concurrent", "github")
+    finally:
+        await oauth_http.aclose()
+        await engine.dispose()
+        stub.terminate()
+        stub.wait()
+
+    print(json.dumps({"upstream_ms": upstream_ms, "callbacks": results}, indent=2))
+    for name, stats in results.items():
+        print(f"{name:<20} first {stats['first_ms']:>8.2f} ms  p50 {stats['p50_ms']:>8.2f} ms  "
+              f"p95 {stats['p95_ms']:>8.2f} ms  discovery/JWKS requests {stats['discovery_requests']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--upstream-ms", type=float, default=40, help="stub latency added to every provider call")
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.upstream_ms))
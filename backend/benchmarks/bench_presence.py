@@ -0,0 +1,146 @@
+"""Compare the timing-wheel presence registry with a last-seen dict scanned every tick.
+
+Run from backend/ (no database needed):
+
+    python -m benchmarks.bench_presence --users 10000 100000
+
+For each population the simulation runs ``--ticks`` one-second ticks with a
+30 s TTL. Every user heartbeats every ``--interval`` ticks from a random
+phase, and ``--churn`` of them go quiet at a random tick and must expire.
+Both registries see the same heartbeats and must agree on who is online at
+the end. Reported per registry:
+
+- heartbeat: mean cost of one heartbeat; the wheel's includes its sync bookkeeping
+- tick: cost of expiring one tick's worth of users (the wheel's slot vs the full scan)
+- ms_per_tick: heartbeats and expiry together, the registry's CPU time per second
+- query: "which of these 100 ids are online"
+- bytes_per_user: memory held per online user, from tracemalloc
+
+The wheel run also reports the NOTIFY traffic cross-worker sync would send.
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from typing import Dict, List
+from app.core import presence as presence_module
+from app.core.presence import PresenceRegistry
+from benchmarks.common import summarize
+
+TTL_SECONDS = 30
+QUERY_SIZE = 100
+
+
+class ScanRegistry:
+    """The usual alternative: last heartbeat tick per user, swept every tick"""
+
+    def __init__(self, ttl_ticks: int):
+        self.ttl_ticks = ttl_ticks
+        self.last_seen: Dict[int, int] = {}
+        self.tick = 0
+
+    def heartbeat(self, user_id: int):
+        self.last_seen[user_id] = self.tick
+
+    def advance(self, tick: int):
+        self.tick = tick
+        cutoff = tick - self.ttl_ticks
+        for user_id in [user_id for user_id, seen in self.last_seen.items() if seen < cutoff]:
+            del self.last_seen[user_id]
+
+    def online(self, user_ids: List[int]) -> List[int]:
+        return [user_id for user_id in user_ids if user_id in self.last_seen]
+
+
+def footprint(make, users: int, interval: int) -> float:
+    """Bytes per user of a registry holding ``users`` online users in steady state"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    registry = make()
+    # A TTL's worth of heartbeats, spread over ticks as they are in steady state
+    for tick in range(1, TTL_SECONDS + 1):
+        registry.advance(tick)
+        for user_id in range(1, users + 1):
+            if user_id % interval == tick % interval:
+                registry.heartbeat(user_id)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / users
+
+
+def simulate(users: int, ticks: int, interval: int, churn: float, seed: int) -> dict:
+    rng = random.Random(seed)
+    phase = [rng.randrange(interval) for _ in range(users + 1)]
+    quiet_from = [rng.randrange(ticks // 2) if rng.random() < churn else ticks for _ in range(users + 1)]
+    schedule = [[] for _ in range(interval)]
+    for user_id in range(1, users + 1):
+        schedule[phase[user_id]].append(user_id)
+    queries = [rng.sample(range(1, users + 1), QUERY_SIZE) for _ in range(200)]
+
+    sent = []
+    presence_module.pg_notifier.publish = lambda channel, payload: sent.append(payload) or True
+    wheel = PresenceRegistry(TTL_SECONDS, 1.0, sync=True)
+    scan = ScanRegistry(wheel.ttl_ticks)
+
+    results = {}
+    for name, registry in (("wheel", wheel), ("scan", scan)):
+        heartbeat_seconds, heartbeats, tick_samples = 0.0, 0, []
+        for tick in range(1, ticks + 1):
+            start = time.perf_counter()
+            registry.advance(tick)
+            tick_samples.append(time.perf_counter() - start)
+            beating = [user_id for user_id in schedule[tick % interval] if quiet_from[user_id] > tick]
+            start = time.perf_counter()
+            for user_id in beating:
+                registry.heartbeat(user_id)
+            heartbeat_seconds += time.perf_counter() - start
+            heartbeats += len(beating)
+            if registry is wheel:
+                wheel._flush()
+        query_samples = []
+        for ids in queries:
+            start = time.perf_counter()
+            registry.online(ids)
+            query_samples.append(time.perf_counter() - start)
+        results[name] = {
+            "heartbeat_ns": round(heartbeat_seconds / heartbeats * 1e9, 1),
+            "ms_per_tick": round((heartbeat_seconds + sum(tick_samples)) / ticks * 1000, 3),
+            "tick": summarize(tick_samples),
+            "query_100": summarize(query_samples),
+        }
+
+    # Same heartbeats, same ticks: the two must agree on who is online
+    expected = sorted(scan.last_seen)
+    assert wheel.online(range(1, users + 1)) == expected and wheel.online_count == len(expected)
+    results["wheel"]["sync"] = {
+        "notifications_per_tick": round(len(sent) / ticks, 1),
+        "bytes_per_tick": round(sum(len(payload) for payload in sent) / ticks),
+    }
+    results["wheel"]["bytes_per_user"] = round(footprint(lambda: PresenceRegistry(TTL_SECONDS, 1.0), users, interval), 1)
+    results["scan"]["bytes_per_user"] = round(footprint(lambda: ScanRegistry(TTL_SECONDS), users, interval), 1)
+    results["online_at_end"] = len(expected)
+    return results
+
+
+def main(populations: List[int], ticks: int, interval: int, churn: float):
+    report = {users: simulate(users, ticks, interval, churn, seed=users) for users in populations}
+    print(json.dumps(report, indent=2))
+    for users, results in report.items():
+        for name in ("wheel", "scan"):
+            stats = results[name]
+            print(f"{users:>7} users {name:<5}: heartbeat {stats['heartbeat_ns']:>6.1f} ns  "
+                  f"tick p50 {stats['tick']['p50_ms']:>8.3f} ms  p99 {stats['tick']['p99_ms']:>8.3f} ms  "
+                  f"total {stats['ms_per_tick']:>7.3f} ms/tick  "
+                  f"query p50 {stats['query_100']['p50_ms'] * 1000:>6.1f} us  "
+                  f"{stats['bytes_per_user']:>6.1f} B/user")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--ticks", type=int, default=120)
+    parser.add_argument("--interval", type=int, default=10, help="ticks between one user's heartbeats")
+    parser.add_argument("--churn", type=float, default=0.2, help="share of users that stop heartbeating")
+    args = parser.parse_args()
+    main(args.users, args.ticks, args.interval, args.churn)
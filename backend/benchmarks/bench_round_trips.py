@@ -0,0 +1,167 @@
+"""Count Postgres round trips per request for the main API routes.
+
+Run from backend/:
+
+    BENCH_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.bench_round_trips [--pgbouncer]
+
+The app talks to Postgres through a small proxy that counts ReadyForQuery
+messages; the server sends exactly one at the end of every round trip. Each
+route is measured twice: with read routes on autocommit read sessions
+(get_read_db) and with them forced back onto transactional get_db sessions,
+the previous behaviour. The response and principal caches are disabled so
+every request reaches the database. The scratch database is migrated to the
+Alembic head first; the few rows the script writes are left in place.
+tests/test_round_trips.py holds the same routes to statement budgets.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import uuid
+from typing import Awaitable, Callable, Dict, List
+from sqlalchemy.engine import make_url
+from benchmarks.common import bench_database_url, migrate_bench_database
+
+
+class RoundTripProxy:
+    """TCP proxy in front of Postgres that counts server ReadyForQuery ('Z') messages"""
+
+    def __init__(self, url: str):
+        target = make_url(url)
+        socket_dir = target.query.get("host")
+        if socket_dir and socket_dir.startswith("/"):
+            self._open = lambda: asyncio.open_unix_connection(f"{socket_dir}/.s.PGSQL.{target.port or 5432}")
+        else:
+            self._open = lambda: asyncio.open_connection(target.host or "localhost", target.port or 5432)
+        self._target = target
+        self.round_trips = 0
+
+    async def start(self) -> str:
+        """Start listening and return a database URL that goes through the proxy"""
+        server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        query = {k: v for k, v in self._target.query.items() if k not in ("host", "port")}
+        return self._target.set(host="127.0.0.1", port=port, query={**query, "ssl": "disable"}).render_as_string(
+            hide_password=False
+        )
+
+    async def _handle(self, client_reader, client_writer):
+        server_reader, server_writer = await self._open()
+
+        async def client_to_server():
+            while data := await client_reader.read(65536):
+                server_writer.write(data)
+                await server_writer.drain()
+            server_writer.close()
+
+        async def server_to_client():
+            buffer = b""
+            while data := await server_reader.read(65536):
+                buffer += data
+                # backend messages: 1 type byte + int32 length (including itself)
+                while len(buffer) >= 5:
+                    length = int.from_bytes(buffer[1:5], "big")
+                    if len(buffer) < 1 + length:
+                        break
+                    if buffer[0:1] == b"Z":
+                        self.round_trips += 1
+                    buffer = buffer[1 + length:]
+                client_writer.write(data)
+                await client_writer.drain()
+            client_writer.close()
+
+        await asyncio.gather(client_to_server(), server_to_client(), return_exceptions=True)
+
+
+PROJECT = {
+    "projectName": "Round trip project",
+    "clientName": "Bench client",
+    "details": "Benchmark project details " * 4,
+    "skills": ["python", "postgres"],
+    "paymentType": "hourly",
+    "projectStatus": "featured",
+    "payPerHour": 40,
+}
+
+
+async def measure(proxy: RoundTripProxy, request: Callable[[int], Awaitable], iterations: int) -> List[int]:
+    await request(-1)  # warm the pool and the statement caches
+    counts = []
+    for i in range(iterations):
+        before = proxy.round_trips
+        response = await request(i)
+        assert response.status_code < 400, (response.status_code, response.text)
+        counts.append(proxy.round_trips - before)
+    return counts
+
+
+async def main(iterations: int, pgbouncer: bool):
+    proxy = RoundTripProxy(bench_database_url())
+    os.environ["DATABASE_URL"] = await proxy.start()
+    os.environ["RESPONSE_CACHE_MAX_ENTRIES"] = "0"
+    os.environ["PRINCIPAL_CACHE_MAX_SIZE"] = "0"
+    os.environ["DATABASE_PGBOUNCER"] = "true" if pgbouncer else "false"
+    logging.disable(logging.INFO)
+
+    import httpx
+    from app.core.matching import rebuild_project_matcher
+    from app.db.database import engine, get_db, get_read_db
+    from app.main import app
+
+    migrate_bench_database()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.post("/api/auth/signup", data={
+                "name": "Bench", "email": "roundtrips@example.com", "password": "bench-password", "role": "client"
+            })
+            token = (await client.post("/api/auth/login", data={
+                "username": "roundtrips@example.com", "password": "bench-password"
+            })).json()["access_token"]
+            auth = {"Authorization": f"Bearer {token}"}
+            project_id = (await client.post("/api/projects/", headers=auth, json=PROJECT)).json()["project_id"]
+            await rebuild_project_matcher()  # the lifespan would, but the ASGI transport skips it
+
+            routes: Dict[str, Callable[[int], Awaitable]] = {
+                "POST /api/auth/signup": lambda i: client.post("/api/auth/signup", data={
+                    "name": "Bench", "email": f"roundtrips-{uuid.uuid4().hex}@example.com",
+                    "password": "bench-password", "role": "client"
+                }),
+                "POST /api/auth/login": lambda i: client.post("/api/auth/login", data={
+                    "username": "roundtrips@example.com", "password": "bench-password"
+                }),
+                "POST /api/projects/": lambda i: client.post("/api/projects/", headers=auth, json=PROJECT),
+                "PUT /api/projects/{id}": lambda i: client.put(f"/api/projects/{project_id}", headers=auth, json=PROJECT),
+                "GET /api/projects/": lambda i: client.get("/api/projects/?limit=10", headers=auth),
+                "GET /api/projects/?facets=true": lambda i: client.get("/api/projects/?limit=10&facets=true", headers=auth),
+                "GET /api/projects/dashboard": lambda i: client.get("/api/projects/dashboard?limit=10", headers=auth),
+                "GET /api/projects/{id}": lambda i: client.get(f"/api/projects/{project_id}", headers=auth),
+                "GET /api/projects/recommended": lambda i: client.get("/api/projects/recommended", headers=auth),
+            }
+
+            results = {}
+            for mode in ("transactional_reads", "read_sessions"):
+                if mode == "transactional_reads":
+                    app.dependency_overrides[get_read_db] = get_db
+                else:
+                    app.dependency_overrides.clear()
+                for route, request in routes.items():
+                    counts = await measure(proxy, request, iterations)
+                    results.setdefault(route, {})[mode] = statistics.median(counts)
+    finally:
+        await engine.dispose()
+
+    print(json.dumps({"pgbouncer": pgbouncer, "round_trips_per_request": results}, indent=2))
+    for route, modes in results.items():
+        print(f"{route:<32} transactional reads {modes['transactional_reads']:>4}   "
+              f"read sessions {modes['read_sessions']:>4}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--pgbouncer", action="store_true", help="measure with DATABASE_PGBOUNCER=true")
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.pgbouncer))
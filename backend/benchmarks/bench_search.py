@@ -0,0 +1,132 @@
+"""Time project search as the projects table grows.
+
+Seed the bench database first (``python -m benchmarks.seed``), then from backend/:
+
+    BENCH_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.bench_search --sizes 100000 1000000
+
+The script migrates the database and adds ``--needles`` projects whose name
+and details carry words the seeded data never uses. For each of ``--sizes``,
+smallest first, it then tops the table up to that many projects with seed
+rows through COPY, so Postgres maintains ``search_vector`` and its GIN index
+row by row as it does for the API, and times the first page of each query
+with ``fulltext_search``, the query behind ``GET /api/projects/search``:
+
+- selective: needle words, so the matches stay the same at every size
+- phrase: a needle phrase from the details only
+- common: a seeded skill that a large share of all projects mention
+- typo: a misspelt needle, through ``fuzzy_search`` when pg_trgm is installed
+
+Rows are only ever added, so a run against a table already past a size
+times it at the size it has.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timezone
+from typing import List
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.db.models import Projects, User
+from app.routes.addproject import TRIGRAM_INDEX, fulltext_search, fuzzy_search
+from benchmarks.common import bench_database_url, migrate_bench_database, summarize, time_async
+from benchmarks.seed import PROJECT_COLUMNS, project_rows
+
+NEEDLE_NAME = "Zephyrine ledger"
+NEEDLE_DETAILS = "Reconcile the quokka telemetry exports with the billing ledger every night."
+QUERIES = {
+    "selective": ("fulltext", "zephyrine ledger"),
+    "phrase": ("fulltext", '"quokka telemetry"'),
+    "common": ("fulltext", "python"),
+    "typo": ("fuzzy", "zephyrin"),
+}
+
+
+async def add_needles(conn, count: int):
+    if (await conn.execute(
+        select(func.count()).select_from(Projects).where(Projects.project_name.like(f"{NEEDLE_NAME}%"))
+    )).scalar():
+        return
+    client_id = (await conn.execute(select(func.min(User.id)))).scalar()
+    await conn.execute(insert(Projects), [
+        {
+            "client_id": client_id,
+            "project_name": f"{NEEDLE_NAME} {i}",
+            "client_name": "Bench client",
+            "details": NEEDLE_DETAILS,
+            "skill_required": ["python"],
+            "payment_type": "project",
+            "project_status": "featured",
+            "pay_per_project": 500,
+            "created_at": datetime.now(timezone.utc),
+        }
+        for i in range(count)
+    ])
+
+
+async def top_up(engine, size: int, rng: random.Random) -> dict:
+    """Grow projects to ``size`` rows with seed rows; returns the count and load time"""
+    async with engine.begin() as conn:
+        count, last_id = (await conn.execute(
+            select(func.count(), func.coalesce(func.max(Projects.project_id), 0))
+        )).one()
+        users = (await conn.execute(select(func.max(User.id)))).scalar()
+        missing = size - count
+        start = time.perf_counter()
+        if missing > 0:
+            raw = (await conn.get_raw_connection()).driver_connection
+            await raw.copy_records_to_table(
+                "projects", records=project_rows(missing, users, rng, first_id=last_id + 1), columns=PROJECT_COLUMNS
+            )
+            await conn.execute(text(
+                "SELECT setval(pg_get_serial_sequence('projects', 'project_id'), max(project_id)) FROM projects"
+            ))
+        load_seconds = time.perf_counter() - start
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE projects"))
+    return {"projects": max(size, count), "added": max(missing, 0), "load_s": round(load_seconds, 2)}
+
+
+async def main(sizes: List[int], needles: int, limit: int, iterations: int):
+    migrate_bench_database()
+    engine = create_async_engine(bench_database_url())
+    async with engine.begin() as conn:
+        await add_needles(conn, needles)
+        trigram = (await conn.execute(select(func.to_regclass(TRIGRAM_INDEX).isnot(None)))).scalar()
+
+    rng = random.Random(0)
+    report = {}
+    for size in sorted(sizes):
+        results = await top_up(engine, size, rng)
+        async with engine.connect() as conn:
+            for name, (mode, q) in QUERIES.items():
+                if mode == "fuzzy" and not trigram:
+                    results[name] = "skipped: pg_trgm is not installed"
+                    continue
+                search = fulltext_search if mode == "fulltext" else fuzzy_search
+                query = search(q, [], limit)
+                matches = len((await conn.execute(query)).all())
+                samples = await time_async(lambda: conn.execute(query), iterations)
+                results[name] = {"q": q, "page_rows": min(matches, limit), **summarize(samples)}
+        report[size] = results
+    await engine.dispose()
+
+    print(json.dumps(report, indent=2))
+    for size, results in report.items():
+        timings = "  ".join(
+            f"{name} {stats['p50_ms']:>8.3f} ms" for name, stats in results.items()
+            if isinstance(stats, dict) and "p50_ms" in stats
+        )
+        print(f"{results['projects']:>9} projects: p50 {timings}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--needles", type=int, default=25, help="projects the selective queries find")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.needles, args.limit, args.iterations))
@@ -0,0 +1,114 @@
+"""Compare Pydantic and orjson serialization of the project read payloads.
+
+Run from backend/ (no database needed):
+
+    python -m benchmarks.bench_serialization
+
+The "pydantic" path is what the routes did before: build response models,
+have FastAPI validate them against ``response_model``, then dump JSON. The
+"orjson" path is the current one: map rows to dicts and encode them once.
+Rows are synthetic but sized like real ones (a few hundred characters of
+details, a handful of skills).
+"""
+import argparse
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import List
+from pydantic import TypeAdapter
+from app.core.responses import dumps
+from app.routes.addproject import (
+    DashboardPage, ProjectPage, ProjectResponse, to_dashboard_response, to_project_response
+)
+from benchmarks.common import summarize, time_sync
+
+PAGE_SIZES = (10, 100)
+SKILLS = ["python", "postgres", "react", "docker", "aws", "typescript", "fastapi"]
+
+
+def make_rows(count: int) -> List[SimpleNamespace]:
+    now = datetime.now(timezone.utc)
+    return [
+        SimpleNamespace(
+            project_id=i + 1,
+            client_id=i % 200 + 1,
+            project_name=f"Project {i} rebuild of the billing pipeline",
+            client_name=f"Client {i % 200}",
+            details="We need help migrating a legacy service to FastAPI and Postgres. " * 6,
+            skill_required=SKILLS[i % 3:i % 3 + 4],
+            payment_type="hourly",
+            project_status="featured",
+            github_link=f"https://github.com/example/project-{i}",
+            start_date=now,
+            end_date=None,
+            pay_per_hour=45.0 + i % 20,
+            pay_per_project=None,
+            duration=30,
+            created_at=now - timedelta(minutes=i),
+            user_name=f"Client user {i % 200}",
+            user_email=f"client{i % 200}@example.com",
+            user_profile_pic=None,
+        )
+        for i in range(count)
+    ]
+
+
+def main(iterations: int):
+    page_adapter = TypeAdapter(ProjectPage)
+    dashboard_adapter = TypeAdapter(DashboardPage)
+    detail_adapter = TypeAdapter(ProjectResponse)
+    rows = make_rows(max(PAGE_SIZES))
+
+    cases = {
+        "detail": (
+            lambda: detail_adapter.dump_json(detail_adapter.validate_python(
+                ProjectResponse(**to_project_response(rows[0]))
+            )),
+            lambda: dumps(to_project_response(rows[0])),
+        ),
+    }
+    for limit in PAGE_SIZES:
+        page = rows[:limit]
+        cases[f"list_{limit}"] = (
+            lambda page=page: page_adapter.dump_json(page_adapter.validate_python({
+                "items": [ProjectResponse(**to_project_response(row)) for row in page],
+                "next_cursor": "cursor",
+            })),
+            lambda page=page: dumps({
+                "items": [to_project_response(row) for row in page],
+                "next_cursor": "cursor",
+                "facets": None,
+            }),
+        )
+        cases[f"dashboard_{limit}"] = (
+            lambda page=page: dashboard_adapter.dump_json(dashboard_adapter.validate_python({
+                "items": [to_dashboard_response(row) for row in page],
+                "next_cursor": "cursor",
+            })),
+            lambda page=page: dumps({
+                "items": [to_dashboard_response(row) for row in page],
+                "next_cursor": "cursor",
+            }),
+        )
+
+    results = {}
+    for name, (pydantic_path, orjson_path) in cases.items():
+        assert json.loads(pydantic_path()) == json.loads(orjson_path()), name
+        results[name] = {
+            "bytes": len(orjson_path()),
+            "pydantic": summarize(time_sync(pydantic_path, iterations)),
+            "orjson": summarize(time_sync(orjson_path, iterations)),
+        }
+
+    print(json.dumps(results, indent=2))
+    for name, paths in results.items():
+        speedup = paths["pydantic"]["p50_ms"] / max(paths["orjson"]["p50_ms"], 1e-9)
+        print(f"{name:>13} ({paths['bytes']:>6} B): pydantic p50 {paths['pydantic']['p50_ms']:.3f} ms, "
+              f"orjson p50 {paths['orjson']['p50_ms']:.3f} ms ({speedup:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    main(args.iterations)
@@ -0,0 +1,128 @@
+"""Measure worker cold start and fail when it misses a target.
+
+Seed the bench database first (``python -m benchmarks.seed``), then from backend/:
+
+    BENCH_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.bench_startup --target-ms 3000
+
+For each run the script starts ``uvicorn app.main:app`` on the bench database.
+It times how long the worker takes to answer /health, which includes the
+whole lifespan startup. It also times how long the recommendation index takes
+to load in the background, and then the first authenticated dashboard request.
+Runs alternate between the default warm-up and DATABASE_WARM_CONNECTIONS=0 to
+show what the pool warm-up buys.
+
+Separately, in this process, it times the two schema steps on the migrated
+database: the old per-boot ``create_all`` and the current version check.
+
+Exits non-zero if the median time to ready with warm-up exceeds
+``--target-ms``. The test suite holds the same target on an empty database
+in tests/test_startup.py; this script measures it on seeded data.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import httpx
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.security import create_access_token
+from app.db.models import Base
+from app.db.schema import check_schema_version
+from benchmarks.common import BACKEND_DIR, bench_database_url, free_port, migrate_bench_database, time_async
+from benchmarks.seed import SEED_EMAIL
+
+
+async def cold_start(warm_connections: int) -> dict:
+    port = free_port()
+    env = {
+        **os.environ,
+        "DATABASE_URL": bench_database_url(),
+        "DATABASE_WARM_CONNECTIONS": str(warm_connections),
+        "RESPONSE_CACHE_MAX_ENTRIES": "0",
+    }
+    token = create_access_token(data={"sub": SEED_EMAIL.format(1), "user_id": "1", "role": "client"})
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+            while True:
+                if server.poll() is not None:
+                    sys.exit("uvicorn exited during startup")
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.01)
+            ready = time.perf_counter() - started
+
+            auth = {"Authorization": f"Bearer {token}"}
+            while (await client.get("/api/projects/recommended", headers=auth)).status_code == 503:
+                await asyncio.sleep(0.05)
+            matcher_loaded = time.perf_counter() - started
+
+            start = time.perf_counter()
+            response = await client.get("/api/projects/dashboard", headers=auth)
+            response.raise_for_status()
+            first_request = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+    return {
+        "ready_ms": round(ready * 1000, 1),
+        "matcher_loaded_ms": round(matcher_loaded * 1000, 1),
+        "first_dashboard_ms": round(first_request * 1000, 2),
+    }
+
+
+async def schema_steps(iterations: int) -> dict:
+    engine = create_async_engine(bench_database_url())
+
+    async def create_all():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    results = {}
+    for name, step in (("create_all", create_all), ("check_schema_version", lambda: check_schema_version(engine))):
+        samples = await time_async(step, iterations)
+        results[f"{name}_ms"] = round(statistics.median(samples) * 1000, 2)
+    await engine.dispose()
+    return results
+
+
+async def main(runs: int, target_ms: float):
+    migrate_bench_database()
+    runs_by_mode = {"warm": [], "no_warm_up": []}
+    for _ in range(runs):
+        runs_by_mode["warm"].append(await cold_start(warm_connections=5))
+        runs_by_mode["no_warm_up"].append(await cold_start(warm_connections=0))
+
+    summary = {
+        mode: {
+            "ready_ms_median": statistics.median(run["ready_ms"] for run in results),
+            "matcher_loaded_ms_median": statistics.median(run["matcher_loaded_ms"] for run in results),
+            "first_dashboard_ms_median": statistics.median(run["first_dashboard_ms"] for run in results),
+            "runs": results,
+        }
+        for mode, results in runs_by_mode.items()
+    }
+    report = {"target_ms": target_ms, "startup": summary, "schema_step": await schema_steps(20)}
+    print(json.dumps(report, indent=2))
+
+    ready = summary["warm"]["ready_ms_median"]
+    if ready > target_ms:
+        sys.exit(f"Median time to ready {ready} ms exceeds the {target_ms} ms target")
+    print(f"Median time to ready {ready} ms is within the {target_ms} ms target")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=3000)
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.target_ms))
@@ -0,0 +1,242 @@
+"""Drive the main API flows concurrently and record latency percentiles and throughput.
+
+Seed a scratch database first (``python -m benchmarks.seed``), then from backend/:
+
+    BENCH_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.loadtest_api --duration 30
+
+Without ``--base-url`` the script starts ``uvicorn app.main:app`` against
+BENCH_DATABASE_URL on a free port, with ``--workers`` processes, and stops it
+afterwards. With ``--base-url`` it loads a server you started yourself.
+``--concurrency`` clients each pick a flow by ``--mix`` weight in a closed loop:
+login, signup, create (a project), dashboard (first page) and detail (a random
+seeded project). Per flow it reports status counts, p50/p95/p99 and requests
+per second.
+
+Each run is written to ``--output`` as JSON, together with the git commit and
+the arguments. Compare two runs with:
+
+    python -m benchmarks.loadtest_api --compare old.json new.json
+
+Run the load generator on a different core or host than the server, or it
+competes with the server for CPU.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+import httpx
+from benchmarks.common import bench_database_url, free_port, summarize
+from benchmarks.seed import SEED_EMAIL, SEED_PASSWORD
+
+FLOWS = ("login", "signup", "create", "dashboard", "detail")
+DEFAULT_MIX = "login=1,signup=1,create=2,dashboard=8,detail=8"
+RESULTS_DIR = Path(__file__).parent / "results"
+
+PROJECT = {
+    "projectName": "Load test project",
+    "clientName": "Load test client",
+    "details": "Load test project details " * 8,
+    "skills": ["python", "postgres", "react"],
+    "paymentType": "hourly",
+    "projectStatus": "featured",
+    "payPerHour": 60,
+}
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    weights = {}
+    for part in mix.split(","):
+        flow, _, weight = part.partition("=")
+        if flow not in FLOWS or not weight.isdigit():
+            sys.exit(f"Bad --mix entry {part!r}; expected flow=weight with flow in {', '.join(FLOWS)}")
+        weights[flow] = int(weight)
+    return weights
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, seeded_users: int, max_project_id: int, tokens: List[str]):
+        self.client = client
+        self.seeded_users = seeded_users
+        self.max_project_id = max_project_id
+        self.tokens = tokens
+        self.latencies: Dict[str, List[float]] = {flow: [] for flow in FLOWS}
+        self.statuses: Dict[str, Counter] = {flow: Counter() for flow in FLOWS}
+
+    def _auth(self, rng: random.Random) -> dict:
+        return {"Authorization": f"Bearer {rng.choice(self.tokens)}"}
+
+    def request(self, flow: str, rng: random.Random):
+        if flow == "login":
+            email = SEED_EMAIL.format(rng.randint(1, self.seeded_users))
+            return self.client.post("/api/auth/login", data={"username": email, "password": SEED_PASSWORD})
+        if flow == "signup":
+            return self.client.post("/api/auth/signup", data={
+                "name": "Load Test", "email": f"load-{uuid.uuid4().hex}@example.com",
+                "password": SEED_PASSWORD, "role": "client",
+            })
+        if flow == "create":
+            return self.client.post("/api/projects/", headers=self._auth(rng), json=PROJECT)
+        if flow == "dashboard":
+            return self.client.get("/api/projects/dashboard", headers=self._auth(rng))
+        return self.client.get(f"/api/projects/{rng.randint(1, self.max_project_id)}", headers=self._auth(rng))
+
+    async def worker(self, flows: List[str], weights: List[int], until: float, rng: random.Random):
+        while time.perf_counter() < until:
+            flow = rng.choices(flows, weights)[0]
+            start = time.perf_counter()
+            try:
+                status = (await self.request(flow, rng)).status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            self.latencies[flow].append(time.perf_counter() - start)
+            self.statuses[flow][status] += 1
+
+
+async def login(client: httpx.AsyncClient, email: str) -> str:
+    response = await client.post("/api/auth/login", data={"username": email, "password": SEED_PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run(base_url: str, concurrency: int, duration: float, mix: Dict[str, int], seeded_users: int,
+              token_users: int, seed: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency + 8, max_keepalive_connections=concurrency + 8)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        # One at a time: concurrent logins past PASSWORD_HASH_MAX_PENDING are refused with 503
+        tokens = [await login(client, SEED_EMAIL.format(i)) for i in range(1, min(token_users, seeded_users) + 1)]
+        # Ids are dense from 1, so the newest project's id bounds the detail lookups
+        dashboard = await client.get("/api/projects/dashboard?limit=1", headers={"Authorization": f"Bearer {tokens[0]}"})
+        dashboard.raise_for_status()
+        items = dashboard.json()["items"]
+        if not items:
+            sys.exit("No projects found; seed the database with benchmarks.seed first")
+
+        test = LoadTest(client, seeded_users, items[0]["project_id"], tokens)
+        flows = [flow for flow, weight in mix.items() if weight > 0]
+        weights = [mix[flow] for flow in flows]
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            test.worker(flows, weights, started + duration, random.Random(seed + index))
+            for index in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    results = {}
+    for flow in flows:
+        samples = test.latencies[flow]
+        results[flow] = {
+            **summarize(samples),
+            "rps": round(len(samples) / elapsed, 1),
+            "statuses": {str(status): count for status, count in test.statuses[flow].items()},
+        }
+    total = sum(len(samples) for samples in test.latencies.values())
+    results["all"] = {
+        **summarize([sample for samples in test.latencies.values() for sample in samples]),
+        "rps": round(total / elapsed, 1),
+    }
+    return results
+
+
+async def start_server(workers: int) -> tuple:
+    port = free_port()
+    env = {**os.environ, "DATABASE_URL": bench_database_url()}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=Path(__file__).parent.parent, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for _ in range(300):
+            if server.poll() is not None:
+                sys.exit("uvicorn exited during startup")
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return server, base_url
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    server.terminate()
+    sys.exit("uvicorn did not become healthy within 30s")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old_path: str, new_path: str):
+    old, new = (json.loads(Path(path).read_text()) for path in (old_path, new_path))
+    print(f"{'flow':<10} {'metric':<7} {old.get('commit') or 'old':>10} {new.get('commit') or 'new':>10}   change")
+    for flow, new_stats in new["results"].items():
+        old_stats = old["results"].get(flow)
+        if old_stats is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "rps"):
+            before, after = old_stats[metric], new_stats[metric]
+            change = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+            print(f"{flow:<10} {metric:<7} {before:>10} {after:>10}   {change}")
+
+
+async def main(args):
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server, base_url = await start_server(args.workers)
+    try:
+        results = await run(base_url, args.concurrency, args.duration, parse_mix(args.mix), args.seeded_users,
+                            args.token_users, args.seed)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "args": {key: value for key, value in vars(args).items() if key != "compare"},
+        "results": results,
+    }
+    output = Path(args.output or RESULTS_DIR / f"loadtest-{datetime.now():%Y%m%d-%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    for flow, stats in results.items():
+        print(f"{flow:<10} n={stats['n']:<7} p50 {stats['p50_ms']:>8.2f} ms  p95 {stats['p95_ms']:>8.2f} ms  "
+              f"p99 {stats['p99_ms']:>8.2f} ms  {stats['rps']:>8.1f} req/s  {stats.get('statuses', '')}")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", help="load an already running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers when the script starts the server")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"flow weights (default {DEFAULT_MIX})")
+    parser.add_argument("--seeded-users", type=int, default=10_000, help="the --users passed to benchmarks.seed")
+    parser.add_argument("--token-users", type=int, default=20, help="seeded users logged in up front for reads")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="result file (default benchmarks/results/loadtest-<timestamp>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+    else:
+        asyncio.run(main(args))
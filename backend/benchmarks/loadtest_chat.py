@@ -0,0 +1,194 @@
+"""Hold thousands of chat WebSockets open and measure connect and fan-out latency.
+
+Seed the bench database first (``python -m benchmarks.seed``), then from backend/:
+
+    BENCH_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.loadtest_chat --sockets 5000 --workers 2
+
+Without ``--base-url`` the script starts ``uvicorn app.main:app`` with
+``--workers`` processes. Sockets spread over the workers, so with more than
+one worker most messages reach their readers through Postgres LISTEN/NOTIFY.
+``--sockets`` connections join ``--rooms`` rooms round-robin, as
+``--users`` distinct seeded users. ``--senders`` of them post ``--rate``
+messages per second each for ``--duration`` seconds, and every socket records
+how long each message took from send to arrival.
+
+``--slow`` sockets never read. Once more than CHAT_SEND_QUEUE_SIZE frames
+back up behind one, the server drops it (close code 1013) and the rest of
+its room should not notice; raise ``--message-bytes`` or lower the server's
+CHAT_SEND_QUEUE_SIZE to get there within a short run. With ``--deflate`` the clients
+negotiate permessage-deflate, as browsers do; the server then compresses
+every frame once per socket.
+
+Run the load generator on a different core or host than the server, or it
+competes with the server for CPU.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import resource
+import socket
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import List
+from urllib.parse import urlsplit
+import httpx
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed
+from app.core.security import create_access_token
+from benchmarks.common import summarize
+from benchmarks.loadtest_api import RESULTS_DIR, git_commit, start_server
+from benchmarks.seed import SEED_EMAIL
+
+CONNECT_BATCH = 200
+
+
+def raise_fd_limit(sockets: int):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = min(hard, max(soft, 2 * sockets + 256))
+    resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+    if wanted < sockets + 64:
+        raise SystemExit(f"File descriptor limit {hard} is too low for {sockets} sockets; raise ulimit -n")
+
+
+class ChatLoad:
+    def __init__(self, base_url: str, rooms: int, users: int, deflate: bool, message_bytes: int):
+        self.ws_url = base_url.replace("http", "ws", 1)
+        self.address = (urlsplit(base_url).hostname, urlsplit(base_url).port or 80)
+        self.padding = "x" * message_bytes
+        self.rooms = rooms
+        self.users = users
+        self.compression = "deflate" if deflate else None
+        self.connect_latencies: List[float] = []
+        self.delivery_latencies: List[float] = []
+        self.closes: Counter = Counter()
+        self.received = 0
+        self.sent_by_room: Counter = Counter()
+
+    def url(self, index: int) -> str:
+        token = create_access_token(data={"sub": SEED_EMAIL.format(index % self.users + 1)})
+        return f"{self.ws_url}/api/chat/ws/load-{index % self.rooms}?token={token}"
+
+    async def open(self, index: int, slow: bool = False):
+        url = self.url(index)
+        start = time.perf_counter()
+        if slow:
+            # A tiny receive buffer and a client that never reads: backpressure reaches the server quickly
+            sock = socket.socket()
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+            sock.setblocking(False)
+            await asyncio.get_running_loop().sock_connect(sock, self.address)
+            websocket = await connect(url, sock=sock, compression=self.compression, max_queue=1)
+        else:
+            websocket = await connect(url, compression=self.compression, max_queue=None, open_timeout=60)
+        self.connect_latencies.append(time.perf_counter() - start)
+        await websocket.recv()  # room history
+        return websocket
+
+    async def read(self, websocket):
+        try:
+            async for frame in websocket:
+                event = json.loads(frame)
+                if event.get("type") == "message":
+                    self.received += 1
+                    self.delivery_latencies.append(time.time() - float(event["message"].split(" ", 1)[0]))
+        except ConnectionClosed:
+            pass
+        self.closes[websocket.close_code] += 1
+
+    async def send(self, websocket, index: int, rate: float, until: float):
+        rng = random.Random(index)
+        room = index % self.rooms
+        await asyncio.sleep(rng.random() / rate)
+        while time.perf_counter() < until:
+            try:
+                await websocket.send(json.dumps({"message": f"{time.time()!r} {self.padding}"}))
+            except ConnectionClosed:
+                return
+            self.sent_by_room[room] += 1
+            await asyncio.sleep(1 / rate)
+
+
+async def run(args, base_url: str) -> dict:
+    load = ChatLoad(base_url, args.rooms, args.users, args.deflate, args.message_bytes)
+    started = time.perf_counter()
+    sockets = []
+    for first in range(0, args.sockets, CONNECT_BATCH):
+        batch = range(first, min(first + CONNECT_BATCH, args.sockets))
+        sockets.extend(await asyncio.gather(*(load.open(index) for index in batch)))
+    connect_seconds = time.perf_counter() - started
+    slow = [await load.open(index, slow=True) for index in range(args.slow)]
+
+    readers = [asyncio.create_task(load.read(websocket)) for websocket in sockets]
+    until = time.perf_counter() + args.duration
+    await asyncio.gather(*(
+        load.send(sockets[index], index, args.rate, until) for index in range(min(args.senders, len(sockets)))
+    ))
+    await asyncio.sleep(2)  # let the last messages land
+
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        server_stats = (await client.get("/health/chat")).json()
+    for websocket in sockets + slow:
+        await websocket.close()
+    await asyncio.gather(*readers)
+
+    sockets_per_room = Counter(index % args.rooms for index in range(args.sockets))
+    expected = sum(sent * sockets_per_room[room] for room, sent in load.sent_by_room.items())
+    return {
+        "connect": {**summarize(load.connect_latencies), "total_s": round(connect_seconds, 2)},
+        "delivery": summarize(load.delivery_latencies),
+        "messages_sent": sum(load.sent_by_room.values()),
+        "frames_expected": expected,
+        "frames_received": load.received,
+        "close_codes": {str(code): count for code, count in load.closes.items()},
+        "slow_sockets_dropped": sum(1 for websocket in slow if websocket.close_code == 1013),
+        "server_worker_sample": server_stats,
+    }
+
+
+async def main(args):
+    raise_fd_limit(args.sockets + args.slow)
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server, base_url = await start_server(args.workers)
+    try:
+        results = await run(args, base_url)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report = {
+        "started_at": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "args": vars(args),
+        "results": results,
+    }
+    output = Path(args.output or RESULTS_DIR / f"loadtest-chat-{datetime.now():%Y%m%d-%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", help="load an already running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn workers when the script starts the server")
+    parser.add_argument("--sockets", type=int, default=2000)
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--users", type=int, default=500, help="distinct seeded users the sockets log in as")
+    parser.add_argument("--senders", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=2.0, help="messages per second per sender")
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--message-bytes", type=int, default=200, help="padding added to every message")
+    parser.add_argument("--slow", type=int, default=2, help="sockets that never read")
+    parser.add_argument("--deflate", action="store_true", help="negotiate permessage-deflate like browsers")
+    parser.add_argument("--output", help="result file (default benchmarks/results/loadtest-chat-<timestamp>.json)")
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,214 @@
+"""Hold many project feed streams open while projects are created, and measure delivery.
+
+Seed the bench database first (``python -m benchmarks.seed``), then from backend/:
+
+    BENCH_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.loadtest_feed --streams 2000 --workers 2
+
+Without ``--base-url`` the script starts ``uvicorn app.main:app`` with
+``--workers`` processes. ``--streams`` clients open ``GET /api/projects/stream``,
+every fourth filtering on one popular skill and every seventh on hourly
+projects. ``--creators`` seeded users then create ``--rate`` projects per
+second each for ``--duration`` seconds, and every stream records how long each
+project took from the POST being sent to the event arriving.
+
+The report counts the database connections open before and after the streams
+connect, which should not move, then reconnects ``--resume`` streams with the
+``Last-Event-ID`` of their sixth-from-last event and checks they get exactly
+the five events after it back from the backlog, in the same order, whichever
+worker they land on.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+import asyncpg
+import httpx
+from sqlalchemy.engine import make_url
+from app.core.security import create_access_token
+from benchmarks.common import bench_database_url, summarize
+from benchmarks.loadtest_api import RESULTS_DIR, git_commit, start_server
+from benchmarks.loadtest_chat import raise_fd_limit
+from benchmarks.seed import SEED_EMAIL, SKILLS
+
+CONNECT_BATCH = 200
+FILTER_SKILLS = SKILLS[:5]
+
+
+def stream_filter(index: int) -> dict:
+    params = {}
+    if index % 4 == 0:
+        params["skills"] = FILTER_SKILLS[index // 4 % len(FILTER_SKILLS)]
+    if index % 7 == 0:
+        params["payment_type"] = "hourly"
+    return params
+
+
+def wants(params: dict, project: dict) -> bool:
+    if "payment_type" in params and project["paymentType"] != params["payment_type"]:
+        return False
+    return "skills" not in params or params["skills"] in project["skills"]
+
+
+async def database_connections() -> int:
+    url = make_url(bench_database_url())
+    connection = await asyncpg.connect(
+        user=url.username, password=url.password, host=url.query.get("host", url.host),
+        port=url.port, database=url.database
+    )
+    try:
+        return await connection.fetchval(
+            "SELECT count(*) FROM pg_stat_activity WHERE datname = current_database() AND pid <> pg_backend_pid()"
+        )
+    finally:
+        await connection.close()
+
+
+class FeedStream:
+    def __init__(self, index: int, params: dict):
+        self.index = index
+        self.params = params
+        self.ids: List[int] = []
+        self.resets = 0
+        self.opened = asyncio.Event()
+
+    async def listen(self, client: httpx.AsyncClient, latencies: List[float], last_event_id: Optional[int] = None):
+        headers = {"Last-Event-ID": str(last_event_id)} if last_event_id is not None else {}
+        async with client.stream("GET", "/api/projects/stream", params=self.params, headers=headers) as response:
+            response.raise_for_status()
+            event = {}
+            async for line in response.aiter_lines():
+                if line.startswith("retry:"):
+                    self.opened.set()
+                elif line:
+                    field, _, value = line.partition(": ")
+                    event[field] = value
+                elif event:
+                    if event.get("event") == "project":
+                        project = json.loads(event["data"])
+                        self.ids.append(project["project_id"])
+                        latencies.append(time.time() - float(project["details"].split(" ", 1)[0]))
+                    elif event.get("event") == "reset":
+                        self.resets += 1
+                    event = {}
+
+
+async def create_projects(client: httpx.AsyncClient, user: int, rate: float, until: float, created: list):
+    rng = random.Random(user)
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': SEED_EMAIL.format(user)})}"}
+    await asyncio.sleep(rng.random() / rate)
+    while time.perf_counter() < until:
+        project = {
+            "projectName": f"Feed load {user}",
+            "clientName": "Feed load",
+            "details": f"{time.time()!r} created by the feed load test",
+            "skills": rng.sample(SKILLS[:10], rng.randint(1, 3)),
+            "paymentType": rng.choice(["project", "hourly"]),
+            "projectStatus": "featured",
+            "payPerProject": 500,
+            "payPerHour": 50,
+        }
+        response = await client.post("/api/projects/", json=project, headers=headers)
+        response.raise_for_status()
+        created.append(response.json())
+        await asyncio.sleep(1 / rate)
+
+
+async def run(args, base_url: str) -> dict:
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    token = create_access_token(data={"sub": SEED_EMAIL.format(1)})
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=None, params={"token": token}) as client:
+        connections_before = await database_connections()
+        streams = [FeedStream(index, stream_filter(index)) for index in range(args.streams)]
+        latencies: List[float] = []
+        listeners = []
+        started = time.perf_counter()
+        for first in range(0, args.streams, CONNECT_BATCH):
+            batch = streams[first:first + CONNECT_BATCH]
+            listeners.extend(asyncio.create_task(stream.listen(client, latencies)) for stream in batch)
+            await asyncio.gather(*(stream.opened.wait() for stream in batch))
+        connect_seconds = time.perf_counter() - started
+        connections_open = await database_connections()
+
+        created = []
+        until = time.perf_counter() + args.duration
+        await asyncio.gather(*(
+            create_projects(client, user, args.rate, until, created) for user in range(1, args.creators + 1)
+        ))
+        await asyncio.sleep(2)  # let the last events land
+        server_stats = (await client.get("/health/feed")).json()
+        for listener in listeners:
+            listener.cancel()
+        await asyncio.gather(*listeners, return_exceptions=True)
+
+        resumed = Counter()
+        for stream in streams[:args.resume]:
+            if len(stream.ids) < 6:
+                continue
+            missed = stream.ids[-5:]
+            replay = FeedStream(stream.index, stream.params)
+            listener = asyncio.create_task(replay.listen(client, [], last_event_id=stream.ids[-6]))
+            await replay.opened.wait()
+            await asyncio.sleep(0.2)
+            listener.cancel()
+            await asyncio.gather(listener, return_exceptions=True)
+            resumed["exact" if replay.ids == missed else "mismatch"] += 1
+            resumed["resets"] += replay.resets
+
+    expected = sum(wants(stream.params, project) for project in created for stream in streams)
+    return {
+        "connect": {"total_s": round(connect_seconds, 2)},
+        "database_connections": {"before_streams": connections_before, "with_streams_open": connections_open},
+        "delivery": summarize(latencies),
+        "projects_created": len(created),
+        "events_expected": expected,
+        "events_received": sum(len(stream.ids) for stream in streams),
+        "resumed": dict(resumed),
+        "server_worker_sample": server_stats,
+    }
+
+
+async def main(args):
+    raise_fd_limit(args.streams + args.resume)
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server, base_url = await start_server(args.workers)
+    try:
+        results = await run(args, base_url)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report = {
+        "started_at": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "args": vars(args),
+        "results": results,
+    }
+    output = Path(args.output or RESULTS_DIR / f"loadtest-feed-{datetime.now():%Y%m%d-%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", help="load an already running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn workers when the script starts the server")
+    parser.add_argument("--streams", type=int, default=1000)
+    parser.add_argument("--creators", type=int, default=5, help="seeded users creating projects")
+    parser.add_argument("--rate", type=float, default=2.0, help="projects per second per creator")
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--resume", type=int, default=20, help="streams reconnected with Last-Event-ID afterwards")
+    parser.add_argument("--output", help="result file (default benchmarks/results/loadtest-feed-<timestamp>.json)")
+    args = parser.parse_args()
+    asyncio.run(main(args))
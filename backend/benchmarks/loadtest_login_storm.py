@@ -0,0 +1,89 @@
+"""Show that non-auth latency stays flat while logins storm the server.
+
+Start the app (``uvicorn app.main:app``) against a scratch database, then run
+from backend/:
+
+    python -m benchmarks.loadtest_login_storm --base-url http://127.0.0.1:8000
+
+The script signs up a throwaway user, measures /health latency on its own,
+then again while ``--concurrency`` clients hammer /api/auth/login. With bcrypt
+on the event loop the second p99 balloons to the hash time times the queue
+depth; with the hashing pool it should stay close to the baseline, and excess
+logins come back as 503 (clients back off per Retry-After unless
+``--ignore-retry-after``) instead of queueing. Run the load generator on a
+different core or host than the server, or it competes for the same CPU.
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from collections import Counter
+import httpx
+from benchmarks.common import summarize
+
+
+async def probe(client: httpx.AsyncClient, until: float, interval: float) -> list:
+    samples = []
+    while time.perf_counter() < until:
+        start = time.perf_counter()
+        response = await client.get("/health")
+        response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return samples
+
+
+async def login_loop(client: httpx.AsyncClient, email: str, password: str, until: float,
+                     statuses: Counter, latencies: list, honor_retry_after: bool):
+    while time.perf_counter() < until:
+        start = time.perf_counter()
+        response = await client.post("/api/auth/login", data={"username": email, "password": password})
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status_code] += 1
+        if honor_retry_after and "Retry-After" in response.headers:
+            await asyncio.sleep(min(float(response.headers["Retry-After"]), max(until - time.perf_counter(), 0)))
+
+
+async def main(base_url: str, concurrency: int, duration: float, interval: float, honor_retry_after: bool):
+    limits = httpx.Limits(max_connections=concurrency + 8, max_keepalive_connections=concurrency + 8)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        email, password = f"storm-{uuid.uuid4().hex[:12]}@example.com", "storm-password"
+        response = await client.post("/api/auth/signup", data={
+            "name": "Login Storm", "email": email, "password": password, "role": "client"
+        })
+        response.raise_for_status()
+
+        baseline = await probe(client, time.perf_counter() + duration, interval)
+
+        statuses, login_latencies = Counter(), []
+        until = time.perf_counter() + duration
+        storm = [
+            asyncio.create_task(login_loop(client, email, password, until, statuses, login_latencies,
+                                           honor_retry_after))
+            for _ in range(concurrency)
+        ]
+        under_storm = await probe(client, until, interval)
+        await asyncio.gather(*storm)
+
+    report = {
+        "concurrency": concurrency,
+        "duration_s": duration,
+        "health_baseline": summarize(baseline),
+        "health_during_logins": summarize(under_storm),
+        "logins": {"statuses": dict(statuses), **summarize(login_latencies)},
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--probe-interval", type=float, default=0.01)
+    parser.add_argument("--ignore-retry-after", action="store_true",
+                        help="retry refused logins immediately instead of backing off")
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.concurrency, args.duration, args.probe_interval,
+                     not args.ignore_retry_after))
@@ -0,0 +1,66 @@
+"""Drive the phone OTP flow concurrently against the fake Twilio Verify server.
+
+Start the fake and the app, then run from backend/:
+
+    uvicorn stubs.fake_twilio_verify:app --port 8081
+    TWILIO_VERIFY_BASE_URL=http://127.0.0.1:8081 uvicorn app.main:app --port 8000
+    python -m benchmarks.loadtest_phone_auth --users 500 --concurrency 50
+
+Each simulated user starts a verification and then submits the fake's code.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+import httpx
+from benchmarks.common import summarize
+
+
+async def phone_login(client: httpx.AsyncClient, code: str, statuses: Counter, latencies: dict):
+    phone_number = f"+1555{random.randrange(10**7):07d}"
+    for step, path, body in (
+        ("start", "/api/auth/phone/start", {"phone_number": phone_number}),
+        ("verify", "/api/auth/phone/verify", {"phone_number": phone_number, "otp": code}),
+    ):
+        start = time.perf_counter()
+        response = await client.post(path, json=body)
+        latencies[step].append(time.perf_counter() - start)
+        statuses[f"{step}:{response.status_code}"] += 1
+        if response.status_code != 200:
+            return
+
+
+async def main(base_url: str, users: int, concurrency: int, code: str):
+    statuses, latencies = Counter(), {"start": [], "verify": []}
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async def one(client):
+        async with semaphore:
+            await phone_login(client, code, statuses, latencies)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(client) for _ in range(users)))
+        elapsed = time.perf_counter() - started
+
+    print(json.dumps({
+        "users": users,
+        "concurrency": concurrency,
+        "throughput_logins_per_s": round(users / elapsed, 2),
+        "statuses": dict(statuses),
+        "start": summarize(latencies["start"]),
+        "verify": summarize(latencies["verify"]),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--code", default="123456")
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.users, args.concurrency, args.code))
@@ -0,0 +1,127 @@
+"""Bulk-load a reproducible dataset of users and projects with COPY.
+
+Run from backend/ against a scratch database:
+
+    BENCH_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.seed --users 100000 --projects 1000000
+
+Migrates the database to the Alembic head, then empties users and projects
+(and anything referencing them). Rows are generated from ``--seed``, so the
+same arguments always produce the same data. Ids are 1..N. Every user can log
+in as ``seed{i}@example.com`` with SEED_PASSWORD; one bcrypt hash is shared by
+all of them, so seeding does not spend minutes hashing. Projects get Zipf-distributed
+skills and created_at values spread over the past year. Rows stream straight
+into COPY, so memory stays flat at any volume. The marketplace aggregates are
+rebuilt from the loaded projects at the end.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Iterator, Tuple
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.aggregates import rebuild_aggregates
+from app.core.security import get_password_hash
+from benchmarks.common import bench_database_url, migrate_bench_database
+
+SEED_PASSWORD = "seed-password"
+SEED_EMAIL = "seed{}@example.com"
+
+SKILLS = [
+    "python", "javascript", "react", "postgres", "typescript", "fastapi", "django", "node", "aws", "docker",
+    "kubernetes", "go", "rust", "java", "spring", "kotlin", "swift", "flutter", "vue", "angular",
+    "graphql", "redis", "terraform", "figma", "tailwind", "pandas", "pytorch", "tensorflow", "sql", "mongodb",
+    "elasticsearch", "kafka", "c++", "c#", "dotnet", "php", "laravel", "ruby", "rails", "solidity",
+]
+# Zipf-like popularity: a few skills show up everywhere, most are rare
+SKILL_WEIGHTS = [1 / (rank + 1) for rank in range(len(SKILLS))]
+
+USER_COLUMNS = ("id", "email", "name", "role", "hashed_password", "is_active", "provider", "auth_method")
+PROJECT_COLUMNS = (
+    "project_id", "client_id", "project_name", "client_name", "details", "skill_required", "payment_type",
+    "project_status", "github_link", "pay_per_hour", "pay_per_project", "duration", "created_at",
+)
+
+
+def user_rows(count: int, hashed_password: str) -> Iterator[Tuple]:
+    for i in range(1, count + 1):
+        role = "client" if i % 4 else "freelancer"
+        yield (i, SEED_EMAIL.format(i), f"Seed user {i}", role, hashed_password, True, "email", "email")
+
+
+def project_rows(count: int, users: int, rng: random.Random, first_id: int = 1) -> Iterator[Tuple]:
+    now = datetime.now(timezone.utc)
+    year = 365 * 24 * 3600
+    for i in range(first_id, first_id + count):
+        client_id = rng.randint(1, users)
+        hourly = rng.random() < 0.6
+        skills = sorted(set(rng.choices(SKILLS, SKILL_WEIGHTS, k=rng.randint(1, 5))))
+        yield (
+            i,
+            client_id,
+            f"Project {i}: {' and '.join(skills[:2])} work",
+            f"Client {client_id}",
+            f"Looking for help with {', '.join(skills)}. " * rng.randint(2, 8),
+            skills,
+            "hourly" if hourly else "project",
+            "urgent" if rng.random() < 0.2 else "featured",
+            f"https://github.com/seed/project-{i}" if rng.random() < 0.3 else None,
+            Decimal(rng.randint(15, 150)) if hourly else None,
+            None if hourly else Decimal(rng.randint(200, 20000)),
+            rng.randint(1, 180),
+            now - timedelta(seconds=rng.randint(0, year)),
+        )
+
+
+async def main(users: int, projects: int, seed: int):
+    migrate_bench_database()
+    engine = create_async_engine(bench_database_url())
+    rng = random.Random(seed)
+    hashed_password = get_password_hash(SEED_PASSWORD)
+    timings = {}
+    async with engine.begin() as conn:
+        await conn.execute(text("TRUNCATE users, projects RESTART IDENTITY CASCADE"))
+        raw = (await conn.get_raw_connection()).driver_connection
+
+        start = time.perf_counter()
+        await raw.copy_records_to_table("users", records=user_rows(users, hashed_password), columns=USER_COLUMNS)
+        timings["users_s"] = round(time.perf_counter() - start, 2)
+
+        start = time.perf_counter()
+        await raw.copy_records_to_table(
+            "projects", records=project_rows(projects, users, rng), columns=PROJECT_COLUMNS
+        )
+        timings["projects_s"] = round(time.perf_counter() - start, 2)
+
+        # Explicit ids bypassed the sequences; move them past the loaded rows
+        await conn.execute(text("SELECT setval(pg_get_serial_sequence('users', 'id'), GREATEST(max(id), 1)) FROM users"))
+        await conn.execute(text(
+            "SELECT setval(pg_get_serial_sequence('projects', 'project_id'), GREATEST(max(project_id), 1)) FROM projects"
+        ))
+
+        # COPY bypasses the API, which keeps the marketplace aggregates current
+        start = time.perf_counter()
+        await rebuild_aggregates(conn)
+        timings["aggregates_s"] = round(time.perf_counter() - start, 2)
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        start = time.perf_counter()
+        await conn.execute(text("VACUUM ANALYZE users, projects"))
+        timings["vacuum_analyze_s"] = round(time.perf_counter() - start, 2)
+    await engine.dispose()
+
+    print(json.dumps({"users": users, "projects": projects, "seed": seed, **timings}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--projects", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    if args.users < 1:
+        parser.error("--users must be at least 1")
+    asyncio.run(main(args.users, args.projects, args.seed))
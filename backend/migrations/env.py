@@ -1,9 +1,10 @@
 from logging.config import fileConfig
 
 import asyncio
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncConnection
-from sqlalchemy import pool
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import Connection, pool
 from alembic import context
+from app.core.config import settings
 from app.db.models import Base
 
 # this is the Alembic Config object, which provides
@@ -15,9 +16,9 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
-# use async database url
-DATABASE_URL = config.get_main_option("sqlalchemy.url")
-engine = create_async_engine(DATABASE_URL, echo = True, future = True)
+# Same database as the app (DATABASE_URL); run migrations over a direct
+# connection, not through PgBouncer in transaction mode
+DATABASE_URL = settings.DATABASE_URL
 
 # add your model's MetaData object here
 # for 'autogenerate' support
@@ -43,9 +44,8 @@ def run_migrations_offline() -> None:
     script output.
 
     """
-    url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url,
+        url=DATABASE_URL,
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
@@ -62,12 +62,13 @@ async def run_migrations_online():
     and associate a connection with the context.
 
     """
+    engine = create_async_engine(DATABASE_URL, poolclass=pool.NullPool)
     async with engine.begin() as conn:
-        await conn.run_sync(target_metadata.create_all)
         await conn.run_sync(do_migrations)
+    await engine.dispose()
 
-async def do_migrations(connection: AsyncConnection):
-    """Helper function to apply migrations."""
+def do_migrations(connection: Connection):
+    """Apply migrations on the sync connection run_sync hands over"""
     context.configure(connection = connection, target_metadata = target_metadata)
     with context.begin_transaction():
         context.run_migrations()
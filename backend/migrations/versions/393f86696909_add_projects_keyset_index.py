@@ -0,0 +1,30 @@
+"""add projects keyset index
+
+Revision ID: 393f86696909
+Revises: 7977523c2aa3
+Create Date: 2026-10-18 09:12:41.201337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '393f86696909'
+down_revision: Union[str, None] = '7977523c2aa3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_projects_created_at_project_id',
+        'projects',
+        ['created_at', 'project_id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_projects_created_at_project_id', table_name='projects')
@@ -9,6 +9,7 @@ from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
 
 
 # revision identifiers, used by Alembic.
@@ -19,8 +20,64 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
-    pass
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(), nullable=True),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('role', sa.String(), nullable=True),
+        sa.Column('hashed_password', sa.String(), nullable=True),
+        sa.Column('profile_pic_url', sa.String(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('provider', sa.String(), nullable=True),
+        sa.Column('provider_id', sa.String(), nullable=True),
+        sa.Column('phone_number', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('phone_number'),
+    )
+    op.create_index('ix_users_id', 'users', ['id'])
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'profiles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('bio', sa.Text(), nullable=True),
+        sa.Column('skills', postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column('hourly_rate', sa.Numeric(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_profiles_id', 'profiles', ['id'])
+
+    op.create_table(
+        'projects',
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('client_id', sa.Integer(), nullable=True),
+        sa.Column('project_name', sa.String(), nullable=True),
+        sa.Column('client_name', sa.String(), nullable=True),
+        sa.Column('details', sa.Text(), nullable=True),
+        sa.Column('skill_required', postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column('payment_type', sa.String(), nullable=True),
+        sa.Column('project_status', sa.String(), nullable=True),
+        sa.Column('github_link', sa.String(), nullable=True),
+        sa.Column('start_date', sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column('end_date', sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column('pay_per_hour', sa.Numeric(), nullable=True),
+        sa.Column('pay_per_project', sa.Numeric(), nullable=True),
+        sa.Column('duration', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['client_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('project_id'),
+    )
+    op.create_index('ix_projects_project_id', 'projects', ['project_id'])
 
 
 def downgrade() -> None:
-    pass
+    op.drop_index('ix_projects_project_id', table_name='projects')
+    op.drop_table('projects')
+    op.drop_index('ix_profiles_id', table_name='profiles')
+    op.drop_table('profiles')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_index('ix_users_id', table_name='users')
+    op.drop_table('users')
@@ -0,0 +1,66 @@
+"""add project aggregates
+
+Revision ID: 7bb9143b5e53
+Revises: f70ab520aca0
+Create Date: 2026-10-18 15:42:17.530118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from app.core.aggregates import ADD_ALL_PROJECTS
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7bb9143b5e53'
+down_revision: Union[str, None] = 'f70ab520aca0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'project_skill_stats',
+        sa.Column('skill', sa.String(), nullable=False),
+        sa.Column('projects', sa.Integer(), nullable=False),
+        sa.Column('pay_per_hour_count', sa.Integer(), nullable=False),
+        sa.Column('pay_per_hour_sum', sa.Numeric(), nullable=False),
+        sa.Column('pay_per_project_count', sa.Integer(), nullable=False),
+        sa.Column('pay_per_project_sum', sa.Numeric(), nullable=False),
+        sa.PrimaryKeyConstraint('skill'),
+    )
+    op.create_table(
+        'project_pay_histogram',
+        sa.Column('skill', sa.String(), nullable=False),
+        sa.Column('field', sa.String(), nullable=False),
+        sa.Column('bucket', sa.Integer(), nullable=False),
+        sa.Column('projects', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('skill', 'field', 'bucket'),
+    )
+    op.create_table(
+        'project_status_counts',
+        sa.Column('project_status', sa.String(), nullable=False),
+        sa.Column('projects', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('project_status'),
+    )
+    op.create_table(
+        'project_aggregate_log',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('sign', sa.Integer(), nullable=False),
+        sa.Column('skill_required', postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column('project_status', sa.String(), nullable=True),
+        sa.Column('pay_per_hour', sa.Numeric(), nullable=True),
+        sa.Column('pay_per_project', sa.Numeric(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    # Initial counts, through the same SQL the app folds its writes in with
+    op.execute(ADD_ALL_PROJECTS)
+
+
+def downgrade() -> None:
+    op.drop_table('project_aggregate_log')
+    op.drop_table('project_status_counts')
+    op.drop_table('project_pay_histogram')
+    op.drop_table('project_skill_stats')
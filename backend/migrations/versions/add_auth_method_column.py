@@ -1,13 +1,19 @@
 """add auth_method column
 
-Revision ID: {random_id}
-Revises: {previous_revision}
+Revision ID: 7977523c2aa3
+Revises: 4d43babcb0d2
 Create Date: 2024-03-05 19:50:29.894
 
 """
 from alembic import op
 import sqlalchemy as sa
 
+# revision identifiers, used by Alembic.
+revision = '7977523c2aa3'
+down_revision = '4d43babcb0d2'
+branch_labels = None
+depends_on = None
+
 def upgrade():
     op.add_column('users', sa.Column('auth_method', sa.String(), nullable=True, server_default='email'))
 
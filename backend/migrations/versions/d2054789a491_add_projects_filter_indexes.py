@@ -0,0 +1,34 @@
+"""add projects filter indexes
+
+Revision ID: d2054789a491
+Revises: 393f86696909
+Create Date: 2026-10-18 10:03:17.554120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2054789a491'
+down_revision: Union[str, None] = '393f86696909'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_projects_skill_required', 'projects', ['skill_required'], postgresql_using='gin')
+    op.create_index('ix_projects_payment_type', 'projects', ['payment_type'])
+    op.create_index('ix_projects_project_status', 'projects', ['project_status'])
+    op.create_index('ix_projects_pay_per_hour', 'projects', ['pay_per_hour'])
+    op.create_index('ix_projects_pay_per_project', 'projects', ['pay_per_project'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_projects_pay_per_project', table_name='projects')
+    op.drop_index('ix_projects_pay_per_hour', table_name='projects')
+    op.drop_index('ix_projects_project_status', table_name='projects')
+    op.drop_index('ix_projects_payment_type', table_name='projects')
+    op.drop_index('ix_projects_skill_required', table_name='projects')
@@ -0,0 +1,30 @@
+"""add foreign key indexes
+
+Revision ID: f4f055008067
+Revises: dad08a30a40c
+Create Date: 2026-10-18 12:40:09.311802
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4f055008067'
+down_revision: Union[str, None] = 'dad08a30a40c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Profile lookup on every GET /api/projects/recommended
+    op.create_index('ix_profiles_user_id', 'profiles', ['user_id'])
+    # Projects of one client, and the FK check when a user is deleted
+    op.create_index('ix_projects_client_id', 'projects', ['client_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_projects_client_id', table_name='projects')
+    op.drop_index('ix_profiles_user_id', table_name='profiles')
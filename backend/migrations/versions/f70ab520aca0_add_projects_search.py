@@ -0,0 +1,53 @@
+"""add projects search
+
+Revision ID: f70ab520aca0
+Revises: f4f055008067
+Create Date: 2026-10-18 14:05:41.207366
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f70ab520aca0'
+down_revision: Union[str, None] = 'f4f055008067'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(project_name, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(details, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    # Rewrites the table once; from then on Postgres keeps the column and its
+    # index current on every insert and update
+    op.add_column(
+        'projects',
+        sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True))
+    )
+    op.create_index('ix_projects_search_vector', 'projects', ['search_vector'], postgresql_using='gin')
+    # Typo fallback on project names. pg_trgm ships with contrib, which some
+    # Postgres builds leave out; search then runs without the fallback
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+                CREATE EXTENSION IF NOT EXISTS pg_trgm;
+                CREATE INDEX ix_projects_project_name_trgm ON projects USING gist (project_name gist_trgm_ops);
+            ELSE
+                RAISE NOTICE 'pg_trgm is not available; project search has no typo fallback';
+            END IF;
+        END $$
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_projects_project_name_trgm")
+    op.drop_index('ix_projects_search_vector', table_name='projects')
+    op.drop_column('projects', 'search_vector')
@@ -0,0 +1,69 @@
+"""Local stand-in for the Twilio Verify v2 API.
+
+Run it and point the backend at it to exercise phone auth without Twilio:
+
+    uvicorn stubs.fake_twilio_verify:app --port 8081
+    TWILIO_VERIFY_BASE_URL=http://127.0.0.1:8081 uvicorn app.main:app
+
+Every verification accepts FAKE_TWILIO_CODE (default 123456). Numbers that are
+not E.164 get Twilio's 60200 error, a sixth wrong code gets 60202 like the
+real service, and FAKE_TWILIO_LATENCY_MS adds a fixed delay per call so load
+tests see a realistic upstream round-trip.
+"""
+import asyncio
+import os
+import re
+import time
+import uuid
+from fastapi import FastAPI, Form
+from fastapi.responses import JSONResponse
+
+CODE = os.getenv("FAKE_TWILIO_CODE", "123456")
+LATENCY = float(os.getenv("FAKE_TWILIO_LATENCY_MS", "0")) / 1000
+TTL_SECONDS = 600
+MAX_CHECKS = 5
+E164 = re.compile(r"^\+[1-9]\d{6,14}$")
+
+app = FastAPI(title="Fake Twilio Verify")
+# (service_sid, to) -> {"sid", "expires_at", "checks"}
+pending = {}
+
+
+def error(status: int, code: int, message: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status,
+        content={"code": code, "message": message, "status": status,
+                 "more_info": f"https://www.twilio.com/docs/errors/{code}"},
+    )
+
+
+def verification(service_sid: str, to: str, sid: str, status: str) -> dict:
+    return {"sid": sid, "service_sid": service_sid, "to": to, "channel": "sms",
+            "status": status, "valid": status == "approved"}
+
+
+@app.post("/v2/Services/{service_sid}/Verifications")
+async def create_verification(service_sid: str, To: str = Form(...), Channel: str = Form("sms")):
+    await asyncio.sleep(LATENCY)
+    if not E164.match(To):
+        return error(400, 60200, "Invalid parameter `To`")
+    entry = pending.get((service_sid, To))
+    if entry is None or entry["expires_at"] < time.time():
+        entry = pending[(service_sid, To)] = {"sid": f"VE{uuid.uuid4().hex}", "checks": 0}
+    entry["expires_at"] = time.time() + TTL_SECONDS
+    return JSONResponse(status_code=201, content=verification(service_sid, To, entry["sid"], "pending"))
+
+
+@app.post("/v2/Services/{service_sid}/VerificationCheck")
+async def check_verification(service_sid: str, To: str = Form(...), Code: str = Form(...)):
+    await asyncio.sleep(LATENCY)
+    entry = pending.get((service_sid, To))
+    if entry is None or entry["expires_at"] < time.time():
+        return error(404, 20404, "The requested resource was not found")
+    if entry["checks"] >= MAX_CHECKS:
+        return error(429, 60202, "Max check attempts reached")
+    entry["checks"] += 1
+    if Code != CODE:
+        return verification(service_sid, To, entry["sid"], "pending")
+    del pending[(service_sid, To)]
+    return verification(service_sid, To, entry["sid"], "approved")
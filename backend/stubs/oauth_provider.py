@@ -0,0 +1,151 @@
+"""Local stand-in for Google's OpenID Connect endpoints and GitHub's OAuth and user API.
+
+Run it and point the backend at it to exercise both OAuth logins without the
+real providers:
+
+    uvicorn stubs.oauth_provider:app --port 8082
+    GOOGLE_METADATA_URL=http://127.0.0.1:8082/.well-known/openid-configuration \\
+    GITHUB_OAUTH_BASE_URL=http://127.0.0.1:8082 GITHUB_API_BASE_URL=http://127.0.0.1:8082/api \\
+    GOOGLE_CLIENT_ID=stub GOOGLE_CLIENT_SECRET=stub GITHUB_CLIENT_ID=stub GITHUB_CLIENT_SECRET=stub \\
+    uvicorn app.main:app
+
+Both authorize endpoints redirect straight back with a code, as if the user
+had already consented. The user is OAUTH_STUB_EMAIL (default
+oauth-stub@example.com) unless the authorize request carries a ``login_hint``.
+ID tokens are RS256-signed with a key generated at startup and published on
+the JWKS endpoint. OAUTH_STUB_LATENCY_MS adds a fixed delay to every call so
+benchmarks see a realistic upstream round-trip; GET /stats counts calls per
+endpoint.
+"""
+import asyncio
+import os
+import secrets
+import time
+import zlib
+from collections import Counter
+from urllib.parse import urlencode
+from fastapi import FastAPI, Form, Header, HTTPException, Request
+from fastapi.responses import RedirectResponse
+from joserfc import jwt
+from joserfc.jwk import RSAKey
+
+EMAIL = os.getenv("OAUTH_STUB_EMAIL", "oauth-stub@example.com")
+LATENCY = float(os.getenv("OAUTH_STUB_LATENCY_MS", "0")) / 1000
+CODE_TTL_SECONDS = 600
+
+app = FastAPI(title="Stub OAuth provider")
+key = RSAKey.generate_key(2048, parameters={"kid": "stub-key", "use": "sig", "alg": "RS256"})
+calls = Counter()
+# code -> {"client_id", "nonce", "email", "expires_at"}
+codes = {}
+# access token -> email
+tokens = {}
+
+
+@app.middleware("http")
+async def count_and_delay(request: Request, call_next):
+    if request.url.path != "/stats":
+        calls[request.url.path] += 1
+        await asyncio.sleep(LATENCY)
+    return await call_next(request)
+
+
+def issuer(request: Request) -> str:
+    return str(request.base_url).rstrip("/")
+
+
+def redirect_with_code(redirect_uri: str, state: str, client_id: str, nonce: str, login_hint: str) -> RedirectResponse:
+    code = secrets.token_urlsafe(16)
+    codes[code] = {"client_id": client_id, "nonce": nonce, "email": login_hint or EMAIL,
+                   "expires_at": time.time() + CODE_TTL_SECONDS}
+    separator = "&" if "?" in redirect_uri else "?"
+    return RedirectResponse(f"{redirect_uri}{separator}{urlencode({'code': code, 'state': state})}", status_code=302)
+
+
+def redeem(code: str) -> dict:
+    grant = codes.pop(code, None)
+    if grant is None or grant["expires_at"] < time.time():
+        raise HTTPException(status_code=400, detail="invalid_grant")
+    access_token = secrets.token_urlsafe(24)
+    tokens[access_token] = grant["email"]
+    return {**grant, "access_token": access_token}
+
+
+def bearer_email(authorization: str) -> str:
+    email = tokens.get(authorization.removeprefix("Bearer ").removeprefix("token "))
+    if email is None:
+        raise HTTPException(status_code=401, detail="Bad credentials")
+    return email
+
+
+@app.get("/stats")
+async def stats():
+    return dict(calls)
+
+
+# Google: OpenID Connect discovery, JWKS, authorize and token endpoints
+
+@app.get("/.well-known/openid-configuration")
+async def openid_configuration(request: Request):
+    base = issuer(request)
+    return {
+        "issuer": base,
+        "authorization_endpoint": f"{base}/o/oauth2/v2/auth",
+        "token_endpoint": f"{base}/token",
+        "userinfo_endpoint": f"{base}/v1/userinfo",
+        "jwks_uri": f"{base}/oauth2/v3/certs",
+        "response_types_supported": ["code"],
+        "subject_types_supported": ["public"],
+        "id_token_signing_alg_values_supported": ["RS256"],
+        "scopes_supported": ["openid", "email", "profile"],
+    }
+
+
+@app.get("/oauth2/v3/certs")
+async def jwks():
+    return {"keys": [key.as_dict(private=False)]}
+
+
+@app.get("/o/oauth2/v2/auth")
+async def google_authorize(redirect_uri: str, state: str, client_id: str, nonce: str = "", login_hint: str = ""):
+    return redirect_with_code(redirect_uri, state, client_id, nonce, login_hint)
+
+
+@app.post("/token")
+async def google_token(request: Request, code: str = Form(...)):
+    grant = redeem(code)
+    now = int(time.time())
+    claims = {
+        "iss": issuer(request), "aud": grant["client_id"], "sub": f"stub-{grant['email']}",
+        "email": grant["email"], "email_verified": True, "iat": now, "exp": now + 3600,
+    }
+    if grant["nonce"]:
+        claims["nonce"] = grant["nonce"]
+    id_token = jwt.encode({"alg": "RS256", "kid": key.kid}, claims, key)
+    return {"access_token": grant["access_token"], "token_type": "Bearer", "expires_in": 3600,
+            "scope": "openid email profile", "id_token": id_token}
+
+
+# GitHub: OAuth authorize and token endpoints, and the two user API calls the app makes
+
+@app.get("/login/oauth/authorize")
+async def github_authorize(redirect_uri: str, state: str, client_id: str, login_hint: str = ""):
+    return redirect_with_code(redirect_uri, state, client_id, "", login_hint)
+
+
+@app.post("/login/oauth/access_token")
+async def github_token(code: str = Form(...)):
+    grant = redeem(code)
+    return {"access_token": grant["access_token"], "token_type": "bearer", "scope": "user:email"}
+
+
+@app.get("/api/user")
+async def github_user(authorization: str = Header("")):
+    email = bearer_email(authorization)
+    return {"id": zlib.crc32(email.encode()), "login": email.split("@")[0], "email": email}
+
+
+@app.get("/api/user/emails")
+async def github_emails(authorization: str = Header("")):
+    email = bearer_email(authorization)
+    return [{"email": email, "primary": True, "verified": True, "visibility": "private"}]
@@ -0,0 +1,69 @@
+"""Shared fixtures.
+
+Unit tests need nothing running. Tests that take the ``database`` fixture run
+against the scratch Postgres named by TEST_DATABASE_URL, which they migrate
+to the Alembic head and write to, and are skipped when it is not set.
+"""
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "")
+
+# Settings are read once, at import: point the app at the scratch database and
+# fill in the provider credentials it cannot be configured without
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+for name in (
+    "GOOGLE_CLIENT_ID", "GOOGLE_CLIENT_SECRET", "GITHUB_CLIENT_ID", "GITHUB_CLIENT_SECRET",
+    "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_VERIFY_SID",
+):
+    os.environ.setdefault(name, "test")
+
+
+@pytest.fixture(scope="session")
+def run():
+    """Run a coroutine to completion on one loop shared by the whole session,
+    so the app's pooled connections stay usable from test to test"""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def database(run):
+    if not TEST_DATABASE_URL:
+        pytest.skip("Set TEST_DATABASE_URL to a scratch postgresql+asyncpg:// database")
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=BACKEND_DIR, env=os.environ, check=True, stdout=subprocess.DEVNULL
+    )
+    yield TEST_DATABASE_URL
+    from app.db.database import engine
+    run(engine.dispose())
+
+
+@pytest.fixture(scope="session")
+def client(database, run):
+    """The app over an in-process ASGI transport; the lifespan does not run"""
+    import httpx
+    from app.main import app
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    yield client
+    run(client.aclose())
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client, run):
+    """Bearer headers of a client user, signed up on first use"""
+    credentials = {"username": "tests@example.com", "password": "test-password"}
+    run(client.post("/api/auth/signup", data={
+        "name": "Tests", "email": credentials["username"], "password": credentials["password"], "role": "client"
+    }))
+    response = run(client.post("/api/auth/login", data=credentials))
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
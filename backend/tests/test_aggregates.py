@@ -0,0 +1,121 @@
+import os
+import subprocess
+import sys
+from datetime import datetime
+import pytest
+from sqlalchemy import insert, select
+from tests.conftest import BACKEND_DIR
+
+PROJECTS = [
+    {"skills": ["python", "postgres"], "paymentType": "hourly", "projectStatus": "featured", "payPerHour": 40},
+    {"skills": ["python", "Python"], "paymentType": "project", "projectStatus": "urgent", "payPerProject": 1500},
+    {"skills": ["rust"], "paymentType": "hourly", "projectStatus": "featured", "payPerHour": 95},
+    {"skills": ["go", "postgres"], "paymentType": "project", "projectStatus": "featured", "payPerProject": 800},
+]
+
+
+def project(index: int, **changes) -> dict:
+    return {
+        "projectName": f"Aggregates project {index}",
+        "clientName": "Test client",
+        "details": "Aggregates project details",
+        **PROJECTS[index],
+        **changes,
+    }
+
+
+async def summary_rows(conn) -> dict:
+    from app.core.aggregates import SUMMARY_TABLES
+    return {
+        table.name: sorted(tuple(row) for row in (await conn.execute(select(table).where(table.c.projects != 0))).all())
+        for table in SUMMARY_TABLES
+    }
+
+
+async def rebuilt_rows(conn) -> dict:
+    """The summary tables recounted from scratch, left as they were"""
+    from app.core.aggregates import rebuild_aggregates
+    await rebuild_aggregates(conn)
+    rows = await summary_rows(conn)
+    await conn.rollback()
+    return rows
+
+
+@pytest.fixture
+def aggregates(database, run):
+    """A folder over freshly rebuilt summary tables"""
+    from app.core.aggregates import MarketplaceAggregates, rebuild_aggregates
+    from app.db.database import engine
+    from app.db.models import Projects
+
+    async def rebuild():
+        async with engine.begin() as conn:
+            # Written outside the API, with a NULL among its skills
+            await conn.execute(insert(Projects).values(
+                project_name="Aggregates", skill_required=["python", None], payment_type="hourly", pay_per_hour=30
+            ))
+            await rebuild_aggregates(conn)
+
+    run(rebuild())
+    return MarketplaceAggregates(max_staleness_seconds=60, fold_seconds=1, reconcile_seconds=3600)
+
+
+def test_folding_the_log_matches_a_rebuild(client, auth_headers, aggregates, run):
+    from app.db.database import engine
+    created = []
+    for index in range(len(PROJECTS)):
+        response = run(client.post("/api/projects/", headers=auth_headers, json=project(index)))
+        response.raise_for_status()
+        created.append(response.json()["project_id"])
+    run(client.put(f"/api/projects/{created[0]}", headers=auth_headers, json=project(
+        0, skills=["rust", "python"], projectStatus="urgent", payPerHour=55
+    ))).raise_for_status()
+    run(client.put(f"/api/projects/{created[1]}", headers=auth_headers, json=project(
+        1, paymentType="hourly", payPerHour=25, payPerProject=None
+    ))).raise_for_status()
+    run(client.delete(f"/api/projects/{created[3]}", headers=auth_headers)).raise_for_status()
+
+    # One row per create and delete, two per update
+    assert run(aggregates.fold()) == len(PROJECTS) + 2 * 2 + 1
+
+    async def compare():
+        async with engine.connect() as conn:
+            return await summary_rows(conn), await rebuilt_rows(conn)
+
+    folded, rebuilt = run(compare())
+    assert folded == rebuilt
+    assert run(aggregates.fold()) == 0
+    assert run(aggregates.reconcile()) == 0
+
+
+def test_stats_route_serves_the_folded_numbers(client, auth_headers, aggregates, run, monkeypatch):
+    from app.routes import addproject
+    monkeypatch.setattr(addproject, "marketplace_aggregates", aggregates)
+    skill = f"aggregates-{datetime.now().timestamp()}"
+    response = run(client.post("/api/projects/", headers=auth_headers, json=project(2, skills=[skill])))
+    response.raise_for_status()
+    run(aggregates.fold())
+
+    response = run(client.get("/api/projects/stats", headers=auth_headers))
+    assert response.status_code == 200 and response.headers["content-type"] == "application/json"
+    stats = response.json()
+    counted = next(row for row in stats["skills"] if row["skill"] == skill)
+    assert counted["open_projects"] == 1 and counted["pay_per_hour"]["average"] == 95
+    assert stats["project_status"]["featured"] >= 1
+
+
+def test_migration_seeds_the_summary_tables_like_a_rebuild(aggregates, run):
+    from app.db.database import engine
+    migrate = lambda *args: subprocess.run(
+        [sys.executable, "-m", "alembic", *args], cwd=BACKEND_DIR, env=os.environ, check=True, stdout=subprocess.DEVNULL
+    )
+    # The aggregates fixture left a project with a NULL among its skills in place
+    migrate("downgrade", "7bb9143b5e53-1")
+    migrate("upgrade", "head")
+
+    async def compare():
+        async with engine.connect() as conn:
+            return await summary_rows(conn), await rebuilt_rows(conn)
+
+    seeded, rebuilt = run(compare())
+    assert seeded == rebuilt and seeded["project_skill_stats"]
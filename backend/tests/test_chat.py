@@ -0,0 +1,34 @@
+import pytest
+from app.core import chat
+from app.core.chat import ChatHub
+from app.core.config import settings
+from app.core.security import Principal
+
+PRINCIPAL = Principal(id=1, email="chat@example.com", name="Chat")
+
+
+@pytest.fixture
+def published(monkeypatch):
+    payloads = []
+    monkeypatch.setattr(chat.pg_notifier, "publish", lambda channel, payload: payloads.append(payload))
+    return payloads
+
+
+def test_message_is_delivered_here_and_published(published):
+    hub = ChatHub(history_size=10, queue_size=10, max_rooms=10)
+    subscriber = hub.join("room")
+    message = hub.post("room", PRINCIPAL, "hello")
+    assert hub.history("room") == [message]
+    assert subscriber.queue.qsize() == 1 and len(published) == 1
+
+
+def test_text_within_the_limit_that_encodes_past_one_notify_is_refused(published):
+    hub = ChatHub(history_size=10, queue_size=10, max_rooms=10)
+    subscriber = hub.join("room")
+    # Each control character becomes a six-byte \\u escape
+    text = "\x01" * (settings.CHAT_MAX_MESSAGE_BYTES // 2)
+    assert len(text.encode()) <= settings.CHAT_MAX_MESSAGE_BYTES
+    with pytest.raises(ValueError):
+        hub.post("room", PRINCIPAL, text)
+    assert hub.history("room") == [] and subscriber.queue.empty() and published == []
+    assert hub.stats()["rejected_too_large"] == 1
@@ -0,0 +1,25 @@
+from datetime import datetime
+from sqlalchemy import insert
+
+
+def test_facets_skip_projects_without_a_payment_type(client, auth_headers, run):
+    from app.db.database import engine
+    from app.db.models import Projects
+
+    skill = f"facet-{datetime.now().timestamp()}"
+
+    async def add_projects():
+        async with engine.begin() as conn:
+            await conn.execute(insert(Projects), [
+                {"project_name": "Facets", "skill_required": [skill], "payment_type": "hourly"},
+                {"project_name": "Facets", "skill_required": [skill, None], "payment_type": None},
+            ])
+
+    run(add_projects())
+    response = run(client.get(
+        "/api/projects/", params={"skills": skill, "facets": "true"}, headers=auth_headers
+    ))
+    assert response.status_code == 200, response.text
+    facets = response.json()["facets"]
+    assert facets["skills"] == {skill: 2}
+    assert facets["payment_type"] == {"hourly": 1}
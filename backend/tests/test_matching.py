@@ -0,0 +1,79 @@
+import math
+import random
+from datetime import datetime, timezone
+import pytest
+from app.core import matching
+from app.core.matching import ProjectMatcher
+
+NOW = 1_700_000_000.0
+SKILLS = [f"skill{i}" for i in range(30)]
+
+
+def reference_top_k(projects: dict, wanted: set, k: int, recency_weight=0.3, half_life_days=14.0):
+    """Score every project the slow way"""
+    frequency = {skill: sum(skill in skills for skills, _ in projects.values()) for skill in wanted}
+    weights = {skill: math.log1p(len(projects) / n) for skill, n in frequency.items() if n}
+    scored = []
+    for project_id, (skills, created_at) in projects.items():
+        shared = sum(weights.get(skill, 0) for skill in skills)
+        if shared:
+            recency = 2 ** (-max((NOW - created_at) / 86400, 0) / half_life_days)
+            overlap = shared / sum(weights.values())
+            scored.append((project_id, (1 - recency_weight) * overlap + recency_weight * recency))
+    return sorted(scored, key=lambda item: -item[1])[:k]
+
+
+@pytest.mark.parametrize("dense_ratio", [0, 10 ** 6])
+def test_top_k_matches_a_full_scan_through_updates_and_deletes(monkeypatch, dense_ratio):
+    # 0 always takes the sparse path, 10 ** 6 always the dense one
+    monkeypatch.setattr(matching, "DENSE_SCORING_RATIO", dense_ratio)
+    rng = random.Random(1)
+    matcher = ProjectMatcher(capacity=8)
+    projects = {}
+    for step in range(3000):
+        project_id = rng.randrange(1, 800)
+        if rng.random() < 0.2:
+            matcher.remove(project_id)
+            projects.pop(project_id, None)
+        else:
+            skills = set(rng.sample(SKILLS[:rng.randint(4, 30)], rng.randint(1, 4)))
+            created_at = NOW - rng.random() * 90 * 86400
+            matcher.add(project_id, [s.upper() for s in skills], datetime.fromtimestamp(created_at, timezone.utc))
+            projects[project_id] = (skills, created_at)
+
+    assert len(matcher) == len(projects)
+    for _ in range(50):
+        wanted = set(rng.sample(SKILLS, rng.randint(1, 5)))
+        expected = reference_top_k(projects, wanted, 10)
+        ranked = matcher.top_k(wanted, k=10, now=NOW)
+        assert [project_id for project_id, _ in ranked] == [project_id for project_id, _ in expected]
+        assert [score for _, score in ranked] == pytest.approx([score for _, score in expected])
+
+
+def test_top_k_only_ranks_projects_sharing_a_skill():
+    matcher = ProjectMatcher()
+    matcher.add(1, ["python"], None)
+    matcher.add(2, ["rust"], None)
+    matcher.add(3, ["Python ", "go"], None)
+    matcher.remove(3)
+    assert [project_id for project_id, _ in matcher.top_k(["python"], now=NOW)] == [1]
+    assert matcher.top_k(["cobol"]) == []
+    assert matcher.top_k(["python"], k=0) == []
+
+
+def test_changes_reach_other_workers(monkeypatch):
+    sent = []
+    monkeypatch.setattr(matching.pg_notifier, "publish", lambda channel, payload: sent.append((channel, payload)))
+    monkeypatch.setattr(matching, "project_matcher", ProjectMatcher())
+    created_at = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    matching.index_project(7, ["Python"], created_at)
+    matching.index_project(8, ["python", "go"], created_at)
+    matching.unindex_project(7)
+    assert {channel for channel, _ in sent} == {matching.MATCHING_CHANNEL}
+
+    # Another worker's index, fed the same notifications
+    monkeypatch.setattr(matching, "project_matcher", ProjectMatcher())
+    for _, payload in sent:
+        matching.receive_change(payload)
+    assert len(matching.project_matcher) == 1
+    assert matching.project_matcher.top_k(["go"], now=created_at.timestamp()) == [(8, pytest.approx(1.0))]
@@ -0,0 +1,112 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from app.core.pagination import (
+    MAX_PROJECT_ID, decode_cursor, decode_search_cursor, encode_cursor, encode_search_cursor
+)
+
+CREATED_AT = datetime(2024, 5, 17, 9, 30, 12, 345678, tzinfo=timezone.utc)
+
+
+def raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(CREATED_AT, 42)) == (CREATED_AT, 42)
+
+
+def test_cursor_keeps_the_offset():
+    created_at = CREATED_AT.astimezone(timezone(timedelta(hours=-5)))
+    decoded, _ = decode_cursor(encode_cursor(created_at, 1))
+    assert decoded == CREATED_AT and decoded.utcoffset() == timedelta(hours=-5)
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(CREATED_AT, MAX_PROJECT_ID)
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+
+
+def test_search_cursor_round_trip():
+    assert decode_search_cursor(encode_search_cursor("fuzzy", 0.25, 7)) == ("fuzzy", 0.25, 7)
+
+
+def test_ties_on_created_at_get_distinct_cursors():
+    assert encode_cursor(CREATED_AT, 1) != encode_cursor(CREATED_AT, 2)
+    assert decode_cursor(encode_cursor(CREATED_AT, 2)) == (CREATED_AT, 2)
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not a cursor",
+    "!!!!",
+    encode_cursor(CREATED_AT, 42)[:-3],
+    base64.urlsafe_b64encode(b"\xff\xfe\xfd").decode(),
+    raw_cursor([CREATED_AT.isoformat()]),
+    raw_cursor([CREATED_AT.isoformat(), 1, 2]),
+    raw_cursor({"created_at": CREATED_AT.isoformat(), "id": 1}),
+    raw_cursor(["yesterday", 1]),
+    raw_cursor([None, 1]),
+    raw_cursor([CREATED_AT.isoformat(), "one"]),
+    raw_cursor([CREATED_AT.isoformat(), [1]]),
+    raw_cursor([CREATED_AT.isoformat(), -1]),
+    raw_cursor([CREATED_AT.isoformat(), MAX_PROJECT_ID + 1]),
+    raw_cursor([CREATED_AT.isoformat(), 1e400]),
+    raw_cursor(42),
+])
+def test_garbage_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor)
+    assert raised.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", [
+    encode_cursor(CREATED_AT, 42),
+    raw_cursor(["bm25", 0.5, 1]),
+    raw_cursor(["fulltext", "high", 1]),
+    raw_cursor(["fulltext", 0.5, 2 ** 40]),
+])
+def test_garbage_search_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_search_cursor(cursor)
+    assert raised.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", ["garbage", raw_cursor([CREATED_AT.isoformat(), MAX_PROJECT_ID + 1])])
+def test_list_routes_answer_400_to_a_bad_cursor(client, auth_headers, run, cursor):
+    for path in ("/api/projects/", "/api/projects/dashboard"):
+        response = run(client.get(path, params={"cursor": cursor}, headers=auth_headers))
+        assert response.status_code == 400, (path, response.text)
+
+
+def test_pages_split_ties_on_created_at(database, run):
+    """Projects created in the same instant are each paged exactly once, newest id first"""
+    from app.db.database import engine
+    from app.db.models import Projects
+    from app.routes.addproject import PROJECT_COLUMNS, next_page_cursor, paginate_newest
+
+    name = f"Tied {datetime.now().timestamp()}"
+    created_at = datetime(2001, 1, 1, tzinfo=timezone.utc)
+
+    async def pages():
+        async with engine.begin() as conn:
+            await conn.execute(insert(Projects), [
+                {"project_name": name, "created_at": created_at} for _ in range(5)
+            ])
+        seen, cursor = [], None
+        async with engine.connect() as conn:
+            while True:
+                query = paginate_newest(select(*PROJECT_COLUMNS).where(Projects.project_name == name), 2, cursor)
+                rows = (await conn.execute(query)).all()
+                seen.append([row.project_id for row in rows[:2]])
+                cursor = next_page_cursor(rows, 2)
+                if cursor is None:
+                    return seen
+
+    seen = run(pages())
+    ids = [project_id for page in seen for project_id in page]
+    assert [len(page) for page in seen] == [2, 2, 1]
+    assert ids == sorted(ids, reverse=True) and len(set(ids)) == 5
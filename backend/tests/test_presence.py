@@ -0,0 +1,99 @@
+import pytest
+from app.core.presence import PresenceRegistry
+
+
+def registry(ttl_ticks: int = 3) -> PresenceRegistry:
+    return PresenceRegistry(ttl_seconds=ttl_ticks, tick_seconds=1)
+
+
+def test_user_expires_a_full_ttl_after_the_tick_of_their_heartbeat():
+    presence = registry()
+    presence.heartbeat(7)
+    presence.advance(3)
+    assert presence.is_online(7) and presence.online_count == 1
+    presence.advance(4)
+    assert not presence.is_online(7) and presence.online_count == 0
+    assert presence.stats()["expired"] == 1
+
+
+def test_ttl_rounds_up_to_whole_ticks():
+    presence = PresenceRegistry(ttl_seconds=2.5, tick_seconds=1)
+    presence.heartbeat(1)
+    presence.advance(3)
+    assert presence.is_online(1)
+    presence.advance(4)
+    assert not presence.is_online(1)
+
+
+def test_heartbeat_before_expiry_pushes_it_back():
+    presence = registry()
+    presence.heartbeat(7)
+    presence.advance(3)
+    presence.heartbeat(7)
+    # The slot the first heartbeat filed the user in fires, and skips them
+    presence.advance(4)
+    assert presence.is_online(7)
+    presence.advance(6)
+    assert presence.is_online(7) and presence.online_count == 1
+    presence.advance(7)
+    assert not presence.is_online(7) and presence.online_count == 0
+
+
+def test_repeated_heartbeats_in_one_tick_are_filed_once():
+    presence = registry()
+    for _ in range(5):
+        presence.heartbeat(7)
+    assert presence.online_count == 1
+    assert presence.stats()["wheel_entries"] == 1
+
+
+def test_staying_online_over_many_revolutions():
+    presence = registry()
+    slots = presence.ttl_ticks + 2
+    for tick in range(0, 20 * slots, 2):
+        presence.advance(tick)
+        assert presence.is_online(7) or tick == 0
+        presence.heartbeat(7)
+        # Entries left behind by refreshes are dropped as their slots fire
+        assert presence.stats()["wheel_entries"] <= slots
+    last = tick
+    presence.advance(last + presence.ttl_ticks)
+    assert presence.is_online(7)
+    presence.advance(last + presence.ttl_ticks + 1)
+    assert not presence.is_online(7) and presence.online_count == 0
+
+
+def test_advancing_past_a_whole_revolution_expires_everyone():
+    presence = registry()
+    presence.heartbeat(1)
+    presence.advance(2)
+    presence.heartbeat(2)
+    presence.advance(2 + 10 * (presence.ttl_ticks + 2))
+    assert presence.online([1, 2]) == [] and presence.online_count == 0
+    assert presence.stats()["wheel_entries"] == 0
+    presence.heartbeat(2)
+    assert presence.online([1, 2]) == [2]
+
+
+def test_longest_ttl_the_wheel_can_hold():
+    presence = registry(253)
+    presence.heartbeat(1)
+    presence.advance(253)
+    assert presence.is_online(1)
+    presence.advance(254)
+    assert not presence.is_online(1)
+    with pytest.raises(ValueError):
+        registry(254)
+
+
+def test_leave_and_other_workers_changes():
+    presence = registry()
+    presence.heartbeat(1)
+    presence.leave(1)
+    presence.leave(1)
+    assert not presence.is_online(1) and presence.online_count == 0
+    presence.receive("+2,300")
+    assert presence.online([300, 1, 2]) == [300, 2] and presence.online_count == 2
+    presence.receive("-300")
+    presence.advance(4)
+    assert presence.online_count == 0 and presence.stats()["expired"] == 1
@@ -0,0 +1,96 @@
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+from app.core import ratelimit
+from app.core.config import settings
+from app.core.ratelimit import InMemoryRateLimitStore, OtpAdmission, client_ip
+
+PHONE = "+15555550100"
+
+
+def request_from(host: str, *forwarded: str) -> Request:
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded]
+    return Request({"type": "http", "headers": headers, "client": (host, 50000)})
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(ratelimit.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def admission():
+    return OtpAdmission(InMemoryRateLimitStore())
+
+
+def test_client_ip_ignores_forwarded_for_unless_trusted(monkeypatch):
+    monkeypatch.setattr(settings, "TRUST_PROXY_HEADERS", False)
+    assert client_ip(request_from("10.0.0.1", "203.0.113.7")) == "10.0.0.1"
+
+
+@pytest.mark.parametrize("hops, forwarded, expected", [
+    (1, ["198.51.100.1, 203.0.113.7"], "203.0.113.7"),
+    (2, ["198.51.100.1, 203.0.113.7, 10.0.0.2"], "203.0.113.7"),
+    (1, ["198.51.100.1", "203.0.113.7"], "203.0.113.7"),
+    (3, ["203.0.113.7"], "203.0.113.7"),
+    (1, [" , "], "10.0.0.1"),
+])
+def test_client_ip_skips_entries_the_client_can_forge(monkeypatch, hops, forwarded, expected):
+    monkeypatch.setattr(settings, "TRUST_PROXY_HEADERS", True)
+    monkeypatch.setattr(settings, "TRUSTED_PROXY_HOPS", hops)
+    assert client_ip(request_from("10.0.0.1", *forwarded)) == expected
+
+
+def test_sliding_window_weights_the_previous_window(run, admission):
+    hit = lambda now: run(admission._within("key", 4, 100, now))
+    assert [hit(1000 + i) for i in range(4)] == [None] * 4
+    assert hit(1010) == 90
+    # Next window opens with all 5 hits of the last one still weighing in
+    assert hit(1100) == 100
+    # 80% through, the previous window weighs 5 * 0.2 = 1, plus 2 hits here
+    assert hit(1180) is None
+    assert hit(1180) is None
+    assert hit(1199) == 1
+    # Two windows on, the old hits are gone
+    assert [hit(1300) for _ in range(4)] == [None] * 4
+
+
+def test_limit_is_inclusive_at_the_window_boundary(run, admission):
+    hit = lambda now: run(admission._within("key", 2, 100, now))
+    assert hit(1099) is None and hit(1099) is None
+    assert hit(1099) == 1
+    # At the very start of the next window the previous one still counts in full
+    assert hit(1100) == 100
+    assert run(admission._within("other", 2, 100, 1100)) is None
+
+
+def test_resend_inside_the_dedup_window_is_skipped(run, clock, admission, monkeypatch):
+    monkeypatch.setattr(settings, "OTP_RESEND_DEDUP_SECONDS", 30)
+    assert run(admission.admit_send(PHONE, "10.0.0.1")) is True
+    clock[0] += 29
+    assert run(admission.admit_send(PHONE, "10.0.0.1")) is False
+    clock[0] += 1
+    assert run(admission.admit_send(PHONE, "10.0.0.1")) is True
+    assert admission.stats() == {"admitted_send": 2, "deduplicated_send": 1}
+
+
+def test_failed_send_releases_the_dedup_claim(run, clock, admission):
+    assert run(admission.admit_send(PHONE, "10.0.0.1")) is True
+    run(admission.send_failed(PHONE))
+    assert run(admission.admit_send(PHONE, "10.0.0.1")) is True
+
+
+def test_rejected_send_releases_the_dedup_claim(run, clock, admission, monkeypatch):
+    monkeypatch.setattr(settings, "OTP_SEND_PER_PHONE", 1)
+    assert run(admission.admit_send(PHONE, "10.0.0.1")) is True
+    run(admission.send_failed(PHONE))
+    with pytest.raises(HTTPException) as rejected:
+        run(admission.admit_send(PHONE, "10.0.0.1"))
+    assert rejected.value.status_code == 429
+    assert int(rejected.value.headers["Retry-After"]) > 0
+    # Over budget rather than deduplicated, so the next try is counted again
+    with pytest.raises(HTTPException):
+        run(admission.admit_send(PHONE, "10.0.0.1"))
+    assert admission.stats()["rejected_send_phone"] == 2
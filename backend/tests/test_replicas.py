@@ -0,0 +1,72 @@
+import pytest
+from app.core.config import settings
+from app.db.replicas import ReplicaSet
+
+
+@pytest.mark.parametrize("row, expected", [
+    ((False, False, None, None), 0.0),
+    ((True, True, 0.5, 0), 0.0),
+    ((True, True, 0.5, 3.25), 3.25),
+    ((True, True, None, 0), 0.0),
+    # Receiver gone, so receive and replay LSNs match however far behind it is
+    ((True, False, None, 0), None),
+    ((True, True, 61.0, 0), None),
+])
+def test_lag_marks_a_replica_without_a_wal_receiver_unusable(monkeypatch, row, expected):
+    monkeypatch.setattr(settings, "REPLICA_RECEIVER_TIMEOUT_SECONDS", 60)
+    assert ReplicaSet._lag(*row) == expected
+
+
+def test_reads_leave_a_replica_once_its_receiver_stops(run, monkeypatch):
+    replicas = ReplicaSet(["replica"])
+    measured = [0.0]
+
+    async def measure(engine):
+        return measured[0]
+
+    monkeypatch.setattr(replicas, "_measure", measure)
+    run(replicas.check())
+    assert replicas.pick(None) == "replica"
+    measured[0] = None
+    run(replicas.check())
+    assert replicas.pick(None) is None
+    assert replicas.stats()["replicas"] == [{"lag_seconds": None, "healthy": False}]
+
+
+def test_lag_query_runs_against_a_primary(database, run):
+    from app.db.database import engine
+    assert run(ReplicaSet([engine])._measure(engine)) == 0.0
+
+
+class FakeNotifier:
+    """Delivers each publish to every other subscriber, like NOTIFY across workers"""
+
+    def __init__(self):
+        self.handlers = []
+
+    def subscribe(self, channel, handler, own=False):
+        self.handlers.append(handler)
+
+    def publish(self, channel, payload):
+        for handler in self.handlers:
+            if handler.__self__ is not self.publishing:
+                handler(payload)
+
+
+def test_a_write_sends_the_writer_to_the_primary_in_every_worker(run, monkeypatch):
+    notifier = FakeNotifier()
+    workers = [ReplicaSet(["replica"]), ReplicaSet(["replica"])]
+
+    async def measure(engine):
+        return 0.0
+
+    for worker in workers:
+        monkeypatch.setattr(worker, "_measure", measure)
+        run(worker.check())
+        worker.share_writes(notifier)
+
+    notifier.publishing = workers[0]
+    workers[0].mark_write("writer@example.com")
+    assert [worker.pick("writer@example.com") for worker in workers] == [None, None]
+    assert [worker.pick("reader@example.com") for worker in workers] == ["replica", "replica"]
+    assert workers[1].stats()["primary_read_your_writes"] == 1
@@ -0,0 +1,109 @@
+"""Statements and transactions per request for the routes benchmarks/bench_round_trips.py measures.
+
+Statement counts come from the Server-Timing header SQLTelemetryMiddleware
+adds. BEGIN, COMMIT and ROLLBACK are not statements to it, so the engine's
+transaction events are counted alongside; on an autocommit read session they
+never reach the server and are left out. The response and principal caches
+are turned off so every request reaches the database.
+"""
+import re
+import uuid
+import pytest
+from sqlalchemy import event
+
+PROJECT = {
+    "projectName": "Round trip project",
+    "clientName": "Test client",
+    "details": "Round trip project details",
+    "skills": ["python", "postgres"],
+    "paymentType": "hourly",
+    "projectStatus": "featured",
+    "payPerHour": 40,
+}
+
+# (statements, transaction boundaries) each request may take at most. Reads run
+# on autocommit sessions and send no BEGIN or ROLLBACK; signup ends its read
+# transaction before hashing the password, so it commits twice.
+BUDGETS = {
+    "POST /api/auth/signup": (2, 4),
+    "POST /api/auth/login": (1, 2),
+    "POST /api/projects/": (3, 2),
+    "PUT /api/projects/{id}": (4, 2),
+    "GET /api/projects/": (2, 0),
+    "GET /api/projects/?facets=true": (2, 0),
+    "GET /api/projects/dashboard": (2, 0),
+    "GET /api/projects/{id}": (2, 0),
+    "GET /api/projects/recommended": (2, 0),
+}
+
+
+@pytest.fixture
+def uncached(monkeypatch):
+    from app.core.response_cache import MemoryCacheBackend, response_cache
+    from app.core.security import principal_cache
+    monkeypatch.setattr(response_cache, "backend", MemoryCacheBackend(0, 0))
+    monkeypatch.setattr(principal_cache, "max_size", 0)
+    principal_cache.clear()
+
+
+@pytest.fixture
+def transactions(database):
+    """Count BEGIN/COMMIT/ROLLBACK that reach the server"""
+    from app.db.database import engine
+    counted = [0]
+
+    def boundary(conn):
+        if conn.get_execution_options().get("isolation_level") != "AUTOCOMMIT":
+            counted[0] += 1
+
+    for name in ("begin", "commit", "rollback"):
+        event.listen(engine.sync_engine, name, boundary)
+    yield counted
+    for name in ("begin", "commit", "rollback"):
+        event.remove(engine.sync_engine, name, boundary)
+
+
+@pytest.fixture
+def project_id(client, auth_headers, run):
+    from app.core.matching import rebuild_project_matcher
+    response = run(client.post("/api/projects/", headers=auth_headers, json=PROJECT))
+    response.raise_for_status()
+    run(rebuild_project_matcher())  # the lifespan would, but the ASGI transport skips it
+    return response.json()["project_id"]
+
+
+def statements(response) -> int:
+    match = re.search(r'desc="(\d+) queries"', response.headers.get("server-timing", ""))
+    return int(match.group(1)) if match else 0
+
+
+def send(client, auth_headers, project_id, route: str):
+    if route == "POST /api/auth/signup":
+        return client.post("/api/auth/signup", data={
+            "name": "Tests", "email": f"round-trips-{uuid.uuid4().hex}@example.com",
+            "password": "test-password", "role": "client"
+        })
+    if route == "POST /api/auth/login":
+        return client.post("/api/auth/login", data={"username": "tests@example.com", "password": "test-password"})
+    if route == "POST /api/projects/":
+        return client.post("/api/projects/", headers=auth_headers, json=PROJECT)
+    if route == "PUT /api/projects/{id}":
+        return client.put(f"/api/projects/{project_id}", headers=auth_headers, json=PROJECT)
+    path = {
+        "GET /api/projects/": "/api/projects/?limit=10",
+        "GET /api/projects/?facets=true": "/api/projects/?limit=10&facets=true",
+        "GET /api/projects/dashboard": "/api/projects/dashboard?limit=10",
+        "GET /api/projects/{id}": f"/api/projects/{project_id}",
+        "GET /api/projects/recommended": "/api/projects/recommended",
+    }[route]
+    return client.get(path, headers=auth_headers)
+
+
+@pytest.mark.parametrize("route", BUDGETS)
+def test_route_stays_within_its_statement_budget(client, auth_headers, project_id, uncached, transactions, run, route):
+    max_statements, max_transactions = BUDGETS[route]
+    transactions[0] = 0
+    response = run(send(client, auth_headers, project_id, route))
+    assert response.status_code < 400, response.text
+    assert statements(response) <= max_statements
+    assert transactions[0] <= max_transactions
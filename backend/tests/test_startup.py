@@ -0,0 +1,51 @@
+"""Worker cold start against the startup-time target.
+
+A start is timed from launching ``uvicorn app.main:app`` to its first 200
+from /health, which covers the whole lifespan: the schema version check, the
+pool warm-up and starting the background tasks. The recommendation index
+loads after that and is not part of the target.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+import httpx
+from benchmarks.common import free_port
+from tests.conftest import BACKEND_DIR
+
+# Median time to ready over STARTUP_RUNS cold starts. A single start slower
+# than the timeout fails on its own, whatever the median.
+STARTUP_TARGET_MS = float(os.getenv("STARTUP_TARGET_MS", 3000))
+STARTUP_RUNS = 3
+STARTUP_TIMEOUT_SECONDS = 30
+
+
+def cold_start_ms() -> float:
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=os.environ,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=STARTUP_TIMEOUT_SECONDS) as client:
+            while time.perf_counter() - started < STARTUP_TIMEOUT_SECONDS:
+                assert server.poll() is None, "uvicorn exited during startup"
+                try:
+                    if client.get("/health").status_code == 200:
+                        return (time.perf_counter() - started) * 1000
+                except httpx.TransportError:
+                    time.sleep(0.01)
+    finally:
+        server.terminate()
+        server.wait()
+    raise AssertionError(f"Not ready after {STARTUP_TIMEOUT_SECONDS} s")
+
+
+def test_worker_is_ready_within_target(database):
+    samples = [cold_start_ms() for _ in range(STARTUP_RUNS)]
+    ready = statistics.median(samples)
+    assert ready <= STARTUP_TARGET_MS, (
+        f"Median time to ready {ready:.0f} ms exceeds the {STARTUP_TARGET_MS:.0f} ms target ({samples})"
+    )